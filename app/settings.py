@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -82,11 +83,53 @@ WSGI_APPLICATION = "app.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+## DB_ENGINE selects sqlite (default, single node) or postgresql,
+## the postgresql backend needs the psycopg driver to be installed.
+DB_ENGINE = os.environ.get("DB_ENGINE", "sqlite")
+
+if DB_ENGINE == "postgresql":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("DB_NAME", "project_manager"),
+            "USER": os.environ.get("DB_USER", "postgres"),
+            "PASSWORD": os.environ.get("DB_PASSWORD", ""),
+            "HOST": os.environ.get("DB_HOST", "localhost"),
+            "PORT": os.environ.get("DB_PORT", "5432"),
+            ## persistent connections, checked before reuse by each request
+            "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+            "CONN_HEALTH_CHECKS": True,
+            ## set DB_POOLER=1 behind a transaction pooling PgBouncer, which
+            ## does not keep the server side cursors of .iterator() open
+            "DISABLE_SERVER_SIDE_CURSORS": os.environ.get("DB_POOLER", "0") == "1",
+            "OPTIONS": {
+                "connect_timeout": int(os.environ.get("DB_CONNECT_TIMEOUT", 5)),
+            },
+        }
     }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get("DB_NAME", BASE_DIR / "db.sqlite3"),
+            "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                ## seconds a writer waits for the lock before failing
+                "timeout": int(os.environ.get("DB_LOCK_TIMEOUT", 20)),
+            },
+        }
+    }
+
+## Applied to every new SQLite connection by core.db, WAL lets readers
+## run alongside the single writer, synchronous=NORMAL is safe with WAL.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    ## negative sizes are in KiB
+    "cache_size": -20000,
+    "mmap_size": 134217728,
 }
 
 
@@ -135,8 +178,77 @@ AUTH_USER_MODEL = "core.CustomUser"
 
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_PAGINATION_CLASS": "core.pagination.IdCursorPagination",
+    "PAGE_SIZE": 50,
+    ## orjson is optional, without it these fall back to the json module
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+}
+
+## Cross request cache of each user's team memberships and admin flags.
+## ALIAS must name an entry of CACHES shared by all processes (redis,
+## memcached), memberships are not cached across requests without it.
+MEMBERSHIP_CACHE = {
+    "ALIAS": None,
+    "TIMEOUT": 300,
+}
+
+## Cache of auth token to user id and active flag used by
+## CachedTokenAuthentication, entries are revoked when the token is deleted
+## or the user changes. ALIAS must name an entry of CACHES shared by all
+## processes, tokens are not cached across requests without it.
+## The hit ratio is logged to core.cache every LOG_STATS_EVERY lookups.
+TOKEN_AUTH_CACHE = {
+    "TTL": 60,
+    "ALIAS": None,
+    "LOG_STATS_EVERY": 1000,
+}
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        ## hit ratios of the caches
+        "core.cache": {"handlers": ["console"], "level": "INFO"},
+    },
 }
 
+## Team dashboards are dropped on writes, TIMEOUT and LOCAL_TTL bound
+## how long overdue counts lag behind tasks passing their due date
+DASHBOARD_CACHE = {
+    "MAX_TEAMS": 1000,
+    "LOCAL_TTL": 60,
+    "ALIAS": None,
+    "TIMEOUT": 60,
+}
+
+## Days deleted tasks are remembered for syncing clients,
+## older sync tokens require a full sync.
+SYNC_TOMBSTONE_RETENTION_DAYS = 30
+
+## Seconds a sync starts before the end of the previous one, changes of
+## transactions committing up to this long after they were written are
+## sent again instead of being missed.
+SYNC_SAFETY_WINDOW_SECONDS = 60
+
+## Publish/subscribe of change events streamed to clients by /api/events/,
+## the local broker only reaches clients connected to the same process.
+EVENT_BROKER = "core.events.LocalBroker"
+EVENT_STREAM_HEARTBEAT = 15
+
+## Upper bound for the page_size query parameter of list endpoints
+PAGINATION_MAX_PAGE_SIZE = 200
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Project Manager Tool",
     "DESCRIPTION": "A simple project manager tool written in Django",
@@ -147,3 +259,27 @@ SPECTACULAR_SETTINGS = {
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
 DEFAULT_FROM_EMAIL = "noreply@example.com"
+
+## Outbox worker (manage.py send_queued_emails) settings, failed e-mails are
+## retried after RETRY_BACKOFF * 2 ** (attempts - 1) seconds.
+EMAIL_QUEUE = {
+    "BATCH_SIZE": 100,
+    "MAX_ATTEMPTS": 5,
+    "RETRY_BACKOFF": 60,
+    ## seconds after which e-mails claimed by a worker that died are sent again
+    "SEND_TIMEOUT": 300,
+    ## days sent and failed e-mails are kept before the worker deletes them
+    "RETENTION_DAYS": 7,
+}
+
+## Background jobs run by the run_jobs management command
+JOBS = {
+    ## rows deleted or created per transaction
+    "CHUNK_SIZE": 1000,
+    "MAX_ATTEMPTS": 3,
+    "RETRY_BACKOFF": 30,
+    ## seconds without progress after which a running job is claimed again
+    "STALE_AFTER": 600,
+    ## bulk task imports with more items are run as a job
+    "TASK_BULK_SYNC_LIMIT": 1000,
+}
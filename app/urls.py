@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from core.views import events, JobDetailView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -13,4 +14,6 @@ urlpatterns = [
     ),
     path("api/team/", include("team.urls")),
     path("api/project/", include("project.urls")),
+    path("api/events/", events, name="events"),
+    path("api/jobs/<int:pk>/", JobDetailView.as_view(), name="job-detail"),
 ]
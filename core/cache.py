@@ -0,0 +1,210 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from django.core.cache import caches
+
+
+logger = logging.getLogger(__name__)
+
+
+class LocalLRUCache:
+    """
+    Thread safe, process local LRU cache with a time to live per entry.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                expires_at, value = self._data[key]
+            except KeyError:
+                return default
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class CacheStatsMixin:
+    """
+    Counts the hits and misses of a cache in this process and logs them
+    to the core.cache logger every stats_interval lookups when it is set.
+    """
+
+    stats_interval = None
+    hits = 0
+    misses = 0
+
+    def record_lookup(self, hit):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        lookups = self.hits + self.misses
+        if self.stats_interval and lookups % self.stats_interval == 0:
+            logger.info(
+                "%s cache: %d hits, %d misses, hit ratio %.2f",
+                self.prefix,
+                self.hits,
+                self.misses,
+                self.hit_ratio,
+            )
+
+    @property
+    def hit_ratio(self):
+        """Share of lookups served from the cache since the process started"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class TieredCache(CacheStatsMixin):
+    """
+    A process local LRU in front of an optional shared django cache backend.
+
+    without a shared backend entries live only in this process and are
+    invalidated by the signals of this process, the local ttl bounds how
+    long other processes may serve a stale entry. With a shared backend
+    invalidations reach every process on their next local miss.
+    """
+
+    def __init__(self, prefix, maxsize=1024, local_ttl=None, alias=None, timeout=300):
+        self.prefix = prefix
+        self.local = LocalLRUCache(maxsize=maxsize, ttl=local_ttl)
+        self.alias = alias
+        self.timeout = timeout
+
+    @property
+    def shared(self):
+        if self.alias is None:
+            return None
+        return caches[self.alias]
+
+    def make_key(self, key):
+        return f"{self.prefix}:{key}"
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            value = self.shared.get(self.make_key(key))
+            if value is not None:
+                self.local.set(key, value)
+        self.record_lookup(value is not None)
+        return value
+
+    def set(self, key, value):
+        self.local.set(key, value)
+        if self.shared is not None:
+            self.shared.set(self.make_key(key), value, self.timeout)
+
+    def delete(self, key):
+        self.local.delete(key)
+        if self.shared is not None:
+            self.shared.delete(self.make_key(key))
+
+    def clear(self):
+        """Clears the local entries and counters, shared entries expire by their timeout"""
+        self.local.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+class VersionedCache(CacheStatsMixin):
+    """
+    Shared cache for data that must not outlive its invalidation, like
+    authorization data. Every key has a generation counter in the shared
+    backend that invalidate() bumps, entries are stored with the generation
+    read before loading them and only served while it is still current.
+
+    every lookup reads the counter and the entry in one round trip, so an
+    invalidation reaches all processes at once and a value loaded while a
+    concurrent invalidation committed is never served. There is no process
+    local tier and without a shared backend nothing is cached.
+    """
+
+    def __init__(self, prefix, alias=None, timeout=300, stats_interval=None):
+        self.prefix = prefix
+        self.alias = alias
+        self.timeout = timeout
+        self.stats_interval = stats_interval
+
+    @property
+    def shared(self):
+        if self.alias is None:
+            return None
+        return caches[self.alias]
+
+    def make_key(self, key):
+        return f"{self.prefix}:{key}"
+
+    def make_generation_key(self, key):
+        return f"{self.prefix}:generation:{key}"
+
+    def get_generation(self, key):
+        ## a counter lost to eviction restarts above any value it had before
+        self.shared.add(self.make_generation_key(key), time.time_ns(), None)
+        return self.shared.get(self.make_generation_key(key))
+
+    def get(self, key):
+        """
+        Returns (value, generation), value is None on a miss.
+        Pass the generation to set() when storing the value loaded after it.
+        """
+        if self.shared is None:
+            self.record_lookup(False)
+            return None, None
+        generation_key = self.make_generation_key(key)
+        values = self.shared.get_many([generation_key, self.make_key(key)])
+        generation = values.get(generation_key)
+        entry = values.get(self.make_key(key))
+        if generation is None:
+            generation = self.get_generation(key)
+        if entry is None or entry[0] != generation:
+            self.record_lookup(False)
+            return None, generation
+        self.record_lookup(True)
+        return entry[1], generation
+
+    def set(self, key, value, generation):
+        if self.shared is not None and generation is not None:
+            self.shared.set(self.make_key(key), (generation, value), self.timeout)
+
+    def invalidate(self, key):
+        """Makes every entry of key stored so far stale in all processes"""
+        if self.shared is None:
+            return
+        try:
+            self.shared.incr(self.make_generation_key(key))
+        except ValueError:
+            self.get_generation(key)
+        self.shared.delete(self.make_key(key))
+
+    def clear(self):
+        """Resets the counters, shared entries expire by their timeout"""
+        self.hits = 0
+        self.misses = 0
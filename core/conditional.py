@@ -0,0 +1,30 @@
+import hashlib
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    """Builds a strong ETag from everything the representation depends on"""
+    value = ":".join(str(part) for part in parts)
+    return quote_etag(hashlib.md5(value.encode()).hexdigest())
+
+
+def not_modified(request, etag, last_modified=None):
+    """
+    Returns a 304 response when the client's If-None-Match or
+    If-Modified-Since shows its copy is current, otherwise None.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return None
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None or response.status_code != 304:
+        return None
+    return add_conditional_headers(response, etag, last_modified)
+
+
+def add_conditional_headers(response, etag, last_modified=None):
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
@@ -0,0 +1,86 @@
+from collections import Counter, defaultdict
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from core.models import Project, Task
+
+
+## counter column of the project for each task status
+STATUS_COUNT_FIELDS = {
+    "TODO": "todo_count",
+    "PROG": "progress_count",
+    "DONE": "done_count",
+}
+
+
+def update_status_counts(project_id, deltas):
+    """
+    Adds deltas, a mapping of status to a number of tasks,
+    to the counters of the project in a single UPDATE.
+    """
+    values = {
+        STATUS_COUNT_FIELDS[task_status]: F(STATUS_COUNT_FIELDS[task_status]) + delta
+        for task_status, delta in deltas.items()
+        if delta
+    }
+    if values:
+        ## the counters are part of the project representation
+        Project.objects.filter(pk=project_id).update(
+            updated_at=timezone.now(), **values
+        )
+
+
+def count_status_changes(changes):
+    """Deltas of (old status, new status) pairs, None for created or deleted"""
+    deltas = Counter()
+    for old_status, new_status in changes:
+        if old_status == new_status:
+            continue
+        if old_status is not None:
+            deltas[old_status] -= 1
+        if new_status is not None:
+            deltas[new_status] += 1
+    return deltas
+
+
+def count_overdue_tasks():
+    """
+    Annotation counting the open tasks of a project past their due date,
+    unlike the status counters it changes with time so it is not stored.
+    """
+    overdue = (
+        Task.objects.filter(project=OuterRef("pk"), due_date__lt=timezone.now())
+        .exclude(status="DONE")
+        .order_by()
+        .values("project")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    return Coalesce(Subquery(overdue), 0)
+
+
+def repair_status_counts(batch_size=500):
+    """
+    Recomputes the status counters of all projects from a single
+    GROUP BY over the tasks and returns the number of projects fixed.
+    """
+    counts = defaultdict(dict)
+    rows = Task.objects.order_by().values_list("project_id", "status")
+    for project_id, task_status, count in rows.annotate(count=Count("id")):
+        counts[project_id][task_status] = count
+
+    fields = list(STATUS_COUNT_FIELDS.values())
+    now = timezone.now()
+    fixed = []
+    for project in Project.objects.only("id", *fields).iterator(chunk_size=batch_size):
+        changed = False
+        for task_status, field in STATUS_COUNT_FIELDS.items():
+            count = counts.get(project.pk, {}).get(task_status, 0)
+            if getattr(project, field) != count:
+                setattr(project, field, count)
+                changed = True
+        if changed:
+            project.updated_at = now
+            fixed.append(project)
+    Project.objects.bulk_update(fixed, fields + ["updated_at"], batch_size=batch_size)
+    return len(fixed)
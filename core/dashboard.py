@@ -0,0 +1,104 @@
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
+from django.dispatch import receiver
+from django.utils import timezone
+from core.cache import TieredCache
+from core.counters import count_overdue_tasks
+from core.models import TeamMember, Project
+
+
+_dashboard_cache = None
+
+
+def get_dashboard_cache():
+    """
+    Returns the cache of team dashboards keyed by team id, configured by
+    the DASHBOARD_CACHE setting. Writes invalidate the dashboards, the
+    timeout bounds how long overdue counts lag behind the clock.
+    """
+    global _dashboard_cache
+    if _dashboard_cache is None:
+        options = getattr(settings, "DASHBOARD_CACHE", {})
+        _dashboard_cache = TieredCache(
+            "dashboard",
+            maxsize=options.get("MAX_TEAMS", 1000),
+            local_ttl=options.get("LOCAL_TTL", 60),
+            alias=options.get("ALIAS", None),
+            timeout=options.get("TIMEOUT", 60),
+        )
+    return _dashboard_cache
+
+
+@receiver(setting_changed)
+def reset_dashboard_cache(setting, **kwargs):
+    global _dashboard_cache
+    if setting == "DASHBOARD_CACHE":
+        _dashboard_cache = None
+
+
+def invalidate_dashboards(*team_ids):
+    """Drops the cached dashboards of team_ids now and after the commit"""
+
+    def invalidate():
+        cache = get_dashboard_cache()
+        for team_id in team_ids:
+            cache.delete(team_id)
+
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+def build_dashboard(team_id):
+    """
+    Aggregates the members, projects and workload of a team in two
+    grouped queries, the status counts come from the project counters.
+    """
+    now = timezone.now()
+    ## tasks of projects being deleted are left out like the projects
+    listed = Q(tasks__project__deleting=False)
+    open_tasks = listed & ~Q(tasks__status="DONE")
+    workload = list(
+        TeamMember.objects.filter(team_id=team_id, deleting=False)
+        .order_by("id")
+        .values("id", "is_admin", username=F("user__username"))
+        .annotate(
+            todo=Count("tasks", filter=listed & Q(tasks__status="TODO")),
+            progress=Count("tasks", filter=listed & Q(tasks__status="PROG")),
+            overdue=Count("tasks", filter=open_tasks & Q(tasks__due_date__lt=now)),
+        )
+    )
+    projects = list(
+        Project.objects.filter(team_id=team_id, deleting=False)
+        .order_by("id")
+        .annotate(overdue_count=count_overdue_tasks())
+        .values(
+            "id",
+            "name",
+            "todo_count",
+            "progress_count",
+            "done_count",
+            "overdue_count",
+        )
+    )
+    return {
+        "team": team_id,
+        "member_count": len(workload),
+        "overdue_count": sum(project["overdue_count"] for project in projects),
+        "projects": projects,
+        "workload": workload,
+        "generated_at": now,
+    }
+
+
+def get_dashboard(team_id):
+    """Returns the dashboard of the team from cache or database"""
+    cache = get_dashboard_cache()
+    dashboard = cache.get(team_id)
+    if dashboard is None:
+        dashboard = build_dashboard(team_id)
+        ## rows read inside a transaction may still be rolled back
+        if not connection.in_atomic_block:
+            cache.set(team_id, dashboard)
+    return dashboard
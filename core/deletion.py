@@ -0,0 +1,150 @@
+"""
+Deletes rows with their cascades in bounded chunks instead of the ORM
+collector, which loads every related object into memory first.
+Children are deleted before their parents, so an interrupted deletion
+only leaves whole parents behind and running it again resumes it.
+"""
+
+from collections import Counter, defaultdict
+from django.db import connections, router, transaction
+from django.db.models import CASCADE, SET_NULL, DO_NOTHING
+from django.utils import timezone
+from core.models import TeamMember, Project, Task, TaskTombstone
+from core.membership import invalidate_memberships
+from core.events import publish_on_commit
+from core.counters import update_status_counts
+from core.dashboard import invalidate_dashboards
+
+
+def tasks_deleted(rows):
+    deltas = defaultdict(Counter)
+    for row in rows:
+        deltas[row["project_id"]][row["status"]] -= 1
+    ## the projects may be deleted next, cheaper than telling them apart
+    for project_id, project_deltas in deltas.items():
+        update_status_counts(project_id, project_deltas)
+    invalidate_dashboards(*{row["project__team_id"] for row in rows})
+    TaskTombstone.objects.bulk_create(
+        [
+            TaskTombstone(
+                task_id=row["id"],
+                project_id=row["project_id"],
+                team_id=row["project__team_id"],
+            )
+            for row in rows
+        ]
+    )
+    for row in rows:
+        publish_on_commit(
+            "task.deleted",
+            row["project__team_id"],
+            id=row["id"],
+            project_id=row["project_id"],
+        )
+
+
+def projects_deleted(rows):
+    invalidate_dashboards(*{row["team_id"] for row in rows})
+    for row in rows:
+        publish_on_commit("project.deleted", row["team_id"], id=row["id"])
+
+
+def members_deleted(rows):
+    invalidate_memberships(*{row["user_id"] for row in rows})
+    invalidate_dashboards(*{row["team_id"] for row in rows})
+    for row in rows:
+        publish_on_commit(
+            "member.deleted", row["team_id"], id=row["id"], user_id=row["user_id"]
+        )
+
+
+## what the delete signals of these models do for the rows of a chunk,
+## with the columns the hook needs, raw deletes do not send signals
+DELETE_HOOKS = {
+    Task: (["id", "project_id", "project__team_id", "status"], tasks_deleted),
+    Project: (["id", "team_id"], projects_deleted),
+    TeamMember: (["id", "team_id", "user_id"], members_deleted),
+}
+
+
+def get_relations(model):
+    """Reverse foreign keys to model, cascades first as they may remove rows"""
+    relations = []
+    ## the same candidates as the collector, hidden relations like
+    ## related_name="+" are missing from _meta.related_objects
+    for relation in model._meta.get_fields(include_hidden=True):
+        if not (relation.auto_created and not relation.concrete):
+            continue
+        if relation.many_to_many or relation.on_delete is DO_NOTHING:
+            continue
+        if relation.on_delete not in (CASCADE, SET_NULL):
+            raise ValueError(
+                f"{relation.related_model.__name__}.{relation.field.name} "
+                "is neither CASCADE nor SET_NULL"
+            )
+        relations.append(relation)
+    return sorted(relations, key=lambda relation: relation.on_delete is not CASCADE)
+
+
+def get_chunk_size(model, chunk_size, using):
+    ## stay below the number of query parameters allowed by the database
+    ops = connections[using].ops
+    return min(chunk_size, ops.bulk_batch_size([model._meta.pk], [None] * chunk_size))
+
+
+def raw_delete(model, ids, using):
+    connection = connections[using]
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(model._meta.pk.column)
+    placeholders = ", ".join(["%s"] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE {column} IN ({placeholders})", ids)
+
+
+def set_null_in_chunks(queryset, field, chunk_size):
+    model = queryset.model
+    values = {field.name: None}
+    for model_field in model._meta.fields:
+        ## update() skips auto_now, mark the rows as changed for syncing clients
+        if getattr(model_field, "auto_now", False):
+            values[model_field.name] = timezone.now()
+    using = router.db_for_write(model)
+    chunk_size = get_chunk_size(model, chunk_size, using)
+    while True:
+        ids = list(queryset.order_by("pk").values_list("pk", flat=True)[:chunk_size])
+        if not ids:
+            return
+        model._base_manager.using(using).filter(pk__in=ids).update(**values)
+
+
+def delete_in_chunks(queryset, chunk_size=1000, progress=None):
+    """
+    Deletes the rows of queryset and everything cascading from them in
+    transactions of at most chunk_size rows, walking the foreign keys bottom-up.
+    Related rows are selected with subqueries so memory does not grow with
+    the number of rows. progress is called with the model and the number
+    of rows of each deleted chunk.
+    """
+    model = queryset.model
+    for relation in get_relations(model):
+        related = relation.related_model._base_manager.filter(
+            **{f"{relation.field.name}__in": queryset.values("pk")}
+        )
+        if relation.on_delete is CASCADE:
+            delete_in_chunks(related, chunk_size, progress)
+        else:
+            set_null_in_chunks(related, relation.field, chunk_size)
+
+    fields, hook = DELETE_HOOKS.get(model, (["pk"], None))
+    using = router.db_for_write(model)
+    chunk_size = get_chunk_size(model, chunk_size, using)
+    while True:
+        with transaction.atomic(using=using):
+            rows = list(queryset.order_by("pk").values(*fields)[:chunk_size])
+            if not rows:
+                return
+            raw_delete(model, [row[fields[0]] for row in rows], using)
+            if hook is not None:
+                hook(rows)
+        if progress is not None:
+            progress(model, len(rows))
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import threading
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    """Queue of events delivered to one stream in its own event loop"""
+
+    def __init__(self, loop, maxsize):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def deliver(self, event):
+        ## runs in the loop of the subscriber
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout=None):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class LocalBroker:
+    """
+    In process publish/subscribe of change events, publishers may run
+    in any thread. Deployments with several processes replace it with
+    a shared broker implementing the same methods via EVENT_BROKER.
+    """
+
+    def __init__(self, queue_size=1000):
+        self.queue_size = queue_size
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, loop=None):
+        loop = loop or asyncio.get_running_loop()
+        subscription = Subscription(loop, self.queue_size)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            if subscription.loop.is_closed():
+                continue
+            subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        broker_class = import_string(
+            getattr(settings, "EVENT_BROKER", "core.events.LocalBroker")
+        )
+        _broker = broker_class()
+    return _broker
+
+
+def publish_on_commit(event_type, team_id, **data):
+    """Publishes the event once the change is committed and visible to readers"""
+    event = {"type": event_type, "team_id": team_id, **data}
+    transaction.on_commit(lambda: get_broker().publish(event))
+
+
+def format_event(event):
+    """Formats an event as a server-sent event message"""
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
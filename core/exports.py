@@ -0,0 +1,120 @@
+"""
+Streams large exports as JSON Lines or CSV, the rows are fetched in
+chunks while the response is written so memory does not grow with them.
+"""
+
+import csv
+from itertools import islice
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+from core.renderers import FastJSONRenderer
+
+
+## rows fetched per database round trip by the exports
+EXPORT_CHUNK_SIZE = 2000
+
+## lines sent per message by the exports served by the ASGI application
+EXPORT_ASYNC_BATCH_SIZE = 200
+
+## leading characters spreadsheets read as the start of a formula
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+EXPORT_CONTENT_TYPES = {
+    "jsonl": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def iterate_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yields the .values() rows of queryset in id order, chunk_size at a time"""
+    queryset = queryset.order_by("id")
+    settings_dict = connections[queryset.db].settings_dict
+    if not settings_dict.get("DISABLE_SERVER_SIDE_CURSORS", False):
+        yield from queryset.iterator(chunk_size=chunk_size)
+        return
+    ## behind a transaction pooler the driver would buffer the whole
+    ## result of a client side cursor, fetch keyset chunks instead
+    last_pk = None
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(id__gt=last_pk)
+        rows = list(chunk[:chunk_size])
+        if not rows:
+            return
+        yield from rows
+        last_pk = rows[-1]["id"]
+
+
+class Echo:
+    """File-like object returning what is written, for the csv writer"""
+
+    def write(self, value):
+        return value
+
+
+def stream_jsonl(items):
+    renderer = FastJSONRenderer()
+    for item in items:
+        yield renderer.render(item) + b"\n"
+
+
+def escape_csv_value(value):
+    """Quotes strings a spreadsheet would run as a formula with a leading '"""
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(items, fields):
+    writer = csv.DictWriter(Echo(), fieldnames=fields)
+    yield writer.writeheader()
+    for item in items:
+        yield writer.writerow(
+            {key: escape_csv_value(value) for key, value in item.items()}
+        )
+
+
+async def stream_async(content, batch_size=EXPORT_ASYNC_BATCH_SIZE):
+    """
+    Yields the chunks of the sync iterator content batch_size at a time,
+    read in the thread of the sync code. Django would otherwise buffer the
+    whole of a sync iterator in memory before an ASGI response is sent.
+    """
+    content = iter(content)
+    next_batch = sync_to_async(lambda: list(islice(content, batch_size)))
+    while True:
+        batch = await next_batch()
+        if not batch:
+            return
+        yield b"".join(
+            chunk if isinstance(chunk, bytes) else chunk.encode() for chunk in batch
+        )
+
+
+def export_response(request, serializer_class, queryset, filename):
+    """
+    Streams queryset through serializer_class, a ValuesSerializer with
+    the fields of the CSV header, in the type of ?type=jsonl (default) or csv.
+    """
+    export_type = request.query_params.get("type", "jsonl")
+    if export_type not in EXPORT_CONTENT_TYPES:
+        return Response(
+            {"detail": f"type must be one of {', '.join(EXPORT_CONTENT_TYPES)}."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    rows = iterate_rows(serializer_class.apply(queryset))
+    items = serializer_class(rows, context={"request": request}).iterate()
+    if export_type == "csv":
+        content = stream_csv(items, serializer_class.fields)
+    else:
+        content = stream_jsonl(items)
+    if isinstance(request._request, ASGIRequest):
+        content = stream_async(content)
+    response = StreamingHttpResponse(
+        content, content_type=EXPORT_CONTENT_TYPES[export_type]
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{export_type}"'
+    return response
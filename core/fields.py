@@ -0,0 +1,52 @@
+from rest_framework import serializers
+from core.reverse import url_template
+
+
+class CachedHyperlinkMixin:
+    """
+    Formats the urls of hyperlinked fields into a url template, the route
+    is resolved once per process and the host added once per request.
+    Ids other than integers are quoted by reverse() and go through it.
+    """
+
+    def get_url_kwarg_names(self):
+        return [self.lookup_url_kwarg]
+
+    def get_url_kwargs(self, obj):
+        return {self.lookup_url_kwarg: getattr(obj, self.lookup_field)}
+
+    def get_url_template(self, view_name, request, format):
+        cached = getattr(self, "_url_template", None)
+        if (
+            cached is None
+            or cached[0] is not request
+            or cached[1] != (view_name, format)
+        ):
+            template = url_template(
+                view_name, self.get_url_kwarg_names(), request=request, format=format
+            )
+            cached = self._url_template = (request, (view_name, format), template)
+        return cached[2]
+
+    def get_url(self, obj, view_name, request, format):
+        ## unsaved objects do not have a url
+        if hasattr(obj, "pk") and obj.pk in (None, ""):
+            return None
+        kwargs = self.get_url_kwargs(obj)
+        if any(type(value) is not int for value in kwargs.values()):
+            return self.reverse(
+                view_name, kwargs=kwargs, request=request, format=format
+            )
+        return self.get_url_template(view_name, request, format).format(**kwargs)
+
+
+class CachedHyperlinkedRelatedField(
+    CachedHyperlinkMixin, serializers.HyperlinkedRelatedField
+):
+    """HyperlinkedRelatedField formatting its urls into a cached template"""
+
+
+class CachedHyperlinkedIdentityField(
+    CachedHyperlinkMixin, serializers.HyperlinkedIdentityField
+):
+    """HyperlinkedIdentityField formatting its urls into a cached template"""
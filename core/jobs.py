@@ -0,0 +1,191 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from core.models import Job, Team, TeamMember, Project, Task, Comment
+from core.deletion import delete_in_chunks
+
+
+## handlers are imported when a job of their kind runs
+JOB_HANDLERS = {
+    "team.delete": "core.jobs.delete_team",
+    "project.delete": "core.jobs.delete_project",
+    "member.delete": "core.jobs.delete_member",
+    "task.bulk_create": "project.jobs.bulk_create_tasks",
+}
+
+
+def get_job_option(name, default):
+    return getattr(settings, "JOBS", {}).get(name, default)
+
+
+def enqueue_job(kind, payload, user=None, total=None):
+    """Stores a job for the run_jobs worker, handlers get the job as argument"""
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind {kind}")
+    return Job.objects.create(kind=kind, payload=payload, created_by=user, total=total)
+
+
+def delete_in_background(instance, kind, user=None):
+    """
+    Marks instance as deleting and returns the job deleting it, a job
+    for instance that is still pending or running is reused instead of
+    enqueuing another. Rows stay hidden if their job fails for good,
+    deleting them again enqueues a new job.
+    """
+    key = f"{instance._meta.model_name}_id"
+    with transaction.atomic():
+        ## the row lock makes concurrent deletes of instance wait here
+        type(instance).objects.filter(pk=instance.pk).update(deleting=True)
+        instance.deleting = True
+        job = (
+            Job.objects.filter(
+                kind=kind,
+                status__in=["PENDING", "RUNNING"],
+                **{f"payload__{key}": instance.pk},
+            )
+            .order_by("id")
+            .first()
+        )
+        if job is None:
+            job = enqueue_job(kind, {key: instance.pk}, user=user)
+    return job
+
+
+def report_progress(job, count):
+    """Adds count processed rows to the job, also serves as heartbeat"""
+    job.progress += count
+    Job.objects.filter(pk=job.pk).update(
+        progress=F("progress") + count, updated_at=timezone.now()
+    )
+
+
+def set_total(job, total):
+    """Records the number of rows the job is going to process"""
+    if job.total is None:
+        job.total = total
+        Job.objects.filter(pk=job.pk).update(total=total)
+
+
+def claim_job():
+    """
+    Locks the next due job and marks it as running, jobs running
+    for longer than STALE_AFTER without progress are claimed again.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=get_job_option("STALE_AFTER", 600))
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status="PENDING", run_after__lte=now)
+                | Q(status="RUNNING", updated_at__lt=stale)
+            )
+            .order_by("run_after", "id")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = "RUNNING"
+        job.attempts += 1
+        job.started_at = job.started_at or now
+        job.save(update_fields=["status", "attempts", "started_at", "updated_at"])
+    return job
+
+
+def run_job(job):
+    """Runs the handler of a claimed job and records its outcome"""
+    try:
+        handler = import_string(JOB_HANDLERS[job.kind])
+        result = handler(job)
+    except Exception as exc:
+        job.error = f"{type(exc).__name__}: {exc}"
+        if job.attempts >= get_job_option("MAX_ATTEMPTS", 3):
+            job.status = "FAILED"
+            job.finished_at = timezone.now()
+        else:
+            ## handlers resume from the chunks already committed
+            job.status = "PENDING"
+            delay = get_job_option("RETRY_BACKOFF", 30) * 2 ** (job.attempts - 1)
+            job.run_after = timezone.now() + timedelta(seconds=delay)
+    else:
+        job.status = "DONE"
+        job.result = result
+        job.error = ""
+        job.finished_at = timezone.now()
+    job.save(
+        update_fields=[
+            "status",
+            "result",
+            "error",
+            "run_after",
+            "finished_at",
+            "updated_at",
+        ]
+    )
+    return job
+
+
+def run_jobs(limit=None):
+    """Runs due jobs one after another and returns the number of jobs run"""
+    count = 0
+    while limit is None or count < limit:
+        job = claim_job()
+        if job is None:
+            break
+        run_job(job)
+        count += 1
+    return count
+
+
+def delete_with_progress(job, queryset):
+    """Deletes queryset in chunks reporting the rows deleted per model"""
+    deleted = {}
+
+    def progress(model, count):
+        label = model._meta.label
+        deleted[label] = deleted.get(label, 0) + count
+        report_progress(job, count)
+
+    delete_in_chunks(queryset, get_job_option("CHUNK_SIZE", 1000), progress)
+    return {"deleted": deleted}
+
+
+def delete_project(job):
+    projects = Project.objects.filter(pk=job.payload["project_id"])
+    tasks = Task.objects.filter(project__in=projects)
+    set_total(
+        job,
+        Comment.objects.filter(task__in=tasks).count()
+        + tasks.count()
+        + projects.count(),
+    )
+    return delete_with_progress(job, projects)
+
+
+def delete_team(job):
+    teams = Team.objects.filter(pk=job.payload["team_id"])
+    tasks = Task.objects.filter(project__team__in=teams)
+    set_total(
+        job,
+        Comment.objects.filter(task__in=tasks).count()
+        + tasks.count()
+        + Project.objects.filter(team__in=teams).count()
+        + TeamMember.objects.filter(team__in=teams).count()
+        + teams.count(),
+    )
+    return delete_with_progress(job, teams)
+
+
+def delete_member(job):
+    members = TeamMember.objects.filter(pk=job.payload["teammember_id"])
+    tasks = Task.objects.filter(created_by__in=members)
+    set_total(
+        job,
+        Comment.objects.filter(task__in=tasks).count()
+        + tasks.count()
+        + members.count(),
+    )
+    return delete_with_progress(job, members)
@@ -0,0 +1,135 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from core.models import QueuedEmail
+
+
+def get_email_queue_option(name, default):
+    return getattr(settings, "EMAIL_QUEUE", {}).get(name, default)
+
+
+def enqueue_email(subject, body, from_email, to, html_body=""):
+    """Stores an e-mail in the outbox instead of sending it in the request"""
+    return QueuedEmail.objects.create(
+        subject=subject,
+        body=body,
+        html_body=html_body or "",
+        from_email=from_email,
+        to=to,
+    )
+
+
+def record_failure(email, exc, now):
+    email.attempts += 1
+    email.last_error = f"{type(exc).__name__}: {exc}"
+    if email.attempts >= get_email_queue_option("MAX_ATTEMPTS", 5):
+        email.status = "FAILED"
+        email.body = email.html_body = ""
+    else:
+        ## exponential backoff, 1, 2, 4, ... times RETRY_BACKOFF seconds
+        email.status = "PENDING"
+        delay = get_email_queue_option("RETRY_BACKOFF", 60) * 2 ** (email.attempts - 1)
+        email.next_attempt_at = now + timedelta(seconds=delay)
+
+
+def build_message(email, connection):
+    message = EmailMultiAlternatives(
+        email.subject, email.body, email.from_email, [email.to], connection=connection
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, "text/html")
+    return message
+
+
+def claim_emails(batch_size, now):
+    """
+    Marks a batch of due e-mails as SENDING until SEND_TIMEOUT seconds
+    from now and returns them, e-mails of a worker that died while sending
+    are due again after that. The claim is an UPDATE of the rows that are
+    still due, so even without row locks (SQLite) two workers never claim
+    the same e-mail, the lease moment tells the rows of this worker apart.
+    """
+    lease = now + timedelta(seconds=get_email_queue_option("SEND_TIMEOUT", 300))
+    due = Q(status__in=["PENDING", "SENDING"], next_attempt_at__lte=now)
+    with transaction.atomic():
+        ids = list(
+            QueuedEmail.objects.select_for_update(skip_locked=True)
+            .filter(due)
+            .order_by("next_attempt_at", "id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        QueuedEmail.objects.filter(due, pk__in=ids).update(
+            status="SENDING", next_attempt_at=lease
+        )
+    return list(
+        QueuedEmail.objects.filter(
+            pk__in=ids, status="SENDING", next_attempt_at=lease
+        ).order_by("id")
+    )
+
+
+def send_queued_emails(batch_size=None):
+    """
+    Sends one batch of due e-mails over a single connection of
+    EMAIL_BACKEND and returns the number of e-mails processed.
+    The batch is claimed in a short transaction and sent outside of it,
+    so several workers can run at once. Bodies are blanked once sent,
+    they may hold live tokens like the ones of password resets.
+    """
+    batch_size = batch_size or get_email_queue_option("BATCH_SIZE", 100)
+    now = timezone.now()
+    emails = claim_emails(batch_size, now)
+    if not emails:
+        return 0
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as exc:
+        for email in emails:
+            record_failure(email, exc, now)
+    else:
+        try:
+            for email in emails:
+                try:
+                    build_message(email, connection).send()
+                except Exception as exc:
+                    record_failure(email, exc, now)
+                else:
+                    email.status = "SENT"
+                    email.sent_at = timezone.now()
+                    email.body = email.html_body = ""
+        finally:
+            connection.close()
+
+    QueuedEmail.objects.bulk_update(
+        emails,
+        [
+            "status",
+            "attempts",
+            "next_attempt_at",
+            "last_error",
+            "sent_at",
+            "body",
+            "html_body",
+        ],
+    )
+    return len(emails)
+
+
+def purge_emails():
+    """
+    Deletes the sent and failed e-mails older than RETENTION_DAYS,
+    returns the number of e-mails deleted.
+    """
+    days = get_email_queue_option("RETENTION_DAYS", 7)
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = QueuedEmail.objects.filter(
+        status__in=["SENT", "FAILED"], created_at__lt=cutoff
+    ).delete()
+    return deleted
@@ -0,0 +1,60 @@
+import io
+import json
+from django.conf import settings
+from django.test import RequestFactory
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer, orjson
+from .benchmark_serializers import Command as BenchmarkCommand
+
+
+class Command(BenchmarkCommand):
+    help = (
+        "Measures the rows per second the json renderer and the fast renderer "
+        "write for the large list endpoints, and parse for a bulk task import. "
+        "Test data is created in a transaction that is rolled back, run it on "
+        "a development database."
+    )
+
+    def compare(self, name, rows, before, after, options):
+        before_rate = self.measure(before, rows, options["repeat"])
+        after_rate = self.measure(after, rows, options["repeat"])
+        self.stdout.write(
+            f"{name}: {rows} rows, json {before_rate:.0f} rows/s, "
+            f"fast {after_rate:.0f} rows/s ({after_rate / before_rate:.1f}x), "
+            f"identical {before() == after()}"
+        )
+
+    def report(self, options):
+        if orjson is None:
+            self.stdout.write("orjson is not installed, measuring the fallback")
+        host = next(
+            (host for host in settings.ALLOWED_HOSTS if host[:1] not in ("*", ".")),
+            "localhost",
+        )
+        context = {"request": RequestFactory(SERVER_NAME=host).get("/")}
+        for name, _, values_class, queryset in self.get_cases():
+            queryset = values_class.apply(queryset.order_by("id"))
+            data = {"results": values_class(queryset, context).data}
+            self.compare(
+                name,
+                len(data["results"]),
+                lambda: JSONRenderer().render(data),
+                lambda: FastJSONRenderer().render(data),
+                options,
+            )
+
+        body = json.dumps(
+            [
+                {"title": f"Task {i}", "status": "TODO", "assigned_to": i}
+                for i in range(options["rows"])
+            ]
+        ).encode()
+        self.compare(
+            "task bulk import",
+            options["rows"],
+            lambda: JSONParser().parse(io.BytesIO(body)),
+            lambda: FastJSONParser().parse(io.BytesIO(body)),
+            options,
+        )
@@ -0,0 +1,135 @@
+import statistics
+import time
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from core.models import Team, TeamMember, Project, Task
+from core.counters import count_overdue_tasks
+from project.query_plans import apply_query_plan
+from project.serializers import (
+    ProjectListSerializer,
+    ProjectListValuesSerializer,
+    TaskListSerializer,
+    TaskListValuesSerializer,
+)
+from team.serializers import (
+    TeamListSerializer,
+    TeamListValuesSerializer,
+    TeamMemberSerializer,
+    TeamMemberValuesSerializer,
+)
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures the rows per second of the list serializers and their "
+        ".values() counterparts, including the query. Test data is created "
+        "in a transaction that is rolled back, run it on a development database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def create_rows(self, size):
+        users = get_user_model().objects.bulk_create(
+            [
+                get_user_model()(
+                    username=f"benchmark-{i}", email=f"benchmark-{i}@example.com"
+                )
+                for i in range(size)
+            ],
+            batch_size=1000,
+        )
+        teams = Team.objects.bulk_create(
+            [Team(name=f"Team {i}") for i in range(size)], batch_size=1000
+        )
+        members = TeamMember.objects.bulk_create(
+            [TeamMember(user=user, team=teams[0]) for user in users], batch_size=1000
+        )
+        projects = Project.objects.bulk_create(
+            [Project(name=f"Project {i}", team=teams[0]) for i in range(size)],
+            batch_size=1000,
+        )
+        Task.objects.bulk_create(
+            [
+                Task(
+                    title=f"Task {i}",
+                    project=projects[0],
+                    created_by=members[0],
+                    assigned_to=members[i] if i % 2 else None,
+                )
+                for i in range(size)
+            ],
+            batch_size=1000,
+        )
+
+    def get_cases(self):
+        return [
+            ("task list", TaskListSerializer, TaskListValuesSerializer, Task.objects),
+            (
+                "project list",
+                ProjectListSerializer,
+                ProjectListValuesSerializer,
+                Project.objects.annotate(overdue_count=count_overdue_tasks()),
+            ),
+            ("team list", TeamListSerializer, TeamListValuesSerializer, Team.objects),
+            (
+                "team members",
+                TeamMemberSerializer,
+                TeamMemberValuesSerializer,
+                TeamMember.objects.select_related("user"),
+            ),
+        ]
+
+    def measure(self, func, rows, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return rows / statistics.median(timings)
+
+    def report(self, options):
+        ## urls are built for a host the request validation accepts
+        host = next(
+            (host for host in settings.ALLOWED_HOSTS if host[:1] not in ("*", ".")),
+            "localhost",
+        )
+        context = {"request": RequestFactory(SERVER_NAME=host).get("/")}
+        for name, serializer_class, values_class, queryset in self.get_cases():
+            queryset = queryset.order_by("id")
+            rows = queryset.count()
+            before = self.measure(
+                lambda: serializer_class(
+                    apply_query_plan(queryset, serializer_class),
+                    many=True,
+                    context=context,
+                ).data,
+                rows,
+                options["repeat"],
+            )
+            after = self.measure(
+                lambda: values_class(values_class.apply(queryset), context).data,
+                rows,
+                options["repeat"],
+            )
+            self.stdout.write(
+                f"{name}: {rows} rows, serializer {before:.0f} rows/s, "
+                f"values {after:.0f} rows/s ({after / before:.1f}x)"
+            )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.create_rows(options["rows"])
+                self.report(options)
+                raise Rollback
+        except Rollback:
+            pass
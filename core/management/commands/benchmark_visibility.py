@@ -0,0 +1,91 @@
+import statistics
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from core.models import Team, TeamMember, Project
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the plan and latency of the project visibility filters "
+        "for users with the given numbers of teams. Test data is created "
+        "in a transaction that is rolled back, run it on a development database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000])
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument(
+            "--max-id-list",
+            type=int,
+            default=30000,
+            help="Largest IN list measured, databases limit the query parameters",
+        )
+
+    def create_memberships(self, size):
+        user = get_user_model().objects.create_user(
+            username=f"benchmark-{size}", email=f"benchmark-{size}@example.com"
+        )
+        teams = Team.objects.bulk_create(
+            [Team(name=f"Team {i}") for i in range(size)], batch_size=1000
+        )
+        TeamMember.objects.bulk_create(
+            [TeamMember(user=user, team=team) for team in teams], batch_size=1000
+        )
+        projects = Project.objects.bulk_create(
+            [Project(name=f"Project {i}", team=team) for i, team in enumerate(teams)],
+            batch_size=1000,
+        )
+        return user, [team.pk for team in teams], projects[len(projects) // 2].pk
+
+    def get_filters(self, user, team_ids, max_id_list):
+        member_teams = TeamMember.objects.filter(user=user).values("team_id")
+        filters = [
+            ("join", lambda: Project.objects.filter(team__member__user=user)),
+            ("subquery", lambda: Project.objects.filter(team_id__in=member_teams)),
+        ]
+        if len(team_ids) <= max_id_list:
+            filters.append(
+                ("id list", lambda: Project.objects.filter(team_id__in=team_ids))
+            )
+        return filters
+
+    def measure(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
+
+    def report(self, size, user, team_ids, project_id, options):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{size} memberships:"))
+        for name, build in self.get_filters(user, team_ids, options["max_id_list"]):
+            detail = self.measure(
+                lambda: build().filter(pk=project_id).first(), options["repeat"]
+            )
+            page = self.measure(
+                lambda: list(build().order_by("id")[:50]), options["repeat"]
+            )
+            self.stdout.write(
+                f"  {name}: detail {detail:.2f} ms, first page {page:.2f} ms"
+            )
+            plan = build().filter(pk=project_id).explain()
+            for line in plan.splitlines():
+                self.stdout.write(f"    {line}")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Database: {connection.vendor}")
+        for size in options["sizes"]:
+            try:
+                with transaction.atomic():
+                    user, team_ids, project_id = self.create_memberships(size)
+                    self.report(size, user, team_ids, project_id, options)
+                    raise Rollback
+            except Rollback:
+                pass
@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from core.models import Task, TeamMember
+from core.pagination import IdCursorPagination, TaskCursorPagination
+from project.serializers import MyTaskListValuesSerializer, TaskListValuesSerializer
+from project.views import ProjectViewSet
+from team.serializers import TeamMemberValuesSerializer
+from team.views import TeamViewSet
+
+
+class Command(BaseCommand):
+    help = "Prints the EXPLAIN plan of the main query of each list endpoint"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--email", help="Explain the queries as this user, defaults to the first"
+        )
+
+    def get_view_queryset(self, viewset, user, action):
+        view = viewset()
+        view.request = SimpleNamespace(user=user)
+        view.action = action
+        view.format_kwarg = None
+        return view.get_queryset()
+
+    def get_queries(self, user):
+        project_id = (
+            self.get_view_queryset(ProjectViewSet, user, "list")
+            .values_list("id", flat=True)
+            .first()
+        )
+        team_id = (
+            TeamMember.objects.filter(user=user)
+            .values_list("team_id", flat=True)
+            .first()
+        )
+        ordering = IdCursorPagination.ordering
+        return [
+            (
+                "project list",
+                self.get_view_queryset(ProjectViewSet, user, "list").order_by(ordering),
+            ),
+            (
+                "project detail",
+                self.get_view_queryset(ProjectViewSet, user, "retrieve").filter(
+                    pk=project_id
+                ),
+            ),
+            (
+                "task list",
+                TaskListValuesSerializer.apply(
+                    Task.objects.filter(project_id=project_id)
+                ).order_by(*TaskCursorPagination.ordering),
+            ),
+            (
+                "my tasks",
+                MyTaskListValuesSerializer.apply(
+                    Task.objects.filter(assigned_to__user=user)
+                ).order_by(*TaskCursorPagination.ordering),
+            ),
+            (
+                "team list",
+                self.get_view_queryset(TeamViewSet, user, "list").order_by(ordering),
+            ),
+            (
+                "team members",
+                TeamMemberValuesSerializer.apply(
+                    TeamMember.objects.filter(team_id=team_id)
+                ).order_by(ordering),
+            ),
+            ("user memberships", TeamMember.objects.filter(user=user)),
+        ]
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.order_by("id")
+        if options["email"]:
+            users = users.filter(email=options["email"])
+        user = users.first()
+        if user is None:
+            raise CommandError("No user found to explain the queries for.")
+
+        for name, queryset in self.get_queries(user):
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{name}:"))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(queryset.explain())
+            self.stdout.write("")
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.models import TaskTombstone
+from project.sync import get_tombstone_retention
+
+
+class Command(BaseCommand):
+    help = "Deletes task tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS"
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - get_tombstone_retention()
+        deleted, _ = TaskTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(f"Deleted {deleted} task tombstones.")
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from core.counters import repair_status_counts
+
+
+class Command(BaseCommand):
+    help = "Recomputes the task status counters of all projects"
+
+    def handle(self, *args, **options):
+        fixed = repair_status_counts()
+        self.stdout.write(f"Repaired the counters of {fixed} projects.")
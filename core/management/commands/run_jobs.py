@@ -0,0 +1,29 @@
+import time
+from django.core.management.base import BaseCommand
+from core.jobs import run_jobs
+
+
+class Command(BaseCommand):
+    help = "Runs the queued background jobs such as team and project deletions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling the queue for new jobs",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds between polls with --loop",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            count = run_jobs()
+            if count:
+                self.stdout.write(f"Ran {count} jobs.")
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,41 @@
+import time
+from django.core.management.base import BaseCommand
+from core.mail import purge_emails, send_queued_emails
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends the e-mails waiting in the outbox, retrying failures with backoff, "
+        "and deletes the ones sent or given up longer than RETENTION_DAYS ago"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling the outbox for new e-mails",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds between polls with --loop",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            processed = 0
+            while True:
+                count = send_queued_emails(options["batch_size"])
+                if not count:
+                    break
+                processed += count
+            if processed:
+                self.stdout.write(f"Processed {processed} queued e-mails.")
+            purged = purge_emails()
+            if purged:
+                self.stdout.write(f"Deleted {purged} old e-mails.")
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,133 @@
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connection, transaction
+from django.dispatch import receiver
+from core.cache import VersionedCache
+from core.models import TeamMember
+
+
+_membership_cache = None
+
+
+def get_membership_cache():
+    """
+    Returns the cross request cache of {team_id: [member_id, is_admin]}
+    maps keyed by user id, configured by the MEMBERSHIP_CACHE setting.
+    Entries are versioned per user, so a revoked membership is never
+    served again by any process that shares the cache alias.
+    """
+    global _membership_cache
+    if _membership_cache is None:
+        options = getattr(settings, "MEMBERSHIP_CACHE", {})
+        _membership_cache = VersionedCache(
+            "membership",
+            alias=options.get("ALIAS", None),
+            timeout=options.get("TIMEOUT", 300),
+        )
+    return _membership_cache
+
+
+@receiver(setting_changed)
+def reset_membership_cache(setting, **kwargs):
+    global _membership_cache
+    if setting == "MEMBERSHIP_CACHE":
+        _membership_cache = None
+
+
+def invalidate_memberships(*user_ids):
+    """
+    Bumps the cache generation of user_ids now and again after the
+    current transaction commits, so memberships loaded by a request
+    running in between are stored under a stale generation.
+    """
+
+    def invalidate():
+        cache = get_membership_cache()
+        for user_id in user_ids:
+            cache.invalidate(user_id)
+
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+def load_memberships(user):
+    """Returns {team_id: [member_id, is_admin]} of user from cache or database"""
+    cache = get_membership_cache()
+    memberships, generation = cache.get(user.id)
+    if memberships is None:
+        memberships = {
+            team_id: [member_id, is_admin]
+            for member_id, team_id, is_admin in TeamMember.objects.filter(
+                user=user, deleting=False
+            ).values_list("id", "team_id", "is_admin")
+        }
+        ## rows read inside a transaction may still be rolled back
+        if not connection.in_atomic_block:
+            cache.set(user.id, memberships, generation)
+    return memberships
+
+
+class MembershipResolver:
+    """
+    Loads all team memberships of a user with a single query
+    and answers membership and admin checks from memory afterwards.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._members = None
+
+    @property
+    def members(self):
+        """Mapping of team id to the user's TeamMember object of that team"""
+        if self._members is None:
+            self._members = {}
+            for team_id, (member_id, is_admin) in load_memberships(self.user).items():
+                member = TeamMember(
+                    id=member_id, team_id=team_id, user=self.user, is_admin=is_admin
+                )
+                member._state.adding = False
+                self._members[team_id] = member
+        return self._members
+
+    def get_member(self, team_id):
+        """Returns the user's TeamMember of team_id or None if not a member"""
+        try:
+            team_id = int(team_id)
+        except (TypeError, ValueError):
+            return None
+        return self.members.get(team_id, None)
+
+    def is_member(self, team_id):
+        return self.get_member(team_id) is not None
+
+    def is_admin(self, team_id):
+        member = self.get_member(team_id)
+        return member is not None and member.is_admin
+
+    def remember(self, member):
+        """Records a membership created during the request"""
+        if self._members is not None:
+            member.user = self.user
+            self._members[member.team_id] = member
+
+
+def get_membership_resolver(request):
+    """Returns the membership resolver of the request, creating it on first use"""
+    resolver = getattr(request, "_membership_resolver", None)
+    if resolver is None or resolver.user != request.user:
+        resolver = MembershipResolver(request.user)
+        request._membership_resolver = resolver
+    return resolver
+
+
+def filter_visible_teams(request, queryset, field="team_id"):
+    """
+    Restricts queryset to the rows whose field is one of the user's teams.
+    The teams are read with a subquery over the user's memberships in the
+    same query, unlike a join through the members it does not repeat rows.
+    """
+    member_teams = TeamMember.objects.filter(user=request.user, deleting=False).values(
+        "team_id"
+    )
+    return queryset.filter(**{f"{field}__in": member_teams})
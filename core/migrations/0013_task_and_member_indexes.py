@@ -0,0 +1,38 @@
+# Generated by Django 4.2.10 on 2026-10-17 04:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_alter_project_team"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["project", "created_at"], name="task_project_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["project", "status"], name="task_project_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["assigned_to", "status", "due_date"],
+                name="task_assignee_status_due_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="teammember",
+            index=models.Index(
+                fields=["user", "team", "is_admin"], name="member_user_team_admin_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.10 on 2026-10-17 04:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0014_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("task_id", models.BigIntegerField()),
+                ("project_id", models.BigIntegerField()),
+                ("team_id", models.BigIntegerField()),
+                ("deleted_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["project_id", "deleted_at"],
+                        name="tombstone_project_idx",
+                    ),
+                    models.Index(
+                        fields=["team_id", "deleted_at"], name="tombstone_team_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
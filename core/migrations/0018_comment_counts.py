@@ -0,0 +1,46 @@
+# Generated by Django 4.2.10 on 2026-10-17 04:15
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_comments(apps, schema_editor):
+    Task = apps.get_model("core", "Task")
+    Comment = apps.get_model("core", "Comment")
+    comments = Comment.objects.filter(task=OuterRef("pk")).order_by().values("task")
+    Task.objects.filter(pk__in=Comment.objects.values("task")).update(
+        comment_count=Coalesce(
+            Subquery(comments.annotate(count=Count("id")).values("count")), 0
+        ),
+        last_comment_at=Subquery(
+            comments.annotate(last=Max("created_at")).values("last")
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0017_job"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="last_comment_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["task", "created_at"], name="comment_task_created_idx"
+            ),
+        ),
+        migrations.RunPython(count_comments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.10 on 2026-10-17 04:19
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_tasks(apps, schema_editor):
+    Task = apps.get_model("core", "Task")
+    Project = apps.get_model("core", "Project")
+    fields = {"TODO": "todo_count", "PROG": "progress_count", "DONE": "done_count"}
+    counts = {}
+    rows = Task.objects.order_by().values_list("project_id", "status")
+    for project_id, status, count in rows.annotate(count=Count("id")):
+        counts.setdefault(project_id, {})[fields[status]] = count
+    for project_id, values in counts.items():
+        Project.objects.filter(pk=project_id).update(**values)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0018_comment_counts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="done_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="progress_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="todo_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_tasks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.10 on 2026-10-17 04:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0019_project_status_counts"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="queuedemail",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("PENDING", "Pending"),
+                    ("SENDING", "Sending"),
+                    ("SENT", "Sent"),
+                    ("FAILED", "Failed"),
+                ],
+                default="PENDING",
+                max_length=7,
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.10 on 2026-10-17 04:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0020_queuedemail_sending"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="deleting",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="team",
+            name="deleting",
+            field=models.BooleanField(default=False),
+        ),
+    ]
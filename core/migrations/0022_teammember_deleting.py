@@ -0,0 +1,29 @@
+# Generated by Django 4.2.10 on 2026-10-17 05:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0021_team_project_deleting"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="teammember",
+            name="member_user_team_admin_idx",
+        ),
+        migrations.AddField(
+            model_name="teammember",
+            name="deleting",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name="teammember",
+            index=models.Index(
+                fields=["user", "team", "is_admin", "deleting"],
+                name="member_user_team_admin_idx",
+            ),
+        ),
+    ]
@@ -1,6 +1,7 @@
-from django.db import models
+from django.db import models, router, transaction
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 
@@ -11,6 +12,14 @@ class CustomUser(AbstractUser):
     ## put username in required_fields to ask for it when creating superuser in command line.
     REQUIRED_FIELDS = ["username"]
 
+    def refresh_from_db(self, using=None, fields=None):
+        ## users authenticated from the token cache have only id and is_active,
+        ## the first deferred field accessed loads the others with it
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred and set(fields) <= deferred:
+            fields = list(deferred)
+        super().refresh_from_db(using=using, fields=fields)
+
 
 class Team(models.Model):
     EDIT_PERMISSION_CHOICES = [
@@ -27,6 +36,9 @@ class Team(models.Model):
     privacy_edit = models.CharField(
         max_length=5, choices=EDIT_PERMISSION_CHOICES, default="ALL"
     )
+    updated_at = models.DateTimeField(auto_now=True)
+    ## set while a background job deletes the team, hidden from the API
+    deleting = models.BooleanField(default=False)
 
     def __str__(self):
         return self.name
@@ -36,9 +48,19 @@ class TeamMember(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="member")
     is_admin = models.BooleanField(default=False)
+    ## set while a background job deletes the member with the tasks
+    ## it created, hidden from the API and from membership checks
+    deleting = models.BooleanField(default=False)
 
     class Meta:
         unique_together = ["user", "team"]
+        indexes = [
+            ## covers membership and admin checks without reading the table
+            models.Index(
+                fields=["user", "team", "is_admin", "deleting"],
+                name="member_user_team_admin_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} -> {self.team.name}"
@@ -50,6 +72,13 @@ class Project(models.Model):
     team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="projects")
     deadline = models.DateField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    ## number of tasks per status, kept up to date by core.counters
+    todo_count = models.PositiveIntegerField(default=0)
+    progress_count = models.PositiveIntegerField(default=0)
+    done_count = models.PositiveIntegerField(default=0)
+    ## set while a background job deletes the project, hidden from the API
+    deleting = models.BooleanField(default=False)
 
     def __str__(self):
         return f"{self.name}-{self.team.name}"
@@ -75,6 +104,62 @@ class Task(models.Model):
         max_length=4, choices=PROJECT_STATUS_CHOICES, default="TODO"
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    ## kept up to date by the comment signals
+    comment_count = models.PositiveIntegerField(default=0)
+    last_comment_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["project", "created_at"], name="task_project_created_idx"
+            ),
+            models.Index(fields=["project", "status"], name="task_project_status_idx"),
+            models.Index(
+                fields=["assigned_to", "status", "due_date"],
+                name="task_assignee_status_due_idx",
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        ## the status counters of the project need the status before a change
+        if "status" in field_names:
+            instance._loaded_status = values[field_names.index("status")]
+        return instance
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        update_fields = kwargs.get("update_fields")
+        with transaction.atomic(using=using):
+            ## the status before the change is read under a lock of the row,
+            ## concurrent updates of the task then adjust the counters once each
+            if not self._state.adding and (
+                update_fields is None or "status" in update_fields
+            ):
+                self._loaded_status = (
+                    Task.objects.using(using)
+                    .select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list("status", flat=True)
+                    .first()
+                )
+            super().save(*args, **kwargs)
+
+    def delete(self, using=None, keep_parents=False):
+        using = using or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            ## counted down by the stored status, read under a lock of the row
+            ## like in save(), None when the task is already gone
+            self._loaded_status = (
+                Task.objects.using(using)
+                .select_for_update()
+                .filter(pk=self.pk)
+                .values_list("status", flat=True)
+                .first()
+            )
+            return super().delete(using=using, keep_parents=keep_parents)
 
     def __str__(self):
         return f"{self.title} -> {self.assigned_to.user.username}"
@@ -85,3 +170,99 @@ class Comment(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="comments")
     body = models.TextField(blank=False)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["task", "created_at"], name="comment_task_created_idx"
+            ),
+        ]
+
+
+class TaskTombstone(models.Model):
+    """
+    Records a deleted task so syncing clients can drop it,
+    ids are kept as plain integers because the rows they
+    pointed to may be deleted as well.
+    """
+
+    task_id = models.BigIntegerField()
+    project_id = models.BigIntegerField()
+    team_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["project_id", "deleted_at"], name="tombstone_project_idx"
+            ),
+            models.Index(fields=["team_id", "deleted_at"], name="tombstone_team_idx"),
+        ]
+
+
+class QueuedEmail(models.Model):
+    """E-mail waiting in the outbox to be sent by the send_queued_emails worker"""
+
+    STATUS_CHOICES = [
+        ("PENDING", "Pending"),
+        ("SENDING", "Sending"),
+        ("SENT", "Sent"),
+        ("FAILED", "Failed"),
+    ]
+    subject = models.CharField(max_length=255)
+    ## blanked once the e-mail is sent or given up
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254)
+    to = models.EmailField()
+    status = models.CharField(max_length=7, choices=STATUS_CHOICES, default="PENDING")
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="email_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to}"
+
+
+class Job(models.Model):
+    """Heavy operation run in chunks by the run_jobs worker outside of requests"""
+
+    STATUS_CHOICES = [
+        ("PENDING", "Pending"),
+        ("RUNNING", "Running"),
+        ("DONE", "Done"),
+        ("FAILED", "Failed"),
+    ]
+    kind = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=7, choices=STATUS_CHOICES, default="PENDING")
+    ## number of rows processed so far, total when it is known up front
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(blank=True, null=True)
+    result = models.JSONField(blank=True, null=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, on_delete=models.SET_NULL
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    ## also the heartbeat of running jobs, it changes with every progress report
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="job_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} ({self.status})"
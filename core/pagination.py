@@ -0,0 +1,50 @@
+from django.conf import settings
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Keyset pagination with opaque cursors ordered by id.
+    unlike offset pagination the cost of a page does not grow with its depth
+    and rows inserted while paging do not shift the following pages.
+    """
+
+    ordering = "id"
+    page_size_query_param = "page_size"
+    max_page_size = getattr(settings, "PAGINATION_MAX_PAGE_SIZE", 200)
+
+
+class TaskCursorPagination(IdCursorPagination):
+    """
+    Keyset pagination for tasks, newest first by default, id breaks ties.
+    the ordering query parameter selects one of the whitelisted sort keys.
+    the cursor only encodes the position of the first key, so only columns
+    that never change after insert can be used. Sorting by editable columns
+    like title or status lets a task jump between pages while paging, and
+    nullable columns like due_date can not be a cursor position at all.
+    other keys are rejected like invalid filter values.
+    """
+
+    ordering = ("-created_at", "-id")
+    ordering_param = "ordering"
+    ordering_fields = ["created_at"]
+
+    def get_ordering(self, request, queryset, view):
+        field = request.query_params.get(self.ordering_param, "")
+        if not field:
+            return self.ordering
+        if field.lstrip("-") not in self.ordering_fields:
+            choices = ", ".join(self.ordering_fields)
+            raise ValidationError(
+                {self.ordering_param: [f"Tasks can only be sorted by {choices}."]}
+            )
+        if field.startswith("-"):
+            return (field, "-id")
+        return (field, "id")
+
+
+class CommentCursorPagination(IdCursorPagination):
+    """Keyset pagination for comment threads, oldest first"""
+
+    ordering = ("created_at", "id")
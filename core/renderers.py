@@ -0,0 +1,53 @@
+import math
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer writing compact responses with orjson when it is installed,
+    everything else and any value orjson can not write goes through the
+    json module like before. Dates, times, decimals and lazy strings are
+    converted by DRF's encoder so they come out exactly as before.
+    Native floats are written in the shortest form with exponents as 1e16
+    instead of 1e+16 and NaN as null, the API itself returns no floats.
+    """
+
+    encoder = encoders.JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.encoder_class is not encoders.JSONEncoder
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            ## the json module raises the same errors as before
+            return super().render(data, accepted_media_type, renderer_context)
+        ## escaped like the json renderer, keeps the output a javascript subset
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028")
+            ret = ret.replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+    def default(self, obj):
+        ret = self.encoder.default(obj)
+        ## decimals become floats, leave the ones written differently to json
+        if isinstance(ret, float) and (not math.isfinite(ret) or "e" in repr(ret)):
+            raise TypeError(f"{obj!r} is written by the json module")
+        return ret
@@ -0,0 +1,22 @@
+from rest_framework import serializers
+from core.models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """Serializer for the status of background jobs"""
+
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "kind",
+            "status",
+            "progress",
+            "total",
+            "result",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
@@ -0,0 +1,124 @@
+from django.db.models import F, Max, OuterRef, Subquery
+from django.db.models.signals import post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from core.models import Team, TeamMember, Project, Task, TaskTombstone, Comment
+from core.membership import invalidate_memberships
+from core.events import publish_on_commit
+from core.dashboard import invalidate_dashboards
+from core.counters import update_status_counts, count_status_changes
+
+
+@receiver(post_save, sender=TeamMember)
+@receiver(post_delete, sender=TeamMember)
+def team_member_changed(sender, instance, **kwargs):
+    invalidate_memberships(instance.user_id)
+    invalidate_dashboards(instance.team_id)
+    event_type = "member.deleted" if kwargs["signal"] is post_delete else "member.saved"
+    publish_on_commit(
+        event_type, instance.team_id, id=instance.pk, user_id=instance.user_id
+    )
+
+
+@receiver(pre_delete, sender=TeamMember)
+def team_member_deleting(sender, instance, **kwargs):
+    ## assigned_to is set to null by the deletion collector which
+    ## skips auto_now, mark the tasks as changed for syncing clients
+    Task.objects.filter(assigned_to=instance).update(updated_at=timezone.now())
+
+
+def get_task_team_id(task, origin=None):
+    """Returns the team of a task without a query where possible"""
+    if Task.project.is_cached(task):
+        return task.project.team_id
+    if isinstance(origin, Team):
+        return origin.pk
+    if isinstance(origin, (Project, TeamMember)):
+        return origin.team_id
+    return (
+        Project.objects.filter(pk=task.project_id)
+        .values_list("team_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, origin=None, **kwargs):
+    ## the status the task was loaded with, the one in the database
+    status = getattr(instance, "_loaded_status", instance.status)
+    ## the counters of a project deleted with its tasks are not needed
+    if status is not None and not (
+        isinstance(origin, Project) and origin.pk == instance.project_id
+    ):
+        update_status_counts(instance.project_id, {status: -1})
+    team_id = get_task_team_id(instance, origin)
+    invalidate_dashboards(team_id)
+    TaskTombstone.objects.create(
+        task_id=instance.pk, project_id=instance.project_id, team_id=team_id
+    )
+    publish_on_commit(
+        "task.deleted", team_id, id=instance.pk, project_id=instance.project_id
+    )
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, update_fields=None, **kwargs):
+    ## saves leaving the status out of update_fields keep the stored one
+    if update_fields is None or "status" in update_fields:
+        old_status = None if created else getattr(instance, "_loaded_status", None)
+        if created or old_status is not None:
+            update_status_counts(
+                instance.project_id,
+                count_status_changes([(old_status, instance.status)]),
+            )
+        instance._loaded_status = instance.status
+    team_id = get_task_team_id(instance)
+    invalidate_dashboards(team_id)
+    publish_on_commit(
+        "task.saved", team_id, id=instance.pk, project_id=instance.project_id
+    )
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, **kwargs):
+    invalidate_dashboards(instance.team_id)
+    publish_on_commit("project.saved", instance.team_id, id=instance.pk)
+
+
+@receiver(post_delete, sender=Project)
+def project_deleted(sender, instance, **kwargs):
+    invalidate_dashboards(instance.team_id)
+    publish_on_commit("project.deleted", instance.team_id, id=instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    ## updated_at changes too as the task lists show the comment count
+    if created:
+        Task.objects.filter(pk=instance.task_id).update(
+            comment_count=F("comment_count") + 1,
+            last_comment_at=instance.created_at,
+            updated_at=timezone.now(),
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, origin=None, **kwargs):
+    ## comments deleted along with their task need no counting
+    if (
+        not isinstance(origin, Comment)
+        and getattr(origin, "model", None) is not Comment
+    ):
+        return
+    last_comment = (
+        Comment.objects.filter(task=OuterRef("pk"))
+        .order_by()
+        .values("task")
+        .annotate(last=Max("created_at"))
+        .values("last")
+    )
+    Task.objects.filter(pk=instance.task_id).update(
+        comment_count=F("comment_count") - 1,
+        last_comment_at=Subquery(last_comment),
+        updated_at=timezone.now(),
+    )
@@ -0,0 +1,69 @@
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from core.models import Project, Team, TeamMember, Task
+
+
+class TestExplainQueriesCommand(TestCase):
+    def test_explain_queries_uses_indexes(self):
+        """Test the plans of the endpoint queries are printed"""
+        user = get_user_model().objects.create_user(
+            email="test@example.com", username="testuser1", password="testpass123"
+        )
+        team = Team.objects.create(name="Test team")
+        TeamMember.objects.create(user=user, team=team, is_admin=True)
+        Project.objects.create(name="Project 1", team=team)
+
+        out = StringIO()
+        call_command("explain_queries", email=user.email, stdout=out)
+        output = out.getvalue()
+        self.assertIn("task list:", output)
+        ## the PostgreSQL planner scans tables this small sequentially
+        if connection.vendor == "sqlite":
+            self.assertIn("task_project_created_idx", output)
+            self.assertIn("member_user_team_admin_idx", output)
+
+    def test_explain_queries_without_users_fails(self):
+        """Test the command fails when there is no user"""
+        with self.assertRaises(CommandError):
+            call_command("explain_queries", stdout=StringIO())
+
+
+class TestBenchmarkVisibilityCommand(TestCase):
+    def test_benchmark_visibility_rolls_back(self):
+        """Test every filter is measured and the data is removed"""
+        out = StringIO()
+        call_command("benchmark_visibility", sizes=[5], repeat=1, stdout=out)
+        output = out.getvalue()
+        self.assertIn("5 memberships:", output)
+        for name in ("join:", "subquery:", "id list:"):
+            self.assertIn(name, output)
+        self.assertFalse(Team.objects.exists())
+        self.assertFalse(get_user_model().objects.exists())
+
+
+class TestBenchmarkSerializersCommand(TestCase):
+    def test_benchmark_serializers_rolls_back(self):
+        """Test every list is measured and the data is removed"""
+        out = StringIO()
+        call_command("benchmark_serializers", rows=3, repeat=1, stdout=out)
+        output = out.getvalue()
+        for name in ("task list:", "project list:", "team list:", "team members:"):
+            self.assertIn(name, output)
+        self.assertFalse(Task.objects.exists())
+        self.assertFalse(get_user_model().objects.exists())
+
+
+class TestBenchmarkRenderersCommand(TestCase):
+    def test_benchmark_renderers_output_is_identical(self):
+        """Test every list is rendered the same by both renderers"""
+        out = StringIO()
+        call_command("benchmark_renderers", rows=3, repeat=1, stdout=out)
+        output = out.getvalue()
+        for name in ("task list:", "team members:", "task bulk import:"):
+            self.assertIn(name, output)
+        self.assertNotIn("identical False", output)
+        self.assertFalse(Task.objects.exists())
@@ -0,0 +1,140 @@
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from core.counters import count_overdue_tasks
+from core.deletion import delete_in_chunks
+from core.models import Team, TeamMember, Project, Task
+
+
+def create_user(**params):
+    return get_user_model().objects.create_user(**params)
+
+
+class TestProjectCounters(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user1 = create_user(username="testUser1", email="test1@example.com")
+        cls.user2 = create_user(username="testUser2", email="test2@example.com")
+        cls.team = Team.objects.create(name="Test team")
+        cls.member1 = TeamMember.objects.create(user=cls.user1, team=cls.team)
+        cls.member2 = TeamMember.objects.create(user=cls.user2, team=cls.team)
+        cls.project = Project.objects.create(name="Project 1", team=cls.team)
+
+    def create_task(self, **params):
+        payload = {"title": "Task", "project": self.project, "created_by": self.member1}
+        payload.update(**params)
+        return Task.objects.create(**payload)
+
+    def assertCounts(self, todo, progress, done):
+        self.project.refresh_from_db()
+        self.assertEqual(
+            (
+                self.project.todo_count,
+                self.project.progress_count,
+                self.project.done_count,
+            ),
+            (todo, progress, done),
+        )
+
+    def test_counters_follow_task_writes(self):
+        """Test creating, updating and deleting tasks updates the counters"""
+        task = self.create_task()
+        self.create_task(status="DONE")
+        self.assertCounts(1, 0, 1)
+
+        task.status = "PROG"
+        task.save()
+        self.assertCounts(0, 1, 1)
+        ## saving again without a change counts nothing
+        task.save()
+        self.assertCounts(0, 1, 1)
+
+        task = Task.objects.get(pk=task.pk)
+        task.status = "DONE"
+        task.save()
+        self.assertCounts(0, 0, 2)
+
+        task.delete()
+        self.assertCounts(0, 0, 1)
+
+    def test_counters_with_stale_instances(self):
+        """Test concurrent changes of a task do not count a status twice"""
+        task = self.create_task()
+        first = Task.objects.get(pk=task.pk)
+        second = Task.objects.get(pk=task.pk)
+        first.status = "DONE"
+        first.save()
+        ## loaded before the first change, the stored status is DONE
+        second.status = "DONE"
+        second.save()
+        self.assertCounts(0, 0, 1)
+        second.status = "PROG"
+        second.save()
+        self.assertCounts(0, 1, 0)
+
+    def test_counters_with_stale_deletes(self):
+        """Test deleting a task changed since it was loaded counts its status"""
+        task = self.create_task()
+        stale = Task.objects.get(pk=task.pk)
+        task.status = "DONE"
+        task.save()
+        stale.delete()
+        self.assertCounts(0, 0, 0)
+        ## deleting it again counts nothing
+        task.delete()
+        self.assertCounts(0, 0, 0)
+
+    def test_counters_ignore_saves_without_status(self):
+        """Test saves leaving the status out do not change the counters"""
+        task = self.create_task()
+        task.status = "DONE"
+        task.save(update_fields=["title"])
+        self.assertCounts(1, 0, 0)
+        task.save()
+        self.assertCounts(0, 0, 1)
+
+    def test_counters_follow_member_removal(self):
+        """Test tasks deleted with the member who created them are counted"""
+        self.create_task(created_by=self.member2)
+        self.create_task(created_by=self.member1, status="PROG")
+        self.member2.delete()
+        self.assertCounts(0, 1, 0)
+
+    def test_counters_follow_chunked_deletion(self):
+        """Test tasks deleted in chunks of raw deletes are counted"""
+        for i in range(3):
+            self.create_task(created_by=self.member2)
+        self.create_task(status="DONE")
+        delete_in_chunks(TeamMember.objects.filter(pk=self.member2.pk), 2)
+        self.assertCounts(0, 0, 1)
+
+    def test_repair_command(self):
+        """Test the repair command recomputes drifted counters"""
+        self.create_task()
+        self.create_task(status="PROG")
+        empty_project = Project.objects.create(
+            name="Project 2", team=self.team, todo_count=4
+        )
+        Project.objects.filter(pk=self.project.pk).update(todo_count=7, done_count=1)
+
+        out = StringIO()
+        call_command("repair_project_counters", stdout=out)
+        self.assertIn("2 projects", out.getvalue())
+        self.assertCounts(1, 1, 0)
+        empty_project.refresh_from_db()
+        self.assertEqual(empty_project.todo_count, 0)
+
+    def test_overdue_count(self):
+        """Test open tasks past their due date are counted as overdue"""
+        past = timezone.now() - timedelta(days=1)
+        self.create_task(due_date=past)
+        self.create_task(due_date=past, status="DONE")
+        self.create_task(due_date=timezone.now() + timedelta(days=1))
+        self.create_task()
+        project = Project.objects.annotate(overdue_count=count_overdue_tasks()).get(
+            pk=self.project.pk
+        )
+        self.assertEqual(project.overdue_count, 1)
@@ -0,0 +1,27 @@
+from unittest import skipUnless
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from core.db import configure_sqlite
+
+
+@skipUnless(connection.vendor == "sqlite", "SQLite only")
+class TestSQLitePragmas(SimpleTestCase):
+    databases = {"default"}
+
+    def get_pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_connections_use_pragmas(self):
+        """Test new connections are configured by SQLITE_PRAGMAS"""
+        ## NORMAL and MEMORY
+        self.assertEqual(self.get_pragma("synchronous"), 1)
+        self.assertEqual(self.get_pragma("temp_store"), 2)
+
+    @override_settings(SQLITE_PRAGMAS={"cache_size": -1000})
+    def test_pragmas_from_settings(self):
+        """Test the pragmas are read from the settings"""
+        self.addCleanup(configure_sqlite, sender=None, connection=connection)
+        configure_sqlite(sender=None, connection=connection)
+        self.assertEqual(self.get_pragma("cache_size"), -1000)
@@ -0,0 +1,138 @@
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from core import deletion
+from core.deletion import delete_in_chunks
+from core.models import Team, TeamMember, Project, Task, Comment, TaskTombstone
+
+
+def create_user(**params):
+    return get_user_model().objects.create_user(**params)
+
+
+class TestChunkedDeletion(TransactionTestCase):
+    """
+    Rows are deleted with raw deletes, foreign keys are only checked
+    when the deletes are committed, so these tests commit them.
+    """
+
+    def setUp(self):
+        self.user1 = create_user(username="testUser1", email="test1@example.com")
+        self.user2 = create_user(username="testUser2", email="test2@example.com")
+        self.team = Team.objects.create(name="Test team")
+        self.member1 = TeamMember.objects.create(
+            user=self.user1, team=self.team, is_admin=True
+        )
+        self.member2 = TeamMember.objects.create(user=self.user2, team=self.team)
+        self.project = Project.objects.create(name="Project 1", team=self.team)
+        for i in range(5):
+            task = Task.objects.create(
+                title=f"Task {i}",
+                project=self.project,
+                created_by=self.member1,
+                assigned_to=self.member2,
+            )
+            Comment.objects.create(task=task, created_by=self.member2, body="Body")
+
+        ## a project of another team kept referencing members of the team
+        self.other_team = Team.objects.create(name="Other team")
+        self.other_member = TeamMember.objects.create(
+            user=self.user1, team=self.other_team
+        )
+        self.other_project = Project.objects.create(
+            name="Other project", team=self.other_team
+        )
+        self.other_task = Task.objects.create(
+            title="Other task",
+            project=self.other_project,
+            created_by=self.other_member,
+            assigned_to=self.member2,
+        )
+
+    def test_delete_team_in_chunks(self):
+        """Test a team is deleted with its cascades in bounded chunks"""
+        deleted = {}
+
+        def progress(model, count):
+            self.assertLessEqual(count, 2)
+            deleted[model] = deleted.get(model, 0) + count
+
+        delete_in_chunks(Team.objects.filter(pk=self.team.pk), 2, progress)
+        self.assertEqual(
+            deleted,
+            {Comment: 5, Task: 5, Project: 1, TeamMember: 2, Team: 1},
+        )
+        self.assertFalse(Team.objects.filter(pk=self.team.pk).exists())
+        self.assertEqual(Task.objects.get().pk, self.other_task.pk)
+        self.assertFalse(Comment.objects.exists())
+        ## SET_NULL relations are nulled and marked as changed
+        self.other_task.refresh_from_db()
+        self.assertIsNone(self.other_task.assigned_to_id)
+        self.assertGreater(self.other_task.updated_at, self.other_task.created_at)
+
+    def test_delete_member_with_hidden_relations(self):
+        """
+        Test deleting a member deletes the tasks it created, the relation
+        has no reverse accessor (related_name="+")
+        """
+        delete_in_chunks(TeamMember.objects.filter(pk=self.member1.pk), 2)
+        self.assertFalse(TeamMember.objects.filter(pk=self.member1.pk).exists())
+        self.assertFalse(Task.objects.filter(project=self.project).exists())
+        self.assertFalse(Comment.objects.exists())
+        self.assertTrue(Task.objects.filter(pk=self.other_task.pk).exists())
+
+    def test_delete_keeps_tombstones_and_events(self):
+        """Test the raw deletes record what the delete signals would"""
+        with mock.patch("core.deletion.publish_on_commit") as publish, mock.patch(
+            "core.deletion.invalidate_memberships"
+        ) as invalidate:
+            delete_in_chunks(Project.objects.filter(pk=self.project.pk), 2)
+            delete_in_chunks(TeamMember.objects.filter(pk=self.member2.pk), 2)
+
+        tombstones = TaskTombstone.objects.filter(team_id=self.team.pk)
+        self.assertEqual(tombstones.count(), 5)
+        self.assertEqual({t.project_id for t in tombstones}, {self.project.pk})
+        event_types = [call.args[0] for call in publish.call_args_list]
+        self.assertEqual(event_types.count("task.deleted"), 5)
+        self.assertEqual(event_types.count("project.deleted"), 1)
+        self.assertEqual(event_types.count("member.deleted"), 1)
+        invalidate.assert_called_once_with(self.user2.pk)
+
+    def test_delete_queries_do_not_grow_with_rows(self):
+        """Test the number of queries depends on the chunks, not the rows"""
+
+        def count_delete_queries(task_count):
+            project = Project.objects.create(name="Project", team=self.team)
+            for i in range(task_count):
+                task = Task.objects.create(
+                    title=f"Task {i}", project=project, created_by=self.member1
+                )
+                Comment.objects.create(task=task, created_by=self.member2, body="Body")
+            with CaptureQueriesContext(connection) as context:
+                delete_in_chunks(Project.objects.filter(pk=project.pk), 1000)
+            return len(context.captured_queries)
+
+        self.assertEqual(count_delete_queries(1), count_delete_queries(20))
+
+    def test_interrupted_delete_resumes(self):
+        """Test running a deletion again after a failure finishes it"""
+        raw_delete = deletion.raw_delete
+
+        def fail_on_project(model, ids, using):
+            if model is Project:
+                raise ConnectionError("db down")
+            return raw_delete(model, ids, using)
+
+        projects = Project.objects.filter(pk=self.project.pk)
+        with mock.patch("core.deletion.raw_delete", side_effect=fail_on_project):
+            with self.assertRaises(ConnectionError):
+                delete_in_chunks(projects, 2)
+        ## the committed chunks of tasks are gone, the project is left whole
+        self.assertFalse(Task.objects.filter(project=self.project).exists())
+        self.assertTrue(projects.exists())
+
+        delete_in_chunks(projects, 2)
+        self.assertFalse(projects.exists())
+        self.assertEqual(TaskTombstone.objects.count(), 5)
@@ -0,0 +1,98 @@
+import asyncio
+import json
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from core.events import LocalBroker, get_broker
+from core.models import Project, Task, Team, TeamMember
+from core.views import event_stream
+
+
+def create_user(**params):
+    return get_user_model().objects.create_user(**params)
+
+
+class TestLocalBroker(TestCase):
+    def test_publish_reaches_subscribers(self):
+        """Test published events are delivered to every subscriber"""
+        broker = LocalBroker()
+        loop = asyncio.new_event_loop()
+        first = broker.subscribe(loop)
+        second = broker.subscribe(loop)
+        broker.publish({"type": "task.saved", "team_id": 1})
+
+        self.assertEqual(loop.run_until_complete(first.get(1))["team_id"], 1)
+        self.assertEqual(loop.run_until_complete(second.get(1))["team_id"], 1)
+        broker.unsubscribe(second)
+        broker.publish({"type": "task.saved", "team_id": 2})
+        loop.run_until_complete(first.get(1))
+        self.assertTrue(second.queue.empty())
+        loop.close()
+
+    def test_full_queue_marks_overflow(self):
+        """Test a subscriber that can not keep up is marked as overflowed"""
+        broker = LocalBroker(queue_size=1)
+        loop = asyncio.new_event_loop()
+        subscription = broker.subscribe(loop)
+        broker.publish({"type": "task.saved", "team_id": 1})
+        broker.publish({"type": "task.saved", "team_id": 1})
+        loop.run_until_complete(subscription.get(1))
+        self.assertTrue(subscription.overflowed)
+        loop.close()
+
+
+class TestChangeEvents(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(username="testUser1", email="test1@example.com")
+        cls.team = Team.objects.create(name="Test team")
+        cls.member = TeamMember.objects.create(user=cls.user, team=cls.team)
+        cls.project = Project.objects.create(name="Project 1", team=cls.team)
+
+    def test_model_changes_are_published_on_commit(self):
+        """Test saving and deleting tasks publishes events after commit"""
+        loop = asyncio.new_event_loop()
+        subscription = get_broker().subscribe(loop)
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                task = Task.objects.create(
+                    title="Task", project=self.project, created_by=self.member
+                )
+            event = loop.run_until_complete(subscription.get(1))
+            self.assertEqual(event["type"], "task.saved")
+            self.assertEqual(event["team_id"], self.team.id)
+
+            task_id = task.id
+            with self.captureOnCommitCallbacks(execute=True):
+                task.delete()
+            event = loop.run_until_complete(subscription.get(1))
+            self.assertEqual(event["type"], "task.deleted")
+            self.assertEqual(event["id"], task_id)
+        finally:
+            get_broker().unsubscribe(subscription)
+            loop.close()
+
+    async def test_stream_limited_to_user_teams(self):
+        """Test the stream only sends events of the user's teams"""
+        broker = LocalBroker()
+        stream = event_stream(self.user, broker, heartbeat=1)
+        self.assertEqual(await stream.__anext__(), ": connected\n\n")
+
+        broker.publish({"type": "task.saved", "team_id": self.team.id + 1, "id": 1})
+        broker.publish({"type": "task.saved", "team_id": self.team.id, "id": 2})
+        message = await stream.__anext__()
+        self.assertTrue(message.startswith("event: task.saved\n"))
+        self.assertEqual(json.loads(message.split("data: ")[1])["id"], 2)
+
+        self.assertEqual(await stream.__anext__(), ": keep-alive\n\n")
+        await stream.aclose()
+
+    async def test_stream_requires_authentication(self):
+        """Test the event stream is not available without a token"""
+        res = await self.async_client.get(reverse("events"))
+        self.assertEqual(res.status_code, 401)
+
+    def test_stream_not_served_by_wsgi(self):
+        """Test the event stream is refused instead of blocking a WSGI worker"""
+        res = self.client.get(reverse("events"))
+        self.assertEqual(res.status_code, 501)
@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+from django.test import TestCase
+from django.urls import set_script_prefix, clear_script_prefix
+from rest_framework import serializers
+from rest_framework.reverse import reverse
+from rest_framework.test import APIRequestFactory
+from core.fields import CachedHyperlinkedIdentityField, CachedHyperlinkedRelatedField
+from core.reverse import reverse_markers
+from project.custom_serializer_fields import TaskDetailHyperlink
+
+
+class TeamLinkSerializer(serializers.Serializer):
+    url = serializers.HyperlinkedIdentityField(view_name="team:team-detail")
+    cached_url = CachedHyperlinkedIdentityField(view_name="team:team-detail")
+
+
+class ProjectLinkSerializer(serializers.Serializer):
+    team = serializers.HyperlinkedRelatedField(
+        view_name="team:team-detail", read_only=True
+    )
+    cached_team = CachedHyperlinkedRelatedField(
+        source="team", view_name="team:team-detail", read_only=True
+    )
+
+
+class TestCachedHyperlinkFields(TestCase):
+    def serialize(self, serializer_class, instances, path="/api/team/"):
+        request = APIRequestFactory().get(path, HTTP_HOST="testserver:8000")
+        serializer = serializer_class(
+            instances, many=True, context={"request": request}
+        )
+        return serializer.data
+
+    def test_identity_urls_are_identical(self):
+        """Test the cached identity urls equal the reversed urls"""
+        teams = [SimpleNamespace(pk=pk) for pk in (1, 42, 1000000)]
+        for path in ("/api/team/", "/api/team/?format=json&page_size=5"):
+            for row in self.serialize(TeamLinkSerializer, teams, path):
+                self.assertEqual(row["cached_url"], row["url"])
+
+    def test_related_urls_are_identical(self):
+        """Test the cached related urls equal the reversed urls"""
+        projects = [SimpleNamespace(pk=1, team=SimpleNamespace(pk=7))]
+        data = self.serialize(ProjectLinkSerializer, projects)
+        self.assertEqual(data[0]["cached_team"], data[0]["team"])
+
+    def test_script_prefix(self):
+        """Test the urls keep the prefix the app is mounted under"""
+        set_script_prefix("/app/")
+        self.addCleanup(clear_script_prefix)
+        data = self.serialize(TeamLinkSerializer, [SimpleNamespace(pk=3)])
+        self.assertIn("/app/api/team/3/", data[0]["url"])
+        self.assertEqual(data[0]["cached_url"], data[0]["url"])
+
+    def test_string_ids_use_reverse(self):
+        """Test ids other than integers are quoted like reverse() does"""
+        data = self.serialize(TeamLinkSerializer, [SimpleNamespace(pk="a b")])
+        self.assertEqual(data[0]["cached_url"], data[0]["url"])
+        self.assertIn("a%20b", data[0]["url"])
+
+    def test_route_is_resolved_once(self):
+        """Test a url template is reused across requests"""
+        tasks = [SimpleNamespace(pk=pk, project_id=5) for pk in range(3)]
+        field = TaskDetailHyperlink(view_name="project:task-detail")
+        reverse_markers.cache_clear()
+        for _ in range(2):
+            request = APIRequestFactory().get("/")
+            for task in tasks:
+                url = field.get_url(task, field.view_name, request, None)
+                self.assertEqual(
+                    url,
+                    reverse(
+                        "project:task-detail",
+                        kwargs={"pk": 5, "task_id": task.pk},
+                        request=request,
+                    ),
+                )
+        self.assertEqual(reverse_markers.cache_info().misses, 1)
@@ -0,0 +1,124 @@
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from datetime import timedelta
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from core import deletion
+from core.jobs import enqueue_job, run_jobs
+from core.models import Job, Team, TeamMember, Project, Task, TaskTombstone
+
+
+def job_detail_url(job_id):
+    return reverse("job-detail", kwargs={"pk": job_id})
+
+
+def create_user(**params):
+    return get_user_model().objects.create_user(**params)
+
+
+@override_settings(JOBS={"CHUNK_SIZE": 2, "MAX_ATTEMPTS": 2, "RETRY_BACKOFF": 30})
+class TestJobs(TransactionTestCase):
+    """
+    Jobs delete rows with raw deletes in their own transactions, committing
+    them makes the database check the foreign keys.
+    """
+
+    def setUp(self):
+        self.user = create_user(username="testUser1", email="test1@example.com")
+        self.team = Team.objects.create(name="Test team")
+        self.member = TeamMember.objects.create(
+            user=self.user, team=self.team, is_admin=True
+        )
+        self.project = Project.objects.create(name="Project 1", team=self.team)
+        for i in range(5):
+            Task.objects.create(
+                title=f"Task {i}", project=self.project, created_by=self.member
+            )
+
+    def test_delete_team_job(self):
+        """Test a team is deleted in chunks with tombstones for its tasks"""
+        job = enqueue_job("team.delete", {"team_id": self.team.pk}, user=self.user)
+        self.assertEqual(run_jobs(), 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "DONE")
+        self.assertEqual(
+            job.result,
+            {
+                "deleted": {
+                    "core.Task": 5,
+                    "core.Project": 1,
+                    "core.TeamMember": 1,
+                    "core.Team": 1,
+                }
+            },
+        )
+        self.assertEqual(job.total, 8)
+        self.assertEqual(job.progress, 8)
+        self.assertFalse(Team.objects.filter(pk=self.team.pk).exists())
+        self.assertFalse(TeamMember.objects.exists())
+        self.assertEqual(TaskTombstone.objects.filter(team_id=self.team.pk).count(), 5)
+
+    def test_delete_project_job_already_deleted(self):
+        """Test deleting a project deleted in the meantime succeeds"""
+        job = enqueue_job("project.delete", {"project_id": 0}, user=self.user)
+        run_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, "DONE")
+        self.assertEqual(job.result, {"deleted": {}})
+
+    def test_failed_job_is_retried_and_resumed(self):
+        """Test a failed job keeps its progress and is retried after a backoff"""
+        job = enqueue_job("project.delete", {"project_id": self.project.pk})
+        raw_delete = deletion.raw_delete
+
+        def fail_on_project(model, ids, using):
+            if model is Project:
+                raise ConnectionError("db down")
+            return raw_delete(model, ids, using)
+
+        with mock.patch("core.deletion.raw_delete", side_effect=fail_on_project):
+            run_jobs()
+            job.refresh_from_db()
+            self.assertEqual(job.status, "PENDING")
+            self.assertEqual(job.attempts, 1)
+            self.assertEqual(job.progress, 5)
+            self.assertGreater(job.run_after, timezone.now())
+            ## not due yet
+            self.assertEqual(run_jobs(), 0)
+
+            Job.objects.update(run_after=timezone.now())
+            run_jobs()
+            job.refresh_from_db()
+            self.assertEqual(job.status, "FAILED")
+            self.assertIn("db down", job.error)
+        self.assertFalse(Task.objects.exists())
+
+    def test_stale_running_job_is_claimed_again(self):
+        """Test a job left running by a crashed worker is run again"""
+        job = enqueue_job("project.delete", {"project_id": self.project.pk})
+        Job.objects.filter(pk=job.pk).update(
+            status="RUNNING", updated_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(run_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "DONE")
+        self.assertFalse(Project.objects.filter(pk=self.project.pk).exists())
+
+    def test_retrieve_job_status(self):
+        """Test users can see only the status of their own jobs"""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        job = enqueue_job("team.delete", {"team_id": self.team.pk}, user=self.user)
+        other_user = create_user(username="testUser2", email="test2@example.com")
+        other_job = enqueue_job("team.delete", {"team_id": 0}, user=other_user)
+
+        res = client.get(job_detail_url(job.pk))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["kind"], "team.delete")
+        self.assertEqual(res.data["status"], "PENDING")
+        res = client.get(job_detail_url(other_job.pk))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
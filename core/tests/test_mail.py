@@ -0,0 +1,129 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from core.mail import enqueue_email, purge_emails, send_queued_emails
+from core.models import QueuedEmail
+
+
+def queue_email(**params):
+    payload = {
+        "subject": "Subject",
+        "body": "Body",
+        "from_email": "noreply@example.com",
+        "to": "test@example.com",
+    }
+    payload.update(**params)
+    return enqueue_email(**payload)
+
+
+EMAIL_QUEUE = {
+    "BATCH_SIZE": 2,
+    "MAX_ATTEMPTS": 2,
+    "RETRY_BACKOFF": 60,
+    "SEND_TIMEOUT": 300,
+    "RETENTION_DAYS": 7,
+}
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    EMAIL_QUEUE=EMAIL_QUEUE,
+)
+class TestEmailQueue(TestCase):
+    def test_send_queued_emails_in_batches(self):
+        """Test due e-mails are sent in batches and marked as sent"""
+        for i in range(3):
+            queue_email(to=f"test{i}@example.com", html_body="<p>Body</p>")
+
+        self.assertEqual(send_queued_emails(), 2)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(send_queued_emails(), 1)
+        self.assertEqual(send_queued_emails(), 0)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].alternatives, [("<p>Body</p>", "text/html")])
+        self.assertFalse(QueuedEmail.objects.exclude(status="SENT").exists())
+        ## bodies may hold live tokens and are not kept once sent
+        self.assertFalse(QueuedEmail.objects.exclude(body="", html_body="").exists())
+
+    def test_failed_email_is_retried_with_backoff(self):
+        """Test a failed e-mail is retried later and given up after max attempts"""
+        email = queue_email()
+        with mock.patch(
+            "django.core.mail.EmailMultiAlternatives.send",
+            side_effect=ConnectionError("SMTP down"),
+        ):
+            send_queued_emails()
+            email.refresh_from_db()
+            self.assertEqual(email.status, "PENDING")
+            self.assertEqual(email.attempts, 1)
+            self.assertGreater(email.next_attempt_at, timezone.now())
+            ## not due yet
+            self.assertEqual(send_queued_emails(), 0)
+
+            QueuedEmail.objects.update(next_attempt_at=timezone.now())
+            send_queued_emails()
+            email.refresh_from_db()
+            self.assertEqual(email.status, "FAILED")
+            self.assertIn("SMTP down", email.last_error)
+            self.assertEqual(email.body, "")
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_claimed_email_is_not_sent_twice(self):
+        """Test an e-mail claimed by another worker is only sent once its lease expired"""
+        email = queue_email()
+        ## claimed by a worker that is still sending or died while sending
+        QueuedEmail.objects.filter(pk=email.pk).update(
+            status="SENDING", next_attempt_at=timezone.now() + timedelta(minutes=5)
+        )
+        self.assertEqual(send_queued_emails(), 0)
+
+        QueuedEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(send_queued_emails(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_old_emails_are_purged(self):
+        """Test sent and failed e-mails are deleted after the retention period"""
+        old = timezone.now() - timedelta(days=8)
+        for status in ("SENT", "FAILED", "PENDING"):
+            email = queue_email(subject=status)
+            QueuedEmail.objects.filter(pk=email.pk).update(
+                status=status, created_at=old
+            )
+        ## a retry of an old e-mail is not due yet
+        QueuedEmail.objects.filter(subject="PENDING").update(
+            next_attempt_at=timezone.now() + timedelta(minutes=5)
+        )
+        queue_email(subject="recent")
+        QueuedEmail.objects.filter(subject="recent").update(status="SENT")
+
+        out = StringIO()
+        call_command("send_queued_emails", stdout=out)
+        self.assertEqual(out.getvalue(), "Deleted 2 old e-mails.\n")
+        self.assertEqual(
+            set(QueuedEmail.objects.values_list("subject", flat=True)),
+            {"PENDING", "recent"},
+        )
+        self.assertEqual(purge_emails(), 0)
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    EMAIL_QUEUE=EMAIL_QUEUE,
+)
+class TestEmailQueueTransactions(TransactionTestCase):
+    def test_emails_are_sent_outside_of_transactions(self):
+        """Test no transaction is held open while talking to the mail server"""
+        queue_email()
+        in_transaction = []
+        with mock.patch(
+            "django.core.mail.EmailMultiAlternatives.send",
+            side_effect=lambda: in_transaction.append(connection.in_atomic_block),
+        ):
+            self.assertEqual(send_queued_emails(), 1)
+        self.assertEqual(in_transaction, [False])
+        self.assertEqual(QueuedEmail.objects.get().status, "SENT")
@@ -0,0 +1,155 @@
+import json
+from django.core.cache import caches
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from core.cache import LocalLRUCache, VersionedCache
+from core.membership import get_membership_cache, load_memberships
+from core.models import Team, TeamMember, Project
+
+
+class TestLocalLRUCache(SimpleTestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test the least recently used entry is evicted when full"""
+        cache = LocalLRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_expired_entry_is_not_returned(self):
+        """Test entries older than the ttl are not returned"""
+        cache = LocalLRUCache(maxsize=2, ttl=0)
+        cache.set("a", 1)
+        self.assertIsNone(cache.get("a"))
+
+
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "shared": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "membership-tests",
+        },
+    },
+    MEMBERSHIP_CACHE={"ALIAS": "shared"},
+)
+class TestMembershipCache(TransactionTestCase):
+    """
+    Entries are only cached outside of transactions,
+    so these tests can not run inside TestCase's transaction.
+    """
+
+    def setUp(self):
+        caches["shared"].clear()
+        get_membership_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", username="testUser1", password="TestPass123"
+        )
+        self.user2 = get_user_model().objects.create_user(
+            email="test2@example.com", username="testUser2", password="TestPass123"
+        )
+        self.team = Team.objects.create(name="Test team")
+        self.member = TeamMember.objects.create(
+            user=self.user, team=self.team, is_admin=True
+        )
+
+    def tearDown(self):
+        caches["shared"].clear()
+        get_membership_cache().clear()
+
+    def test_memberships_are_cached_across_requests(self):
+        """Test memberships are loaded from the database only once"""
+        expected = {self.team.id: [self.member.id, True]}
+        self.assertEqual(load_memberships(self.user), expected)
+        with self.assertNumQueries(0):
+            self.assertEqual(load_memberships(self.user), expected)
+
+    def test_invalidation_reaches_other_processes(self):
+        """Test an invalidation in one process makes the entry stale in others"""
+        load_memberships(self.user)
+        ## simulate another process sharing the cache alias
+        other = VersionedCache("membership", alias="shared")
+        self.assertIsNotNone(other.get(self.user.id)[0])
+
+        other.invalidate(self.user.id)
+        self.assertIsNone(get_membership_cache().get(self.user.id)[0])
+        with self.assertNumQueries(1):
+            load_memberships(self.user)
+
+    def test_entry_loaded_before_invalidation_is_not_served(self):
+        """Test storing an entry read before a revocation does not serve it"""
+        cache = get_membership_cache()
+        memberships, generation = cache.get(self.user.id)
+        self.assertIsNone(memberships)
+        stale = {self.team.id: [self.member.id, True]}
+        self.member.delete()
+        cache.set(self.user.id, stale, generation)
+
+        self.assertIsNone(cache.get(self.user.id)[0])
+        self.assertEqual(load_memberships(self.user), {})
+
+    def test_lost_generation_does_not_revive_entries(self):
+        """Test an evicted generation counter does not match older entries"""
+        cache = get_membership_cache()
+        load_memberships(self.user)
+        caches["shared"].delete(cache.make_generation_key(self.user.id))
+        self.assertIsNone(cache.get(self.user.id)[0])
+
+    @override_settings(MEMBERSHIP_CACHE={"ALIAS": None})
+    def test_not_cached_without_shared_alias(self):
+        """Test memberships are loaded per request without a shared cache"""
+        load_memberships(self.user)
+        with self.assertNumQueries(1):
+            load_memberships(self.user)
+
+    def test_member_save_and_delete_invalidate(self):
+        """Test saving or deleting a TeamMember drops the cached memberships"""
+        load_memberships(self.user)
+        self.member.is_admin = False
+        self.member.save()
+        self.assertEqual(load_memberships(self.user)[self.team.id][1], False)
+
+        self.member.delete()
+        self.assertEqual(load_memberships(self.user), {})
+
+    def test_bulk_member_paths_invalidate(self):
+        """Test adding and updating members in bulk drops the cached memberships"""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        url = reverse("team:team-members", args=[self.team.id])
+        self.assertEqual(load_memberships(self.user2), {})
+
+        payload = json.dumps([{"email": self.user2.email}])
+        res = client.post(url, payload, content_type="application/json")
+        self.assertEqual(res.status_code, 201)
+        member2 = TeamMember.objects.get(user=self.user2)
+        self.assertEqual(
+            load_memberships(self.user2)[self.team.id], [member2.id, False]
+        )
+
+        payload = json.dumps([{"id": member2.id, "is_admin": True}])
+        res = client.patch(url, payload, content_type="application/json")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(load_memberships(self.user2)[self.team.id], [member2.id, True])
+
+    def test_visible_projects_do_not_use_cached_team_ids(self):
+        """Test project lists read the memberships from the database"""
+        Project.objects.create(name="Project 1", team=self.team)
+        team2 = Team.objects.create(name="Team 2")
+        Project.objects.create(name="Project 2", team=team2)
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        url = reverse("project:project-list")
+        res = client.get(url)
+        self.assertEqual([item["name"] for item in res.data["results"]], ["Project 1"])
+        self.assertIn(self.team.id, load_memberships(self.user))
+
+        ## update sends no signal, the cached memberships are stale
+        TeamMember.objects.filter(pk=self.member.pk).update(team=team2)
+        res = client.get(url)
+        self.assertEqual([item["name"] for item in res.data["results"]], ["Project 2"])
@@ -0,0 +1,103 @@
+import io
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from unittest import mock
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+from core import parsers, renderers
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+
+
+DATA = {
+    "created_at": datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+    "local": datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=2))),
+    "naive": datetime(2024, 1, 2, 3, 4, 5),
+    "day": date(2024, 1, 2),
+    "time": time(3, 4, 5, 6),
+    "duration": timedelta(hours=1, microseconds=5),
+    "price": Decimal("10.10"),
+    "large": Decimal("1E+20"),
+    "small": Decimal("0.00001"),
+    "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "label": gettext_lazy("Team"),
+    "text": "Tâche \u2028 \u2029 </script>",
+    "nested": ReturnDict({"ids": (1, 2), "none": None, 1: True}, serializer=None),
+    "big": 2**70,
+    "ratio": 0.1,
+}
+
+
+class TestFastJSONRenderer(SimpleTestCase):
+    def assertSameRender(self, data, accepted_media_type=None, renderer_context=None):
+        expected = JSONRenderer().render(data, accepted_media_type, renderer_context)
+        ret = FastJSONRenderer().render(data, accepted_media_type, renderer_context)
+        self.assertEqual(ret, expected)
+
+    def test_same_output(self):
+        """Test the output is byte for byte the one of the json renderer"""
+        self.assertSameRender(DATA)
+        self.assertSameRender(
+            {key: value for key, value in DATA.items() if key != "big"}
+        )
+        self.assertSameRender([{"id": i, "title": f"Task {i}"} for i in range(100)])
+        self.assertSameRender(None)
+
+    def test_indent(self):
+        """Test indented output is still written by the json module"""
+        self.assertSameRender(DATA, "application/json; indent=4")
+        self.assertSameRender(DATA, renderer_context={"indent": 2})
+
+    def test_invalid_values(self):
+        """Test values that can not be written raise the same errors"""
+        for renderer in (JSONRenderer(), FastJSONRenderer()):
+            with self.assertRaises(TypeError):
+                renderer.render({"value": [object()]})
+            with self.assertRaises(ValueError):
+                renderer.render({"value": Decimal("NaN")})
+
+    def test_without_orjson(self):
+        """Test the renderer works without the optional package"""
+        with mock.patch.object(renderers, "orjson", None):
+            self.assertSameRender(DATA)
+
+
+class TestFastJSONParser(SimpleTestCase):
+    def parse(self, parser, body, encoding="utf-8"):
+        return parser.parse(io.BytesIO(body), parser_context={"encoding": encoding})
+
+    def test_same_result(self):
+        """Test bodies parse to the same data as with the json parser"""
+        bodies = [
+            '{"title": "Tâche", "ids": [1, 2.5, null, true], "big": 1180591620717411303424}',
+            "[]",
+        ]
+        for body in bodies:
+            self.assertEqual(
+                self.parse(FastJSONParser(), body.encode()),
+                self.parse(JSONParser(), body.encode()),
+            )
+        body = '{"title": "Tâche"}'.encode("latin-1")
+        self.assertEqual(
+            self.parse(FastJSONParser(), body, "latin-1"),
+            self.parse(JSONParser(), body, "latin-1"),
+        )
+
+    def test_invalid_body(self):
+        """Test invalid bodies get the errors of the json parser"""
+        for body in (b'{"title": ', b'{"value": NaN}'):
+            with self.assertRaises(ParseError) as expected:
+                self.parse(JSONParser(), body)
+            with self.assertRaises(ParseError) as error:
+                self.parse(FastJSONParser(), body)
+            self.assertEqual(str(error.exception), str(expected.exception))
+
+    def test_without_orjson(self):
+        """Test the parser works without the optional package"""
+        with mock.patch.object(parsers, "orjson", None):
+            self.assertEqual(self.parse(FastJSONParser(), b'{"id": 1}'), {"id": 1})
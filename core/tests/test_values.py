@@ -0,0 +1,102 @@
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.reverse import reverse
+from rest_framework.test import APIRequestFactory
+from core.models import Team, TeamMember, Project, Task
+from core.counters import count_overdue_tasks
+from core.reverse import url_template
+from project.query_plans import apply_query_plan
+from project.serializers import (
+    ProjectListSerializer,
+    ProjectListValuesSerializer,
+    TaskListSerializer,
+    TaskListValuesSerializer,
+    MyTaskListSerializer,
+    MyTaskListValuesSerializer,
+)
+from team.serializers import (
+    TeamListSerializer,
+    TeamListValuesSerializer,
+    TeamMemberSerializer,
+    TeamMemberValuesSerializer,
+)
+
+
+class TestValuesSerializers(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            username="testuser",
+            password="testpass123",
+            first_name="Test",
+            last_name="User",
+        )
+        cls.team = Team.objects.create(name="Test team")
+        cls.member = TeamMember.objects.create(
+            user=cls.user, team=cls.team, is_admin=True
+        )
+        cls.project = Project.objects.create(name="Project 1", team=cls.team)
+        Task.objects.create(
+            title="Task 1",
+            project=cls.project,
+            assigned_to=cls.member,
+            created_by=cls.member,
+            due_date=timezone.now() - timedelta(days=1, microseconds=5),
+            last_comment_at=timezone.now(),
+            comment_count=2,
+        )
+        ## the assignee left the team
+        Task.objects.create(title="Task 2", project=cls.project, created_by=cls.member)
+
+    def setUp(self):
+        self.request = APIRequestFactory().get("/api/project/?format=json")
+
+    def assertSameOutput(self, serializer_class, values_class, queryset):
+        context = {"request": self.request}
+        expected = serializer_class(
+            apply_query_plan(queryset, serializer_class), many=True, context=context
+        ).data
+        data = values_class(values_class.apply(queryset), context=context).data
+        ## compared as rendered bytes, the key order is part of the output
+        self.assertEqual(JSONRenderer().render(data), JSONRenderer().render(expected))
+
+    def test_task_list_output(self):
+        """Test the task rows give the output of the task serializers"""
+        queryset = Task.objects.order_by("id")
+        self.assertSameOutput(TaskListSerializer, TaskListValuesSerializer, queryset)
+        self.assertSameOutput(
+            MyTaskListSerializer, MyTaskListValuesSerializer, queryset
+        )
+
+    def test_project_list_output(self):
+        """Test the project rows give the output of the project serializer"""
+        queryset = Project.objects.annotate(overdue_count=count_overdue_tasks())
+        self.assertSameOutput(
+            ProjectListSerializer, ProjectListValuesSerializer, queryset
+        )
+
+    def test_team_and_member_list_output(self):
+        """Test the team and member rows give the output of their serializers"""
+        self.assertSameOutput(
+            TeamListSerializer, TeamListValuesSerializer, Team.objects.all()
+        )
+        self.assertSameOutput(
+            TeamMemberSerializer, TeamMemberValuesSerializer, TeamMember.objects.all()
+        )
+
+    def test_url_template(self):
+        """Test the url templates format to the reversed urls"""
+        template = url_template(
+            "project:task-detail", ["pk", "task_id"], request=self.request
+        )
+        url = reverse(
+            "project:task-detail",
+            kwargs={"pk": 12, "task_id": 345},
+            request=self.request,
+        )
+        self.assertEqual(template.format(pk=12, task_id=345), url)
+        self.assertTrue(url.endswith("?format=json"))
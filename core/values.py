@@ -0,0 +1,43 @@
+from rest_framework import serializers
+
+
+## formats datetimes like the DateTimeField of the DRF serializers
+format_datetime = serializers.DateTimeField().to_representation
+
+
+class ValuesSerializer:
+    """
+    Read-only serializer building the output of large lists straight from
+    .values() rows, without the field objects of a DRF serializer.
+    Subclasses declare the columns they read and map a row to its output,
+    work shared by all rows like url templates is done once in setup().
+    """
+
+    columns = []
+
+    def __init__(self, rows, context=None):
+        self.rows = rows
+        self.context = context or {}
+
+    @classmethod
+    def apply(cls, queryset):
+        """Returns the .values() rows of queryset this serializer reads"""
+        return queryset.values(*cls.columns)
+
+    def setup(self):
+        pass
+
+    def to_representation(self, row):
+        raise NotImplementedError
+
+    def iterate(self):
+        """Yields the output of the rows one by one, for streaming them"""
+        self.setup()
+        for row in self.rows:
+            yield self.to_representation(row)
+
+    @property
+    def data(self):
+        if not hasattr(self, "_data"):
+            self._data = list(self.iterate())
+        return self._data
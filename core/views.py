@@ -1,3 +1,100 @@
-from django.shortcuts import render
+import asyncio
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from rest_framework import exceptions, status
+from rest_framework.generics import RetrieveAPIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from core.events import get_broker, format_event
+from core.membership import load_memberships
+from core.models import Job
+from core.serializers import JobSerializer
+from user.authentication import CachedTokenAuthentication
 
-# Create your views here.
+
+def get_team_ids(user):
+    """Teams whose events the user may see, the same as TeamViewSet.get_queryset"""
+    return set(load_memberships(user))
+
+
+async def event_stream(user, broker, heartbeat):
+    """
+    Yields server-sent events of the tasks, projects and members
+    of the user's teams, following the user joining or leaving teams.
+    """
+    ## subscribe first so no event is lost while loading the teams
+    subscription = broker.subscribe()
+    try:
+        team_ids = await sync_to_async(get_team_ids)(user)
+        yield ": connected\n\n"
+        while True:
+            if subscription.overflowed:
+                ## the client missed events and has to sync again
+                yield format_event({"type": "stream.overflow"})
+                return
+            try:
+                event = await subscription.get(heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+
+            if event["type"].startswith("member.") and event["user_id"] == user.id:
+                was_member = event["team_id"] in team_ids
+                team_ids = await sync_to_async(get_team_ids)(user)
+                if was_member or event["team_id"] in team_ids:
+                    yield format_event(event)
+            elif event["team_id"] in team_ids:
+                yield format_event(event)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def events(request):
+    """Streams change events of the user's teams, served by the ASGI application"""
+    if not isinstance(request, ASGIRequest):
+        ## the endless stream would hold a WSGI worker forever
+        return JsonResponse(
+            {"detail": "The event stream is only served by the ASGI application."},
+            status=501,
+        )
+    try:
+        result = await sync_to_async(CachedTokenAuthentication().authenticate)(request)
+    except exceptions.AuthenticationFailed as exc:
+        return JsonResponse({"detail": str(exc.detail)}, status=401)
+    if result is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."}, status=401
+        )
+
+    heartbeat = getattr(settings, "EVENT_STREAM_HEARTBEAT", 15)
+    response = StreamingHttpResponse(
+        event_stream(result[0], get_broker(), heartbeat),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+class JobDetailView(RetrieveAPIView):
+    """Status and progress of a background job started by the user"""
+
+    serializer_class = JobSerializer
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return Job.objects.filter(created_by=self.request.user)
+
+
+def job_accepted_response(request, job):
+    """Response of requests whose work is left to a background job"""
+    url = request.build_absolute_uri(reverse("job-detail", kwargs={"pk": job.pk}))
+    return Response(
+        JobSerializer(job).data,
+        status=status.HTTP_202_ACCEPTED,
+        headers={"Location": url},
+    )
@@ -1,9 +1,10 @@
-from rest_framework import serializers
-from rest_framework.reverse import reverse
+from core.fields import CachedHyperlinkedIdentityField
 
 
-class TaskDetailHyperlink(serializers.HyperlinkedIdentityField):
-    # We define these as class attributes, so we don't need to pass them as arguments.
-    def get_url(self, obj, view_name, request, format):
-        url_kwargs = {"pk": obj.project.pk, "task_id": obj.pk}
-        return reverse(view_name, kwargs=url_kwargs, request=request, format=format)
+class TaskDetailHyperlink(CachedHyperlinkedIdentityField):
+    def get_url_kwarg_names(self):
+        return ["pk", "task_id"]
+
+    def get_url_kwargs(self, obj):
+        ## project_id avoids fetching the project row for every task
+        return {"pk": obj.project_id, "task_id": obj.pk}
@@ -0,0 +1,61 @@
+from django.db.models import Q
+from rest_framework import serializers
+from core.models import Task
+
+
+class TaskFilterSerializer(serializers.Serializer):
+    """Validates the query parameters for filtering task lists"""
+
+    status = serializers.MultipleChoiceField(
+        choices=Task.PROJECT_STATUS_CHOICES, required=False
+    )
+    assigned_to = serializers.IntegerField(required=False)
+    due_after = serializers.DateTimeField(required=False)
+    due_before = serializers.DateTimeField(required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+    search = serializers.CharField(required=False, max_length=255)
+
+
+def filter_tasks(queryset, query_params):
+    """
+    Filters the task queryset in SQL by the query parameters,
+    raises ValidationError for invalid values.
+    """
+    serializer = TaskFilterSerializer(data=query_params)
+    serializer.is_valid(raise_exception=True)
+    params = serializer.validated_data
+
+    if params.get("status"):
+        queryset = queryset.filter(status__in=params["status"])
+    if "assigned_to" in params:
+        queryset = queryset.filter(assigned_to_id=params["assigned_to"])
+    if "due_after" in params:
+        queryset = queryset.filter(due_date__gte=params["due_after"])
+    if "due_before" in params:
+        queryset = queryset.filter(due_date__lt=params["due_before"])
+    if "created_after" in params:
+        queryset = queryset.filter(created_at__gte=params["created_after"])
+    if "created_before" in params:
+        queryset = queryset.filter(created_at__lt=params["created_before"])
+    if params.get("search"):
+        search = params["search"]
+        queryset = queryset.filter(
+            Q(title__icontains=search) | Q(description__icontains=search)
+        )
+    return queryset
+
+
+class CommentFilterSerializer(serializers.Serializer):
+    """Validates the task ids of bulk comment requests, ?task=1&task=2"""
+
+    task = serializers.ListField(
+        child=serializers.IntegerField(), min_length=1, max_length=100
+    )
+
+
+def filter_comments(queryset, query_params):
+    """Filters the comment queryset by the task query parameters"""
+    serializer = CommentFilterSerializer(data=query_params)
+    serializer.is_valid(raise_exception=True)
+    return queryset.filter(task_id__in=serializer.validated_data["task"])
@@ -0,0 +1,34 @@
+from types import SimpleNamespace
+from django.db import transaction
+from core.jobs import get_job_option, report_progress, set_total
+from core.models import Project
+from .serializers import TaskBulkSerializer
+
+
+def bulk_create_tasks(job):
+    """
+    Creates the tasks of a bulk import in chunks of CHUNK_SIZE, each chunk
+    is committed with the progress so a retried job skips the created tasks.
+    """
+    project = Project.objects.filter(pk=job.payload["project_id"]).first()
+    if project is None:
+        return {"created": 0}
+    if job.created_by is None:
+        raise ValueError("The user who started the import was deleted")
+    items = job.payload["tasks"]
+    set_total(job, len(items))
+    ## the resolver of the creator is shared by the chunks
+    request = SimpleNamespace(user=job.created_by)
+    chunk_size = get_job_option("CHUNK_SIZE", 1000)
+    created = 0
+    while job.progress < len(items):
+        chunk = items[job.progress : job.progress + chunk_size]
+        serializer = TaskBulkSerializer(
+            data=chunk, many=True, context={"request": request}
+        )
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            serializer.save(project=project)
+            report_progress(job, len(chunk))
+        created += len(chunk)
+    return {"created": created}
@@ -1,4 +1,5 @@
 from rest_framework import permissions
+from core.membership import get_membership_resolver
 
 
 class IsAllowedToUpdateOrDelete(permissions.BasePermission):
@@ -11,12 +12,4 @@ class IsAllowedToUpdateOrDelete(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
 
-        try:
-            member = obj.team.member.get(user=request.user)
-        except:
-            return False
-
-        if member.is_admin:
-            return True
-
-        return False
+        return get_membership_resolver(request).is_admin(obj.team_id)
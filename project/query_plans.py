@@ -0,0 +1,36 @@
+class QueryPlan:
+    """
+    Declares the related objects and columns a serializer reads,
+    so views can load them in the same query as the rows themselves
+    instead of issuing one query per row while serializing.
+    """
+
+    def __init__(
+        self, select_related=None, prefetch_related=None, only=None, annotate=None
+    ):
+        self.select_related = list(select_related or [])
+        self.prefetch_related = list(prefetch_related or [])
+        self.only = list(only or [])
+        ## name to a function building the expression when the plan is applied
+        self.annotate = dict(annotate or {})
+
+    def apply(self, queryset):
+        if self.annotate:
+            queryset = queryset.annotate(
+                **{name: build() for name, build in self.annotate.items()}
+            )
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if self.only:
+            queryset = queryset.only(*self.only)
+        return queryset
+
+
+def apply_query_plan(queryset, serializer_class):
+    """Applies the query plan declared on serializer_class, if there is one"""
+    plan = getattr(serializer_class, "query_plan", None)
+    if plan is None:
+        return queryset
+    return plan.apply(queryset)
@@ -1,26 +1,91 @@
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
-from core.models import Project, Team, Task
+from core.models import Project, Team, Task, Comment
+from core.membership import get_membership_resolver
+from core.events import publish_on_commit
+from core.dashboard import invalidate_dashboards
+from core.counters import (
+    update_status_counts,
+    count_status_changes,
+    count_overdue_tasks,
+)
+from core.reverse import url_template
+from core.fields import CachedHyperlinkedIdentityField, CachedHyperlinkedRelatedField
+from core.values import ValuesSerializer, format_datetime
 from .custom_serializer_fields import TaskDetailHyperlink
+from .query_plans import QueryPlan
 
 
 class ProjectListSerializer(serializers.Serializer):
     """Serializer for listing projects"""
 
-    url = serializers.HyperlinkedIdentityField(
+    url = CachedHyperlinkedIdentityField(
         view_name="project:project-detail", read_only=True
     )
     name = serializers.CharField()
+    todo_count = serializers.IntegerField(read_only=True)
+    progress_count = serializers.IntegerField(read_only=True)
+    done_count = serializers.IntegerField(read_only=True)
+    overdue_count = serializers.IntegerField(read_only=True)
+
+    query_plan = QueryPlan(
+        only=["id", "name", "todo_count", "progress_count", "done_count"],
+        annotate={"overdue_count": count_overdue_tasks},
+    )
+
+
+class ProjectListValuesSerializer(ValuesSerializer):
+    """Fast read-only ProjectListSerializer, the rows need overdue_count annotated"""
+
+    columns = [
+        "id",
+        "name",
+        "todo_count",
+        "progress_count",
+        "done_count",
+        "overdue_count",
+    ]
+
+    def setup(self):
+        self.project_url = url_template(
+            "project:project-detail", ["pk"], request=self.context.get("request")
+        )
+
+    def to_representation(self, row):
+        return {
+            "url": self.project_url.format(pk=row["id"]),
+            "name": row["name"],
+            "todo_count": row["todo_count"],
+            "progress_count": row["progress_count"],
+            "done_count": row["done_count"],
+            "overdue_count": row["overdue_count"],
+        }
 
 
 class ProjectSerializer(serializers.ModelSerializer):
-    team = serializers.HyperlinkedRelatedField(
-        view_name="team:team-detail", read_only=True
-    )
+    team = CachedHyperlinkedRelatedField(view_name="team:team-detail", read_only=True)
     team_id = serializers.IntegerField(write_only=True)
+    ## annotated by the query plan, left out for created or updated projects
+    overdue_count = serializers.IntegerField(read_only=True)
+
+    query_plan = QueryPlan(annotate={"overdue_count": count_overdue_tasks})
 
     class Meta:
         model = Project
-        fields = ["id", "name", "team_id", "description", "team", "deadline"]
+        fields = [
+            "id",
+            "name",
+            "team_id",
+            "description",
+            "team",
+            "deadline",
+            "todo_count",
+            "progress_count",
+            "done_count",
+            "overdue_count",
+        ]
+        read_only_fields = ["todo_count", "progress_count", "done_count"]
         extra_kwargs = {"description": {"required": False}}
 
     def create(self, validated_data):
@@ -35,29 +100,177 @@ class ProjectSerializer(serializers.ModelSerializer):
         if team_id:
             team = Team.objects.get(pk=team_id)
             validated_data["team"] = team
+            ## the project leaves the dashboard of its previous team
+            invalidate_dashboards(instance.team_id)
         return super().update(instance, validated_data)
 
 
 class TaskListSerializer(serializers.ModelSerializer):
     """Serializer for listing task objects"""
 
-    assigned_to = serializers.CharField(source="assigned_to.user.username")
+    ## assigned_to is null after the assigned member left the team
+    assigned_to = serializers.CharField(
+        source="assigned_to.user.username", read_only=True, allow_null=True
+    )
     url = TaskDetailHyperlink(view_name="project:task-detail")
 
+    query_plan = QueryPlan(
+        select_related=["assigned_to__user"],
+        only=[
+            "id",
+            "title",
+            "status",
+            "due_date",
+            "project",
+            "assigned_to",
+            "assigned_to__user",
+            "assigned_to__user__username",
+            "comment_count",
+            "last_comment_at",
+        ],
+    )
+
     class Meta:
         model = Task
-        fields = ["id", "title", "status", "assigned_to", "due_date", "url"]
+        fields = [
+            "id",
+            "title",
+            "status",
+            "assigned_to",
+            "due_date",
+            "comment_count",
+            "last_comment_at",
+            "url",
+        ]
+
+
+class MyTaskListSerializer(TaskListSerializer):
+    """Serializer for listing the tasks of the user across projects"""
+
+    project = serializers.IntegerField(source="project_id", read_only=True)
+
+    class Meta(TaskListSerializer.Meta):
+        fields = TaskListSerializer.Meta.fields + ["project"]
+
+
+class TaskListValuesSerializer(ValuesSerializer):
+    """Fast read-only TaskListSerializer"""
+
+    ## created_at is the cursor position of the task orderings
+    columns = [
+        "id",
+        "title",
+        "status",
+        "due_date",
+        "comment_count",
+        "last_comment_at",
+        "created_at",
+        "project_id",
+        "assigned_to__user__username",
+    ]
+
+    def setup(self):
+        self.task_url = url_template(
+            "project:task-detail",
+            ["pk", "task_id"],
+            request=self.context.get("request"),
+        )
+
+    def to_representation(self, row):
+        return {
+            "id": row["id"],
+            "title": row["title"],
+            "status": row["status"],
+            "assigned_to": row["assigned_to__user__username"],
+            "due_date": format_datetime(row["due_date"]),
+            "comment_count": row["comment_count"],
+            "last_comment_at": format_datetime(row["last_comment_at"]),
+            "url": self.task_url.format(pk=row["project_id"], task_id=row["id"]),
+        }
+
+
+class MyTaskListValuesSerializer(TaskListValuesSerializer):
+    """Fast read-only MyTaskListSerializer"""
+
+    def to_representation(self, row):
+        ret = super().to_representation(row)
+        ret["project"] = row["project_id"]
+        return ret
+
+
+class TaskExportValuesSerializer(ValuesSerializer):
+    """Rows of the task exports, fields are the columns of the CSV export"""
+
+    columns = [
+        "id",
+        "project_id",
+        "title",
+        "description",
+        "status",
+        "assigned_to__user__username",
+        "created_by__user__username",
+        "created_at",
+        "updated_at",
+        "due_date",
+        "comment_count",
+    ]
+    fields = [
+        "id",
+        "project",
+        "title",
+        "description",
+        "status",
+        "assigned_to",
+        "created_by",
+        "created_at",
+        "updated_at",
+        "due_date",
+        "comment_count",
+    ]
+
+    def to_representation(self, row):
+        return {
+            "id": row["id"],
+            "project": row["project_id"],
+            "title": row["title"],
+            "description": row["description"],
+            "status": row["status"],
+            "assigned_to": row["assigned_to__user__username"],
+            "created_by": row["created_by__user__username"],
+            "created_at": format_datetime(row["created_at"]),
+            "updated_at": format_datetime(row["updated_at"]),
+            "due_date": format_datetime(row["due_date"]),
+            "comment_count": row["comment_count"],
+        }
+
+
+class TaskSyncSerializer(MyTaskListSerializer):
+    """Serializer for the tasks changed since a sync token"""
+
+    query_plan = QueryPlan(
+        select_related=TaskListSerializer.query_plan.select_related,
+        only=TaskListSerializer.query_plan.only + ["updated_at"],
+    )
+
+    class Meta(MyTaskListSerializer.Meta):
+        fields = MyTaskListSerializer.Meta.fields + ["updated_at"]
 
 
 class TaskSerializer(serializers.ModelSerializer):
     """Serializer for listing task objects"""
 
     ## this field is for representation only
-    assignee = serializers.CharField(source="assigned_to.user.username", read_only=True)
+    assignee = serializers.CharField(
+        source="assigned_to.user.username", read_only=True, allow_null=True
+    )
     created_by = serializers.CharField(
         source="created_by.user.username", read_only=True
     )
 
+    query_plan = QueryPlan(
+        select_related=["project", "assigned_to__user", "created_by__user"]
+    )
+
     class Meta:
         model = Task
         fields = [
@@ -70,7 +283,10 @@ class TaskSerializer(serializers.ModelSerializer):
             "created_at",
             "description",
             "due_date",
+            "comment_count",
+            "last_comment_at",
         ]
+        read_only_fields = ["comment_count", "last_comment_at"]
         extra_kwargs = {
             "assigned_to": {"write_only": True, "required": True},
         }
@@ -79,7 +295,7 @@ class TaskSerializer(serializers.ModelSerializer):
         ## Check if assigned_to member is a member of the project team
         project = validated_data.get("project", None)
         assigned_to = validated_data.get("assigned_to", None)
-        if not project.team.member.filter(pk=assigned_to.id).exists():
+        if assigned_to.team_id != project.team_id or assigned_to.deleting:
             raise serializers.ValidationError(
                 "assigned_to id is not a member of this project"
             )
@@ -88,13 +304,154 @@ class TaskSerializer(serializers.ModelSerializer):
         self._validate_assigned_to(validated_data)
         project = validated_data.get("project", None)
         request = self.context.get("request")
-        created_by = project.team.member.get(user=request.user)
+        created_by = get_membership_resolver(request).get_member(project.team_id)
+        if created_by is None:
+            raise serializers.ValidationError("You are not a member of this project")
         validated_data["created_by"] = created_by
-        return super().create(validated_data)
+        ## the status counters of the project change with the task
+        with transaction.atomic():
+            return super().create(validated_data)
 
     def update(self, instance, validated_data):
         assigned_to = validated_data.get("assigned_to", None)
         if assigned_to:
             self._validate_assigned_to(validated_data)
         validated_data.pop("project", None)
-        return super().update(instance, validated_data)
+        with transaction.atomic():
+            return super().update(instance, validated_data)
+
+
+## Number of tasks written per query by the bulk endpoints
+TASK_BULK_BATCH_SIZE = 500
+
+
+class TaskBulkListSerializer(serializers.ListSerializer):
+    """Serializer for creating and updating multiple tasks of a project"""
+
+    def _validate_assignees(self, project, validated_data):
+        ## Check all assigned_to members against the team members loaded once
+        member_ids = set(
+            project.team.member.filter(deleting=False).values_list("id", flat=True)
+        )
+        for item in validated_data:
+            assigned_to_id = item.get("assigned_to_id", None)
+            if assigned_to_id is not None and assigned_to_id not in member_ids:
+                raise serializers.ValidationError(
+                    f"assigned_to id {assigned_to_id} is not a member of this project"
+                )
+
+    def check_project(self, project, validated_data):
+        """Returns the creator of the tasks after checking the members"""
+        request = self.context.get("request")
+        created_by = get_membership_resolver(request).get_member(project.team_id)
+        if created_by is None:
+            raise serializers.ValidationError("You are not a member of this project")
+        self._validate_assignees(project, validated_data)
+        return created_by
+
+    def create(self, validated_data):
+        """Adding multiple tasks to the project"""
+        project = validated_data[0].get("project", None)
+        if project is None:
+            raise serializers.ValidationError(
+                "Project object should be specified for adding tasks"
+            )
+        created_by = self.check_project(project, validated_data)
+
+        tasks = []
+        for item in validated_data:
+            item.pop("id", None)
+            tasks.append(Task(created_by=created_by, **item))
+        with transaction.atomic():
+            tasks = Task.objects.bulk_create(tasks, batch_size=TASK_BULK_BATCH_SIZE)
+            ## bulk_create does not send post_save signals
+            update_status_counts(
+                project.pk, count_status_changes((None, task.status) for task in tasks)
+            )
+            invalidate_dashboards(project.team_id)
+            for task in tasks:
+                publish_on_commit(
+                    "task.saved", project.team_id, id=task.pk, project_id=project.pk
+                )
+        return tasks
+
+    def update(self, instance, validated_data):
+        """Updating status and assignee of multiple tasks of the project"""
+        project = validated_data[0].get("project", None)
+        data_mapping = {}
+        for item in validated_data:
+            if not item.get("id", None):
+                raise serializers.ValidationError("id field is missing")
+            data_mapping[item.get("id")] = item
+        self._validate_assignees(project, validated_data)
+
+        with transaction.atomic():
+            ## instance is the queryset of the project tasks
+            task_mapping = instance.select_for_update().in_bulk(list(data_mapping))
+            now = timezone.now()
+            objs = []
+            status_changes = []
+            for task_id, data in data_mapping.items():
+                task = task_mapping.get(task_id, None)
+                if task is None:
+                    raise serializers.ValidationError(f"No such task with id {task_id}")
+                new_status = data.get("status", task.status)
+                status_changes.append((task.status, new_status))
+                task.status = new_status
+                task.assigned_to_id = data.get("assigned_to_id", task.assigned_to_id)
+                ## bulk_update does not set auto_now fields
+                task.updated_at = now
+                objs.append(task)
+            Task.objects.bulk_update(
+                objs,
+                ["status", "assigned_to", "updated_at"],
+                batch_size=TASK_BULK_BATCH_SIZE,
+            )
+            ## bulk_update does not send post_save signals
+            update_status_counts(project.pk, count_status_changes(status_changes))
+            invalidate_dashboards(project.team_id)
+            for task in objs:
+                publish_on_commit(
+                    "task.saved", project.team_id, id=task.pk, project_id=project.pk
+                )
+        return objs
+
+
+class TaskBulkSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the items of bulk task requests,
+    updates only change status and assigned_to.
+    """
+
+    id = serializers.IntegerField(required=False)
+    assigned_to = serializers.IntegerField(source="assigned_to_id")
+
+    class Meta:
+        model = Task
+        fields = ["id", "title", "status", "assigned_to", "description", "due_date"]
+        list_serializer_class = TaskBulkListSerializer
+
+
+class CommentSerializer(serializers.ModelSerializer):
+    """Serializer for the comments of a task"""
+
+    ## created_by is null after the author left the team
+    created_by = serializers.CharField(
+        source="created_by.user.username", read_only=True, allow_null=True
+    )
+    task = serializers.IntegerField(source="task_id", read_only=True)
+
+    query_plan = QueryPlan(select_related=["created_by__user"])
+
+    class Meta:
+        model = Comment
+        fields = ["id", "task", "body", "created_by", "created_at"]
+
+    def create(self, validated_data):
+        task = validated_data.get("task", None)
+        request = self.context.get("request")
+        created_by = get_membership_resolver(request).get_member(task.project.team_id)
+        if created_by is None:
+            raise serializers.ValidationError("You are not a member of this project")
+        validated_data["created_by"] = created_by
+        return super().create(validated_data)
@@ -0,0 +1,172 @@
+import hashlib
+from datetime import timedelta
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+
+SYNC_TOKEN_SALT = "project.sync"
+
+
+class SyncTokenExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "Sync token expired, sync again without a token."
+    default_code = "sync_token_expired"
+
+
+def make_sync_token(since, until=None, phase="tasks", after=None, scope=None):
+    """
+    since is the moment the changes are sent from, None for a full sync.
+    until, phase and the (moment, id) position after the last row sent
+    are set while the changes are sent page by page. scope binds the
+    token to what was synced, see get_teams_scope().
+    """
+    data = {"since": since.isoformat() if since else None}
+    if scope is not None:
+        data["scope"] = scope
+    if until is not None:
+        data.update(
+            until=until.isoformat(),
+            phase=phase,
+            after=[after[0].isoformat(), after[1]] if after else None,
+        )
+    return signing.dumps(data, salt=SYNC_TOKEN_SALT)
+
+
+def parse_moment(value):
+    moment = parse_datetime(value)
+    if moment is None:
+        raise ValueError(value)
+    return moment
+
+
+def read_sync_token(token):
+    """
+    Returns the state encoded in the token, raises ValidationError
+    for invalid tokens and SyncTokenExpired when the tombstones
+    deleted since then may already be pruned.
+    """
+    try:
+        data = signing.loads(token, salt=SYNC_TOKEN_SALT)
+        ## tokens issued before syncs were paged hold only the moment
+        if isinstance(data, str):
+            data = {"since": data}
+        state = {
+            "since": parse_moment(data["since"]) if data["since"] else None,
+            "until": parse_moment(data["until"]) if data.get("until") else None,
+            "phase": data.get("phase", "tasks"),
+            "after": None,
+            "scope": data.get("scope"),
+        }
+        if data.get("after"):
+            state["after"] = (parse_moment(data["after"][0]), int(data["after"][1]))
+    except (
+        signing.BadSignature,
+        AttributeError,
+        KeyError,
+        IndexError,
+        TypeError,
+        ValueError,
+    ):
+        raise ValidationError({"since": ["Invalid sync token."]})
+    if state["phase"] not in ("tasks", "deleted"):
+        raise ValidationError({"since": ["Invalid sync token."]})
+    since = state["since"]
+    if since is not None and since < timezone.now() - get_tombstone_retention():
+        raise SyncTokenExpired()
+    return state
+
+
+def get_teams_scope(team_ids):
+    """
+    Digest of the teams a sync covers. Tasks of a team the user left have
+    no tombstones the user may read, and older tasks of a team the user
+    joined are not changed, so a token is only valid for the same teams.
+    """
+    value = ",".join(str(team_id) for team_id in sorted(team_ids))
+    return hashlib.sha256(value.encode()).hexdigest()[:16]
+
+
+def get_tombstone_retention():
+    return timedelta(days=getattr(settings, "SYNC_TOMBSTONE_RETENTION_DAYS", 30))
+
+
+def get_safety_window():
+    return timedelta(seconds=getattr(settings, "SYNC_SAFETY_WINDOW_SECONDS", 60))
+
+
+def after_position(queryset, field, after):
+    """Keeps the rows ordered after the (moment, id) position on (field, id)"""
+    if after is None:
+        return queryset
+    moment, pk = after
+    return queryset.filter(
+        Q(**{f"{field}__gt": moment}) | Q(**{field: moment, "id__gt": pk})
+    )
+
+
+def get_changes(tasks, tombstones, token=None, page_size=100, scope=None):
+    """
+    Returns a page of the tasks changed and of the ids of the tasks deleted
+    since the sync token, the token of the next request and whether more
+    pages follow. Without a token all tasks are returned page by page.
+    Tokens issued for another scope raise SyncTokenExpired.
+
+    the pages hold the changes up to the moment of the first page, ordered
+    by (moment, id), first the tasks and then the tombstones. The token of
+    the last page starts the next sync SYNC_SAFETY_WINDOW_SECONDS before that
+    moment, so rows written by a transaction that committed after it are
+    sent again rather than missed.
+    """
+    if token:
+        state = read_sync_token(token)
+    else:
+        state = {"since": None, "until": None, "phase": "tasks", "after": None}
+        state["scope"] = scope
+    if state["scope"] != scope:
+        raise SyncTokenExpired(
+            "The teams of the user changed, sync again without a token."
+        )
+    since, until, after = state["since"], state["until"], state["after"]
+    if until is None:
+        until = timezone.now()
+    start = since - get_safety_window() if since else None
+
+    changed = []
+    if state["phase"] == "tasks":
+        rows = tasks.filter(updated_at__lte=until)
+        if start is not None:
+            rows = rows.filter(updated_at__gt=start)
+        rows = after_position(rows, "updated_at", after)
+        changed = list(rows.order_by("updated_at", "id")[: page_size + 1])
+        if len(changed) > page_size:
+            changed = changed[:page_size]
+            position = (changed[-1].updated_at, changed[-1].id)
+            token = make_sync_token(since, until, "tasks", position, scope)
+            return changed, [], token, True
+        if start is None:
+            ## a full sync has no deletions to send
+            return changed, [], make_sync_token(until, scope=scope), False
+        after = None
+
+    rows = tombstones.filter(deleted_at__gt=start, deleted_at__lte=until)
+    rows = after_position(rows, "deleted_at", after)
+    rows = list(
+        rows.order_by("deleted_at", "id").values_list("deleted_at", "id", "task_id")[
+            : page_size + 1
+        ]
+    )
+    deleted = [task_id for _, _, task_id in rows[:page_size]]
+    if len(rows) > page_size:
+        position = rows[page_size - 1][:2]
+        return (
+            changed,
+            deleted,
+            make_sync_token(since, until, "deleted", position, scope),
+            True,
+        )
+    return changed, deleted, make_sync_token(until, scope=scope), False
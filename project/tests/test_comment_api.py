@@ -0,0 +1,217 @@
+from unittest import mock
+from django.test import TestCase
+from rest_framework.test import APIClient
+from django.urls import reverse
+from core.models import Task, Project, Team, TeamMember, Comment
+from django.contrib.auth import get_user_model
+from rest_framework import status
+
+
+def comments_url(project_id, task_id):
+    return reverse(
+        "project:task-comments", kwargs={"pk": project_id, "task_id": task_id}
+    )
+
+
+def comment_detail_url(project_id, task_id, comment_id):
+    return reverse(
+        "project:task-comment-detail",
+        kwargs={"pk": project_id, "task_id": task_id, "comment_id": comment_id},
+    )
+
+
+def project_comments_url(project_id):
+    return reverse("project:project-comments", kwargs={"pk": project_id})
+
+
+def create_user(**params):
+    return get_user_model().objects.create_user(**params)
+
+
+def create_comment(**params):
+    payload = {"body": "Comment body"}
+    payload.update(**params)
+    return Comment.objects.create(**payload)
+
+
+class CommentAPITests(TestCase):
+    """Private Comment API Tests"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.client = APIClient()
+        cls.user1 = create_user(username="testUser1", email="test1@example.com")
+        cls.user2 = create_user(username="testUser2", email="test2@example.com")
+        cls.client.force_authenticate(user=cls.user1)
+        cls.team = Team.objects.create(name="Test team")
+        cls.member1 = TeamMember.objects.create(user=cls.user1, team=cls.team)
+        cls.member2 = TeamMember.objects.create(
+            user=cls.user2, team=cls.team, is_admin=True
+        )
+        cls.project = Project.objects.create(name="Project 1", team=cls.team)
+        cls.task = Task.objects.create(
+            title="Task 1",
+            project=cls.project,
+            assigned_to=cls.member1,
+            created_by=cls.member2,
+        )
+
+    def setUp(self):
+        self.client = CommentAPITests.client
+
+    def test_create_comment(self):
+        """Test adding a comment counts it on the task"""
+        res = self.client.post(
+            comments_url(self.project.id, self.task.id), {"body": "First"}
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["created_by"], self.user1.username)
+        self.assertEqual(res.data["task"], self.task.id)
+        comment = Comment.objects.get(pk=res.data["id"])
+        self.assertEqual(comment.created_by, self.member1)
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.comment_count, 1)
+        self.assertEqual(self.task.last_comment_at, comment.created_at)
+
+    def test_create_comment_empty_body_fails(self):
+        """Test adding a comment without a body fails"""
+        res = self.client.post(comments_url(self.project.id, self.task.id), {})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_comments_of_task_not_in_project(self):
+        """Test comments of a task of another project are not found"""
+        other_project = Project.objects.create(name="Project 2", team=self.team)
+        res = self.client.get(comments_url(other_project.id, self.task.id))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_comments_not_a_member(self):
+        """Test users outside the team can not read or add comments"""
+        other_team = Team.objects.create(name="Other team")
+        project = Project.objects.create(name="Other", team=other_team)
+        member = TeamMember.objects.create(user=self.user2, team=other_team)
+        task = Task.objects.create(title="Task", project=project, created_by=member)
+        res = self.client.get(comments_url(project.id, task.id))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        res = self.client.post(comments_url(project.id, task.id), {"body": "Hi"})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_comments_paginated_oldest_first(self):
+        """Test the thread is returned oldest first one page at a time"""
+        comments = [
+            create_comment(task=self.task, created_by=self.member1, body=f"{i}")
+            for i in range(3)
+        ]
+        res = self.client.get(
+            comments_url(self.project.id, self.task.id), {"page_size": 2}
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["id"] for item in res.data["results"]],
+            [comments[0].id, comments[1].id],
+        )
+        res = self.client.get(res.data["next"])
+        self.assertEqual([item["id"] for item in res.data["results"]], [comments[2].id])
+        self.assertIsNone(res.data["next"])
+
+    def test_bulk_fetch_comments(self):
+        """Test fetching the comments of several tasks in one request"""
+        task2 = Task.objects.create(
+            title="Task 2", project=self.project, created_by=self.member1
+        )
+        task3 = Task.objects.create(
+            title="Task 3", project=self.project, created_by=self.member1
+        )
+        comment1 = create_comment(task=self.task, created_by=self.member1)
+        comment2 = create_comment(task=task2, created_by=self.member2)
+        create_comment(task=task3, created_by=self.member1)
+
+        res = self.client.get(
+            project_comments_url(self.project.id), {"task": [self.task.id, task2.id]}
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(item["id"], item["task"]) for item in res.data["results"]],
+            [(comment1.id, self.task.id), (comment2.id, task2.id)],
+        )
+
+    def test_bulk_fetch_comments_requires_tasks(self):
+        """Test fetching comments without task ids fails"""
+        res = self.client.get(project_comments_url(self.project.id))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_update_own_comment(self):
+        """Test the author can edit a comment"""
+        comment = create_comment(task=self.task, created_by=self.member1)
+        res = self.client.patch(
+            comment_detail_url(self.project.id, self.task.id, comment.id),
+            {"body": "Edited"},
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        comment.refresh_from_db()
+        self.assertEqual(comment.body, "Edited")
+
+    def test_update_others_comment_fails(self):
+        """Test editing the comment of another member fails"""
+        comment = create_comment(task=self.task, created_by=self.member2)
+        res = self.client.patch(
+            comment_detail_url(self.project.id, self.task.id, comment.id),
+            {"body": "Edited"},
+        )
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_comment_detail_membership_revoked(self):
+        """Test a membership revoked during the request is refused, not a crash"""
+        comment = create_comment(task=self.task, created_by=self.member1)
+        url = comment_detail_url(self.project.id, self.task.id, comment.id)
+        with mock.patch(
+            "core.membership.MembershipResolver.get_member", return_value=None
+        ):
+            res = self.client.patch(url, {"body": "Edited"})
+            self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+            res = self.client.delete(url)
+            self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertTrue(Comment.objects.filter(pk=comment.pk).exists())
+
+    def test_delete_comment_updates_counts(self):
+        """Test deleting a comment updates the count and the last comment time"""
+        first = create_comment(task=self.task, created_by=self.member2)
+        last = create_comment(task=self.task, created_by=self.member1)
+        res = self.client.delete(
+            comment_detail_url(self.project.id, self.task.id, last.id)
+        )
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.comment_count, 1)
+        self.assertEqual(self.task.last_comment_at, first.created_at)
+
+        ## only the author or an admin can delete
+        res = self.client.delete(
+            comment_detail_url(self.project.id, self.task.id, first.id)
+        )
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        admin_client = APIClient()
+        admin_client.force_authenticate(user=self.user2)
+        res = admin_client.delete(
+            comment_detail_url(self.project.id, self.task.id, first.id)
+        )
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.comment_count, 0)
+        self.assertIsNone(self.task.last_comment_at)
+
+    def test_task_list_shows_comment_count(self):
+        """Test task lists show the activity without counting comments"""
+        create_comment(task=self.task, created_by=self.member1)
+        create_comment(task=self.task, created_by=self.member2)
+        res = self.client.get(
+            reverse("project:task-list", kwargs={"pk": self.project.id})
+        )
+        self.assertEqual(res.data["results"][0]["comment_count"], 2)
+        self.assertIsNotNone(res.data["results"][0]["last_comment_at"])
+
+    def test_delete_task_with_comments(self):
+        """Test deleting a task deletes its comments"""
+        create_comment(task=self.task, created_by=self.member1)
+        self.task.delete()
+        self.assertFalse(Comment.objects.exists())
@@ -0,0 +1,144 @@
+import csv
+import io
+import json
+from unittest import mock
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from django.urls import reverse
+from core.exports import iterate_rows
+from core.models import Task, Project, Team, TeamMember
+from django.contrib.auth import get_user_model
+from rest_framework import status
+
+
+def task_export_url(project_id):
+    return reverse("project:project-task-export", kwargs={"pk": project_id})
+
+
+def create_user(**params):
+    return get_user_model().objects.create_user(**params)
+
+
+class TaskExportAPITests(TestCase):
+    """Private task export API Tests"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.client = APIClient()
+        cls.user = create_user(username="testUser1", email="test1@example.com")
+        cls.client.force_authenticate(user=cls.user)
+        cls.team = Team.objects.create(name="Test team")
+        cls.member = TeamMember.objects.create(user=cls.user, team=cls.team)
+        cls.project = Project.objects.create(name="Project 1", team=cls.team)
+        cls.tasks = [
+            Task.objects.create(
+                title=f'Task {i}, "quoted"',
+                description="Line 1\nLine 2",
+                project=cls.project,
+                assigned_to=cls.member if i % 2 else None,
+                created_by=cls.member,
+            )
+            for i in range(5)
+        ]
+        other_project = Project.objects.create(name="Project 2", team=cls.team)
+        Task.objects.create(
+            title="Other task", project=other_project, created_by=cls.member
+        )
+
+    def setUp(self):
+        self.client = TaskExportAPITests.client
+
+    def test_export_json_lines(self):
+        """Test the tasks of the project are streamed one JSON object per line"""
+        res = self.client.get(task_export_url(self.project.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        self.assertIn(
+            f'filename="project-{self.project.id}-tasks.jsonl"',
+            res["Content-Disposition"],
+        )
+        lines = b"".join(res.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row["id"] for row in rows], [task.id for task in self.tasks])
+        self.assertEqual(rows[0]["assigned_to"], None)
+        self.assertEqual(rows[1]["assigned_to"], self.user.username)
+        self.assertEqual(rows[1]["created_by"], self.user.username)
+        self.assertEqual(rows[1]["description"], "Line 1\nLine 2")
+        self.assertEqual(rows[1]["project"], self.project.id)
+
+    def test_export_csv(self):
+        """Test the tasks of the project are streamed as CSV with a header"""
+        res = self.client.get(task_export_url(self.project.id), {"type": "csv"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "text/csv")
+        content = b"".join(res.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]["title"], 'Task 0, "quoted"')
+        self.assertEqual(rows[0]["assigned_to"], "")
+        self.assertEqual(rows[1]["description"], "Line 1\nLine 2")
+        self.assertEqual(rows[1]["id"], str(self.tasks[1].id))
+
+    def test_export_csv_escapes_formulas(self):
+        """Test cells a spreadsheet would run as a formula are quoted"""
+        titles = ["=1+1", "+1", "-1", "@SUM(A1)", "\tTab", "\rReturn", "Plain - 1"]
+        Task.objects.filter(project=self.project).delete()
+        for title in titles:
+            Task.objects.create(
+                title=title, project=self.project, created_by=self.member
+            )
+        res = self.client.get(task_export_url(self.project.id), {"type": "csv"})
+        content = b"".join(res.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(
+            [row["title"] for row in rows],
+            ["'=1+1", "'+1", "'-1", "'@SUM(A1)", "'\tTab", "'\rReturn", "Plain - 1"],
+        )
+
+    async def test_export_streamed_by_asgi(self):
+        """Test the ASGI application streams the export without buffering it"""
+        token = await Token.objects.acreate(user=self.user)
+        res = await self.async_client.get(
+            task_export_url(self.project.id),
+            {"type": "csv"},
+            headers={"Authorization": f"Token {token.key}"},
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.is_async)
+        content = b"".join([chunk async for chunk in res.streaming_content])
+        rows = list(csv.DictReader(io.StringIO(content.decode())))
+        self.assertEqual(
+            [int(row["id"]) for row in rows], [task.id for task in self.tasks]
+        )
+
+    def test_export_invalid_type(self):
+        """Test an unknown export type is rejected"""
+        res = self.client.get(task_export_url(self.project.id), {"type": "xml"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_not_a_member(self):
+        """Test the tasks of another team's project can not be exported"""
+        project = Project.objects.create(
+            name="Project 3", team=Team.objects.create(name="Other team")
+        )
+        res = self.client.get(task_export_url(project.id))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_iterate_rows_in_chunks(self):
+        """Test rows are fetched in chunks with or without server side cursors"""
+        queryset = Task.objects.filter(project=self.project).values("id")
+        expected = [{"id": task.id} for task in self.tasks]
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(list(iterate_rows(queryset, chunk_size=2)), expected)
+        self.assertEqual(len(queries), 1)
+
+        settings_dict = dict(connection.settings_dict, DISABLE_SERVER_SIDE_CURSORS=True)
+        with mock.patch.object(connection, "settings_dict", settings_dict):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(list(iterate_rows(queryset, chunk_size=2)), expected)
+        ## three chunks and the empty one ending the export
+        self.assertEqual(len(queries), 4)
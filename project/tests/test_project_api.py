@@ -1,7 +1,15 @@
+import time
+from io import StringIO
+from datetime import timedelta
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from django.core.management import call_command
 from rest_framework.test import APIClient
 from django.urls import reverse
-from core.models import Project, Team, TeamMember
+from core.models import Job, Project, Team, TeamMember, Task
 from django.contrib.auth import get_user_model
 from rest_framework import status
 
@@ -77,7 +85,57 @@ class ProjectAPITests(TestCase):
 
         res = self.client.get(PROJECT_URL)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 2)
+        self.assertEqual(len(res.data["results"]), 2)
+
+    def test_list_project_counters(self):
+        """Test the task counters are listed without a query per project"""
+        member = create_member(user=self.user1, team=self.team)
+        project = create_project(name="Project 1", team=self.team)
+        past = timezone.now() - timedelta(days=1)
+        for status_value in ["TODO", "PROG", "DONE", "DONE"]:
+            Task.objects.create(
+                title="Task",
+                project=project,
+                created_by=member,
+                status=status_value,
+                due_date=past,
+            )
+
+        res = self.client.get(PROJECT_URL)
+        item = res.data["results"][0]
+        self.assertEqual(item["todo_count"], 1)
+        self.assertEqual(item["progress_count"], 1)
+        self.assertEqual(item["done_count"], 2)
+        self.assertEqual(item["overdue_count"], 2)
+        res = self.client.get(project_detail_url(project.id))
+        self.assertEqual(res.data["done_count"], 2)
+        self.assertEqual(res.data["overdue_count"], 2)
+
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(PROJECT_URL)
+        for i in range(3):
+            create_project(name=f"Project {i}", team=self.team)
+        with CaptureQueriesContext(connection) as other_context:
+            self.client.get(PROJECT_URL)
+        self.assertEqual(
+            len(context.captured_queries), len(other_context.captured_queries)
+        )
+
+    def test_list_project_many_teams(self):
+        """Test users with many teams see each of their projects once"""
+        create_member(user=self.user1, team=self.team)
+        team2 = create_team()
+        create_member(user=self.user1, team=team2)
+        user2 = create_user(username="testUser2", email="test2@example.com")
+        create_member(user=user2, team=self.team)
+        create_project(name="Project 1", team=self.team)
+        create_project(name="Project 2", team=team2)
+        create_project(name="Project 3", team=create_team())
+
+        res = self.client.get(PROJECT_URL)
+        self.assertEqual(
+            [item["name"] for item in res.data["results"]], ["Project 1", "Project 2"]
+        )
 
     def test_view_detail_project(self):
         """Test viewing project that the user is a part of"""
@@ -91,6 +149,36 @@ class ProjectAPITests(TestCase):
             reverse("team:team-detail", args=[project.team.id]), res.data["team"]
         )
 
+    def test_view_detail_project_conditional_get(self):
+        """Test a project is sent again only after it changed"""
+        create_member(user=self.user1, team=self.team)
+        project = create_project(name="Project 1", team=self.team)
+        url = project_detail_url(project.id)
+        etag = self.client.get(url)["ETag"]
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        project.name = "Changed name"
+        project.save()
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["name"], "Changed name")
+
+    def test_view_detail_project_no_last_modified(self):
+        """
+        Test a project has no Last-Modified date, its overdue count
+        changes with time while the project row stays the same.
+        """
+        create_member(user=self.user1, team=self.team)
+        project = create_project(name="Project 1", team=self.team)
+        url = project_detail_url(project.id)
+        res = self.client.get(url)
+        self.assertNotIn("Last-Modified", res)
+
+        res = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 3600))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
     def test_view_detail_project_not_allowed(self):
         """Test viewing project that user is not a part of fails"""
         project = create_project(name="Project 1", team=self.team)
@@ -136,6 +224,18 @@ class ProjectAPITests(TestCase):
         projects = Project.objects.all()
         self.assertFalse(projects.exists())
 
+    def test_create_project_team_being_deleted(self):
+        """Test no project can be created in a team whose deletion is pending"""
+        create_member(user=self.user1, team=self.team, is_admin=True)
+        Team.objects.filter(pk=self.team.pk).update(deleting=True)
+        payload = {
+            "name": "Test Project 1",
+            "team_id": self.team.id,
+        }
+        res = self.client.post(PROJECT_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Project.objects.exists())
+
     def test_partial_update_project_with_team_admin_role(self):
         """Test partial update project with team admin role successful"""
         create_member(team=self.team, user=self.user1, is_admin=True)
@@ -194,8 +294,27 @@ class ProjectAPITests(TestCase):
         """Test deleting project with team admin role successful"""
         create_member(team=self.team, user=self.user1, is_admin=True)
         project = create_project(name="Project 1", team=self.team)
-        res = self.client.delete(project_detail_url(project.id))
-        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        url = project_detail_url(project.id)
+        res = self.client.delete(url)
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        job_id = res.data["id"]
+
+        ## hidden and read only until the job deleted it
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        res = self.client.patch(url, {"name": "Changed name"})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        res = self.client.post(
+            reverse("project:task-list", args=[project.id]), {"title": "Task"}
+        )
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(PROJECT_URL).data["results"], [])
+        ## deleting again reports the pending job
+        res = self.client.delete(url)
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res.data["id"], job_id)
+        self.assertEqual(Job.objects.count(), 1)
+
+        call_command("run_jobs", stdout=StringIO())
         qs = Project.objects.filter(pk=project.id)
         self.assertFalse(qs.exists())
 
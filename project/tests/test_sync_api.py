@@ -0,0 +1,244 @@
+from datetime import timedelta
+from io import StringIO
+from django.core import signing
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from django.urls import reverse
+from core.models import Task, Project, Team, TeamMember, TaskTombstone
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from project.sync import SYNC_TOKEN_SALT, make_sync_token
+
+
+SYNC_URL = reverse("project:project-sync")
+
+
+def task_sync_url(project_id):
+    return reverse("project:task-sync", kwargs={"pk": project_id})
+
+
+def create_user(**params):
+    return get_user_model().objects.create_user(**params)
+
+
+def create_task(**params):
+    payload = {"title": "Task Title"}
+    payload.update(**params)
+    return Task.objects.create(**payload)
+
+
+@override_settings(SYNC_SAFETY_WINDOW_SECONDS=0)
+class TaskSyncAPITests(TestCase):
+    """Private Task Sync API Tests"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.client = APIClient()
+        cls.user1 = create_user(username="testUser1", email="test1@example.com")
+        cls.user2 = create_user(username="testUser2", email="test2@example.com")
+        cls.client.force_authenticate(user=cls.user1)
+        cls.team = Team.objects.create(name="Test team")
+        cls.member1 = TeamMember.objects.create(
+            user=cls.user1, team=cls.team, is_admin=True
+        )
+        cls.member2 = TeamMember.objects.create(user=cls.user2, team=cls.team)
+        cls.project = Project.objects.create(name="Project 1", team=cls.team)
+
+    def setUp(self):
+        self.client = TaskSyncAPITests.client
+
+    def test_sync_returns_changes_since_token(self):
+        """Test syncing returns only the created, updated and deleted tasks"""
+        unchanged = create_task(
+            project=self.project, assigned_to=self.member2, created_by=self.member1
+        )
+        updated = create_task(
+            project=self.project, assigned_to=self.member2, created_by=self.member1
+        )
+        deleted = create_task(
+            project=self.project, assigned_to=self.member2, created_by=self.member1
+        )
+        res = self.client.get(task_sync_url(self.project.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["changed"]), 3)
+        self.assertEqual(res.data["deleted"], [])
+
+        updated.status = "DONE"
+        updated.save()
+        created = create_task(
+            project=self.project, assigned_to=self.member2, created_by=self.member1
+        )
+        self.client.delete(
+            reverse(
+                "project:task-detail",
+                kwargs={"pk": self.project.id, "task_id": deleted.id},
+            )
+        )
+
+        res = self.client.get(
+            task_sync_url(self.project.id), {"since": res.data["token"]}
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        changed = [item["id"] for item in res.data["changed"]]
+        self.assertEqual(changed, [updated.id, created.id])
+        self.assertNotIn(unchanged.id, changed)
+        self.assertEqual(res.data["deleted"], [deleted.id])
+
+    def test_sync_member_removal(self):
+        """Test removing a member reports its created tasks and unassigned tasks"""
+        created_by_member2 = create_task(
+            project=self.project, assigned_to=self.member1, created_by=self.member2
+        )
+        assigned_to_member2 = create_task(
+            project=self.project, assigned_to=self.member2, created_by=self.member1
+        )
+        token = self.client.get(task_sync_url(self.project.id)).data["token"]
+
+        self.member2.delete()
+        res = self.client.get(task_sync_url(self.project.id), {"since": token})
+        self.assertEqual(res.data["deleted"], [created_by_member2.id])
+        self.assertEqual(
+            [item["id"] for item in res.data["changed"]], [assigned_to_member2.id]
+        )
+        self.assertIsNone(res.data["changed"][0]["assigned_to"])
+
+    def test_sync_all_projects_of_user(self):
+        """Test syncing across projects includes projects deleted with their team"""
+        team2 = Team.objects.create(name="Team 2")
+        member_team2 = TeamMember.objects.create(user=self.user1, team=team2)
+        project2 = Project.objects.create(name="Project 2", team=team2)
+        other_team = Team.objects.create(name="Other team")
+        other_member = TeamMember.objects.create(user=self.user2, team=other_team)
+        other_project = Project.objects.create(name="Other", team=other_team)
+        task1 = create_task(
+            project=self.project, assigned_to=self.member2, created_by=self.member1
+        )
+        task2 = create_task(
+            project=project2, assigned_to=member_team2, created_by=member_team2
+        )
+        create_task(
+            project=other_project, assigned_to=other_member, created_by=other_member
+        )
+
+        res = self.client.get(SYNC_URL)
+        self.assertEqual(
+            {item["id"] for item in res.data["changed"]}, {task1.id, task2.id}
+        )
+
+        project2.delete()
+        res = self.client.get(SYNC_URL, {"since": res.data["token"]})
+        self.assertEqual(res.data["changed"], [])
+        self.assertEqual(res.data["deleted"], [task2.id])
+        self.assertTrue(TaskTombstone.objects.filter(team_id=team2.id).exists())
+
+    def test_sync_after_membership_removed(self):
+        """Test a user removed from a team must sync again without a token"""
+        create_task(
+            project=self.project, assigned_to=self.member1, created_by=self.member1
+        )
+        client = APIClient()
+        client.force_authenticate(user=self.user2)
+        res = client.get(SYNC_URL)
+        self.assertEqual(len(res.data["changed"]), 1)
+
+        url = reverse(
+            "team:remove-member",
+            kwargs={"pk": self.team.id, "member_id": self.member2.id},
+        )
+        self.client.delete(url)
+        res = client.get(SYNC_URL, {"since": res.data["token"]})
+        self.assertEqual(res.status_code, status.HTTP_410_GONE)
+        res = client.get(SYNC_URL)
+        self.assertEqual(res.data["changed"], [])
+
+    def test_sync_after_team_deleted(self):
+        """Test the members of a deleted team must sync again without a token"""
+        create_task(
+            project=self.project, assigned_to=self.member1, created_by=self.member1
+        )
+        res = self.client.get(SYNC_URL)
+        self.assertEqual(len(res.data["changed"]), 1)
+        token = res.data["token"]
+
+        self.client.delete(reverse("team:team-detail", args=[self.team.id]))
+        call_command("run_jobs", stdout=StringIO())
+        res = self.client.get(SYNC_URL, {"since": token})
+        self.assertEqual(res.status_code, status.HTTP_410_GONE)
+
+    def test_sync_after_team_joined(self):
+        """Test tasks of a team joined after the token are not missed"""
+        team2 = Team.objects.create(name="Team 2")
+        project2 = Project.objects.create(name="Project 2", team=team2)
+        other_member = TeamMember.objects.create(user=self.user2, team=team2)
+        create_task(project=project2, created_by=other_member)
+        token = self.client.get(SYNC_URL).data["token"]
+
+        TeamMember.objects.create(user=self.user1, team=team2)
+        res = self.client.get(SYNC_URL, {"since": token})
+        self.assertEqual(res.status_code, status.HTTP_410_GONE)
+
+    def test_sync_invalid_token_fails(self):
+        """Test syncing with a tampered token fails"""
+        res = self.client.get(task_sync_url(self.project.id), {"since": "invalid"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sync_expired_token_fails(self):
+        """Test syncing with a token older than the tombstones requires a full sync"""
+        token = make_sync_token(timezone.now() - timedelta(days=365))
+        res = self.client.get(task_sync_url(self.project.id), {"since": token})
+        self.assertEqual(res.status_code, status.HTTP_410_GONE)
+
+    def test_sync_is_paged(self):
+        """Test a sync returns its changes page by page until has_more is false"""
+        tasks = [
+            create_task(
+                project=self.project, assigned_to=self.member2, created_by=self.member1
+            )
+            for _ in range(3)
+        ]
+        url = task_sync_url(self.project.id)
+        res = self.client.get(url, {"page_size": 2})
+        self.assertTrue(res.data["has_more"])
+        changed = [item["id"] for item in res.data["changed"]]
+
+        res = self.client.get(url, {"since": res.data["token"], "page_size": 2})
+        self.assertFalse(res.data["has_more"])
+        changed += [item["id"] for item in res.data["changed"]]
+        self.assertEqual(changed, [task.id for task in tasks])
+
+        task_ids = [task.id for task in tasks]
+        for task in tasks:
+            task.delete()
+        res = self.client.get(url, {"since": res.data["token"], "page_size": 2})
+        self.assertTrue(res.data["has_more"])
+        self.assertEqual(res.data["changed"], [])
+        deleted = res.data["deleted"]
+        res = self.client.get(url, {"since": res.data["token"], "page_size": 2})
+        self.assertFalse(res.data["has_more"])
+        deleted += res.data["deleted"]
+        self.assertEqual(deleted, task_ids)
+
+    @override_settings(SYNC_SAFETY_WINDOW_SECONDS=60)
+    def test_sync_resends_changes_within_safety_window(self):
+        """Test a change written before the token but committed later is sent"""
+        url = task_sync_url(self.project.id)
+        token = self.client.get(url).data["token"]
+        ## written before the token was issued by a transaction committing after it
+        late = create_task(
+            project=self.project, assigned_to=self.member2, created_by=self.member1
+        )
+        Task.objects.filter(pk=late.pk).update(
+            updated_at=timezone.now() - timedelta(seconds=30)
+        )
+
+        res = self.client.get(url, {"since": token})
+        self.assertEqual([item["id"] for item in res.data["changed"]], [late.id])
+
+    def test_sync_token_without_pages(self):
+        """Test a token holding only the moment of the last sync is accepted"""
+        token = signing.dumps(timezone.now().isoformat(), salt=SYNC_TOKEN_SALT)
+        res = self.client.get(task_sync_url(self.project.id), {"since": token})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(res.data["has_more"])
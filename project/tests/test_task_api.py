@@ -1,8 +1,15 @@
 import time
-from django.test import TestCase
+from io import StringIO
+from datetime import timedelta
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 from django.urls import reverse
-from core.models import Task, Project, Team, TeamMember
+from django.utils import timezone
+from core.models import Task, Project, Team, TeamMember, Job
 from django.contrib.auth import get_user_model
 from rest_framework import status
 
@@ -11,6 +18,13 @@ def task_detail_url(project_id, task_id):
     return reverse("project:task-detail", kwargs={"pk": project_id, "task_id": task_id})
 
 
+MY_TASKS_URL = reverse("project:project-my-tasks")
+
+
+def task_bulk_url(project_id):
+    return reverse("project:task-bulk", kwargs={"pk": project_id})
+
+
 def task_url(project_id):
     return reverse("project:task-list", kwargs={"pk": project_id})
 
@@ -52,6 +66,12 @@ def create_user(**params):
     return get_user_model().objects.create_user(**params)
 
 
+def count_queries(func):
+    with CaptureQueriesContext(connection) as context:
+        func()
+    return len(context.captured_queries)
+
+
 class TaskAPITests(TestCase):
     """Private Task API Tests"""
 
@@ -86,7 +106,7 @@ class TaskAPITests(TestCase):
 
         res = self.client.get(task_url(self.project.id))
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 2)
+        self.assertEqual(len(res.data["results"]), 2)
 
     def test_view_task_detail(self):
         """Test viewing task details where user is a team member of project"""
@@ -194,3 +214,368 @@ class TaskAPITests(TestCase):
         res = self.client.delete(task_detail_url(self.project.id, task.id))
         self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(Task.objects.all().exists())
+
+    def test_list_task_query_count_does_not_grow_with_rows(self):
+        """Test listing tasks costs the same number of queries for 1 or many tasks"""
+        payload = {
+            "title": "Task Title",
+            "project": self.project,
+            "assigned_to": self.member2,
+            "created_by": self.member1,
+        }
+        create_task(**payload)
+        url = task_url(self.project.id)
+        one_row = count_queries(lambda: self.client.get(url))
+
+        for _ in range(10):
+            create_task(**payload)
+        payload.update(assigned_to=self.member1)
+        create_task(**payload)
+        many_rows = count_queries(lambda: self.client.get(url))
+
+        self.assertEqual(one_row, many_rows)
+        res = self.client.get(url)
+        self.assertEqual(len(res.data["results"]), 12)
+        self.assertEqual(res.data["results"][0]["assigned_to"], self.user1.username)
+        self.assertIn(
+            task_detail_url(self.project.id, res.data["results"][0]["id"]),
+            res.data["results"][0]["url"],
+        )
+
+    def test_view_task_detail_query_count(self):
+        """Test viewing a task loads its assignee and creator with the task"""
+        payload = {
+            "title": "Task Title",
+            "project": self.project,
+            "assigned_to": self.member2,
+            "created_by": self.member1,
+        }
+        task = create_task(**payload)
+        url = task_detail_url(self.project.id, task.id)
+        ## one query for the project and one for the task with its relations
+        self.assertEqual(count_queries(lambda: self.client.get(url)), 2)
+
+    def test_list_task_cursor_pagination(self):
+        """Test walking the task list page by page returns every task once"""
+        payload = {
+            "title": "Task Title",
+            "project": self.project,
+            "assigned_to": self.member2,
+            "created_by": self.member1,
+        }
+        tasks = [create_task(**payload) for _ in range(5)]
+
+        res = self.client.get(task_url(self.project.id), {"page_size": 2})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        seen = [item["id"] for item in res.data["results"]]
+        ## a task created while paging must not shift the following pages
+        create_task(**payload)
+        while res.data["next"]:
+            res = self.client.get(res.data["next"])
+            seen.extend(item["id"] for item in res.data["results"])
+
+        self.assertEqual(seen, [task.id for task in reversed(tasks)])
+
+    def test_list_task_page_size_is_capped(self):
+        """Test requesting a page size above the maximum is capped"""
+        max_page_size = settings.PAGINATION_MAX_PAGE_SIZE
+        Task.objects.bulk_create(
+            [
+                Task(title=f"Task {i}", project=self.project, created_by=self.member1)
+                for i in range(max_page_size + 1)
+            ]
+        )
+        res = self.client.get(task_url(self.project.id), {"page_size": 10**6})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), max_page_size)
+        self.assertIsNotNone(res.data["next"])
+
+    def test_create_task_single_membership_query(self):
+        """Test creating a task resolves the user's membership only once"""
+        payload = {"title": "Task 1", "assigned_to": self.member2.pk}
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.post(task_url(self.project.id), payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["created_by"], self.user1.username)
+        membership_queries = [
+            query
+            for query in context.captured_queries
+            if query["sql"].split(" FROM ", 1)[-1].startswith('"core_teammember"')
+        ]
+        ## one for the user's memberships and one for loading assigned_to
+        self.assertEqual(len(membership_queries), 2)
+
+    def test_bulk_create_tasks(self):
+        """Test creating many tasks costs the same number of queries as one"""
+
+        def bulk_create(count):
+            payload = [
+                {"title": f"Task {i}", "assigned_to": self.member2.pk}
+                for i in range(count)
+            ]
+            with CaptureQueriesContext(connection) as context:
+                res = self.client.post(
+                    task_bulk_url(self.project.id), payload, format="json"
+                )
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            return len(context.captured_queries)
+
+        self.assertEqual(bulk_create(1), bulk_create(20))
+        tasks = Task.objects.filter(project=self.project)
+        self.assertEqual(tasks.count(), 21)
+        self.assertTrue(all(task.created_by == self.member1 for task in tasks))
+
+    def test_bulk_create_tasks_invalid_assigned_to(self):
+        """Test bulk creating tasks with an assignee from another team fails"""
+        other_team = create_team(name="Other team")
+        user3 = create_user(username="testUser3", email="test3@example.com")
+        other_member = create_member(user=user3, team=other_team)
+        payload = [
+            {"title": "Task 1", "assigned_to": self.member2.pk},
+            {"title": "Task 2", "assigned_to": other_member.pk},
+        ]
+        res = self.client.post(task_bulk_url(self.project.id), payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(JOBS={"TASK_BULK_SYNC_LIMIT": 2, "CHUNK_SIZE": 2})
+    def test_bulk_create_large_import_runs_as_job(self):
+        """Test imports above the limit are created in chunks by a job"""
+        payload = [
+            {"title": f"Task {i}", "assigned_to": self.member2.pk} for i in range(5)
+        ]
+        res = self.client.post(task_bulk_url(self.project.id), payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res.data["total"], 5)
+        self.assertFalse(Task.objects.exists())
+
+        call_command("run_jobs", stdout=StringIO())
+        job = Job.objects.get(pk=res.data["id"])
+        self.assertEqual(job.status, "DONE")
+        self.assertEqual(job.progress, 5)
+        tasks = Task.objects.filter(project=self.project)
+        self.assertEqual(tasks.count(), 5)
+        self.assertTrue(all(task.created_by == self.member1 for task in tasks))
+
+    @override_settings(JOBS={"TASK_BULK_SYNC_LIMIT": 1})
+    def test_bulk_create_large_import_invalid_assigned_to(self):
+        """Test large imports are validated before a job is queued"""
+        payload = [{"title": f"Task {i}", "assigned_to": 0} for i in range(2)]
+        res = self.client.post(task_bulk_url(self.project.id), payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Job.objects.exists())
+
+    def test_bulk_update_task_status(self):
+        """Test changing status and assignee of many tasks"""
+        payload = {
+            "title": "Task Title",
+            "project": self.project,
+            "assigned_to": self.member2,
+            "created_by": self.member1,
+        }
+        task1 = create_task(**payload)
+        task2 = create_task(**payload)
+        payload = [
+            {"id": task1.id, "status": "DONE"},
+            {"id": task2.id, "status": "PROG", "assigned_to": self.member1.pk},
+        ]
+        res = self.client.patch(task_bulk_url(self.project.id), payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        task1.refresh_from_db()
+        task2.refresh_from_db()
+        self.assertEqual(task1.status, "DONE")
+        self.assertEqual(task1.assigned_to, self.member2)
+        self.assertEqual(task2.status, "PROG")
+        self.assertEqual(task2.assigned_to, self.member1)
+
+    def test_bulk_update_task_of_other_project_fails(self):
+        """Test bulk updating a task of another project fails"""
+        project2 = create_project(team=self.team)
+        task = create_task(
+            title="Task Title",
+            project=project2,
+            assigned_to=self.member2,
+            created_by=self.member1,
+        )
+        payload = [{"id": task.id, "status": "DONE"}]
+        res = self.client.patch(task_bulk_url(self.project.id), payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        task.refresh_from_db()
+        self.assertEqual(task.status, "TODO")
+
+    def test_list_task_filters(self):
+        """Test filtering the task list by status, assignee, dates and search"""
+        payload = {
+            "title": "Task Title",
+            "project": self.project,
+            "assigned_to": self.member2,
+            "created_by": self.member1,
+        }
+        todo = create_task(**payload)
+        done = create_task(
+            **{**payload, "status": "DONE", "due_date": "2024-05-01T00:00:00Z"}
+        )
+        mine = create_task(
+            **{**payload, "assigned_to": self.member1, "description": "Fix login"}
+        )
+        url = task_url(self.project.id)
+
+        def ids(params):
+            res = self.client.get(url, params)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            return {item["id"] for item in res.data["results"]}
+
+        self.assertEqual(ids({"status": "DONE"}), {done.id})
+        self.assertEqual(ids({"status": ["TODO", "DONE"]}), {todo.id, done.id, mine.id})
+        self.assertEqual(ids({"assigned_to": self.member1.id}), {mine.id})
+        self.assertEqual(ids({"due_after": "2024-04-01T00:00:00Z"}), {done.id})
+        self.assertEqual(ids({"created_before": "2000-01-01T00:00:00Z"}), set())
+        self.assertEqual(ids({"search": "login"}), {mine.id})
+
+    def test_list_task_invalid_filter_fails(self):
+        """Test filtering the task list with an invalid value fails"""
+        res = self.client.get(task_url(self.project.id), {"status": "LATE"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_task_ordering(self):
+        """Test sorting the task list by a whitelisted key"""
+        payload = {
+            "project": self.project,
+            "assigned_to": self.member2,
+            "created_by": self.member1,
+        }
+        create_task(title="b", **payload)
+        create_task(title="a", **payload)
+        create_task(title="c", **payload)
+        url = task_url(self.project.id)
+
+        res = self.client.get(url, {"ordering": "created_at", "page_size": 2})
+        titles = [item["title"] for item in res.data["results"]]
+        res = self.client.get(res.data["next"])
+        titles += [item["title"] for item in res.data["results"]]
+        self.assertEqual(titles, ["b", "a", "c"])
+
+        ## keys outside of the whitelist are rejected,
+        ## editable columns can not be a stable cursor position
+        for ordering in ("description", "title", "-status"):
+            res = self.client.get(url, {"ordering": ordering})
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("ordering", res.data)
+
+    def test_my_tasks_across_projects(self):
+        """Test listing the tasks assigned to the user in all their teams"""
+        team2 = create_team(name="Team 2")
+        member_team2 = create_member(user=self.user1, team=team2)
+        project2 = create_project(team=team2)
+        payload = {"title": "Task Title", "created_by": self.member1}
+        mine1 = create_task(project=self.project, assigned_to=self.member1, **payload)
+        mine2 = create_task(project=project2, assigned_to=member_team2, **payload)
+        create_task(project=self.project, assigned_to=self.member2, **payload)
+
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(MY_TASKS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertEqual(
+            [(item["id"], item["project"]) for item in res.data["results"]],
+            [(mine2.id, project2.id), (mine1.id, self.project.id)],
+        )
+
+        res = self.client.get(MY_TASKS_URL, {"status": "DONE"})
+        self.assertEqual(res.data["results"], [])
+
+    def test_list_task_conditional_get(self):
+        """Test the task list is not sent again while it is unchanged"""
+        payload = {
+            "title": "Task Title",
+            "project": self.project,
+            "assigned_to": self.member2,
+            "created_by": self.member1,
+        }
+        task = create_task(**payload)
+        url = task_url(self.project.id)
+        res = self.client.get(url)
+        etag = res["ETag"]
+
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+        ## the project lookup and the aggregates of its tasks and
+        ## tombstones, nothing is serialized
+        self.assertEqual(len(context.captured_queries), 3)
+
+        task.status = "DONE"
+        task.save()
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+
+        etag = res["ETag"]
+        task.delete()
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_list_task_if_modified_since_after_delete(self):
+        """Test deleting a task is not hidden from If-Modified-Since requests"""
+        payload = {
+            "title": "Task Title",
+            "project": self.project,
+            "assigned_to": self.member2,
+            "created_by": self.member1,
+        }
+        task = create_task(**payload)
+        create_task(**payload)
+        url = task_url(self.project.id)
+        ## the deletion is recorded in a later second than the last update
+        Task.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+        last_modified = self.client.get(url)["Last-Modified"]
+        res = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        task.delete()
+        res = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 1)
+
+    def test_list_task_if_modified_since_filtered(self):
+        """Test a task leaving a filtered list is not hidden by its date"""
+        payload = {
+            "title": "Task Title",
+            "project": self.project,
+            "assigned_to": self.member2,
+            "created_by": self.member1,
+        }
+        task = create_task(status="TODO", **payload)
+        create_task(status="TODO", **payload)
+        Task.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+        url = task_url(self.project.id)
+        last_modified = self.client.get(url, {"status": "TODO"})["Last-Modified"]
+
+        task.status = "DONE"
+        task.save()
+        res = self.client.get(
+            url, {"status": "TODO"}, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 1)
+
+    def test_view_task_detail_conditional_get(self):
+        """Test a task is not sent again while it is unchanged"""
+        payload = {
+            "title": "Task Title",
+            "project": self.project,
+            "assigned_to": self.member2,
+            "created_by": self.member1,
+        }
+        task = create_task(**payload)
+        url = task_detail_url(self.project.id, task.id)
+        res = self.client.get(url)
+        self.assertIn("Last-Modified", res)
+
+        res = self.client.get(url, HTTP_IF_MODIFIED_SINCE=res["Last-Modified"])
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        res = self.client.get(url, HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
@@ -15,6 +15,16 @@ urlpatterns = [
         ProjectViewSet.as_view({"get": "task_list", "post": "task_list"}),
         name="task-list",
     ),
+    path(
+        "<int:pk>/task/sync/",
+        ProjectViewSet.as_view({"get": "task_sync"}),
+        name="task-sync",
+    ),
+    path(
+        "<int:pk>/task/bulk/",
+        ProjectViewSet.as_view({"post": "task_bulk", "patch": "task_bulk"}),
+        name="task-bulk",
+    ),
     path(
         "<int:pk>/task/<int:task_id>/",
         ProjectViewSet.as_view(
@@ -22,4 +32,16 @@ urlpatterns = [
         ),
         name="task-detail",
     ),
+    path(
+        "<int:pk>/task/<int:task_id>/comment/",
+        ProjectViewSet.as_view({"get": "task_comments", "post": "task_comments"}),
+        name="task-comments",
+    ),
+    path(
+        "<int:pk>/task/<int:task_id>/comment/<int:comment_id>/",
+        ProjectViewSet.as_view(
+            {"patch": "task_comment_detail", "delete": "task_comment_detail"}
+        ),
+        name="task-comment-detail",
+    ),
 ]
@@ -1,23 +1,43 @@
+from django.db import transaction
+from django.db.models import Count, Max
 from django.shortcuts import get_object_or_404
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework import status
-from core.models import Project, TeamMember
+from core.models import Team, Project, Task, TaskTombstone, Comment
+from core.membership import get_membership_resolver, filter_visible_teams
+from core.pagination import TaskCursorPagination, CommentCursorPagination
+from core.conditional import make_etag, not_modified, add_conditional_headers
+from core.jobs import enqueue_job, delete_in_background, get_job_option
+from core.views import job_accepted_response
+from core.dashboard import invalidate_dashboards
+from core.exports import export_response
+from user.authentication import CachedTokenAuthentication
 from .serializers import (
     ProjectSerializer,
     ProjectListSerializer,
+    ProjectListValuesSerializer,
     TaskListSerializer,
+    TaskListValuesSerializer,
+    MyTaskListSerializer,
+    MyTaskListValuesSerializer,
+    TaskExportValuesSerializer,
+    TaskSyncSerializer,
     TaskSerializer,
+    TaskBulkSerializer,
+    CommentSerializer,
 )
 from .permission import IsAllowedToUpdateOrDelete
+from .query_plans import apply_query_plan
+from .filters import filter_tasks, filter_comments
+from .sync import get_changes, get_teams_scope
 
 
 class ProjectViewSet(ModelViewSet):
     serializer_class = ProjectSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
     queryset = Project.objects.all()
 
@@ -28,7 +48,16 @@ class ProjectViewSet(ModelViewSet):
             return self.serializer_class
 
     def get_queryset(self):
-        return self.queryset.filter(team__member__user=self.request.user)
+        queryset = filter_visible_teams(self.request, self.queryset)
+        queryset = queryset.filter(team__deleting=False)
+        ## a project being deleted can only be deleted again
+        if self.action != "destroy":
+            queryset = queryset.filter(deleting=False)
+        ## task actions reuse this queryset only to look up the project,
+        ## so the plan of their task serializer must not be applied here
+        if self.action in ["list", "retrieve"]:
+            queryset = apply_query_plan(queryset, self.get_serializer_class())
+        return queryset
 
     def check_team_admin(self, team_id):
         """
@@ -36,14 +65,17 @@ class ProjectViewSet(ModelViewSet):
         because we want to send an appropriate status code when
         team_id is invalid or user is not a team admin we do this
         check in view and not in the serializer despite the fact
-        that it is a data validation.
+        that it is a data validation. Teams being deleted are not found,
+        their row stays locked until the project is written.
         """
         ## Check if user is team member
-        try:
-            member = get_object_or_404(
-                TeamMember, team__id=team_id, user=self.request.user
-            )
-        except:
+        member = get_membership_resolver(self.request).get_member(team_id)
+        if (
+            member is None
+            or not Team.objects.select_for_update()
+            .filter(pk=team_id, deleting=False)
+            .exists()
+        ):
             return Response(
                 {"detail": "Team id not found."}, status=status.HTTP_404_NOT_FOUND
             )
@@ -62,19 +94,51 @@ class ProjectViewSet(ModelViewSet):
             return Response(
                 {"detail": "team_id is required."}, status=status.HTTP_400_BAD_REQUEST
             )
-        res = self.check_team_admin(team_id)
-        if res:
-            return res
-        return super().create(request, *args, **kwargs)
+        with transaction.atomic():
+            res = self.check_team_admin(team_id)
+            if res:
+                return res
+            return super().create(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        """Lists the projects from .values() rows of the list query plan"""
+        queryset = ProjectListValuesSerializer.apply(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        serializer = ProjectListValuesSerializer(
+            page, context=self.get_serializer_context()
+        )
+        return self.get_paginated_response(serializer.data)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Answers conditional requests without serializing the project"""
+        instance = self.get_object()
+        ## the overdue count changes with time and not with the project, so
+        ## there is no Last-Modified date that would agree with the ETag
+        etag = make_etag(
+            "project", instance.pk, instance.updated_at, instance.overdue_count
+        )
+        response = not_modified(request, etag)
+        if response is None:
+            serializer = self.get_serializer(instance)
+            response = Response(serializer.data)
+        return add_conditional_headers(response, etag)
 
     def update(self, request, *args, **kwargs):
         """Checks for user to be a team admin of the requested team_id"""
         team_id = self.request.data.get("team_id", None)
-        if team_id:
-            res = self.check_team_admin(team_id)
-            if res:
-                return res
-        return super().update(request, *args, **kwargs)
+        with transaction.atomic():
+            if team_id:
+                res = self.check_team_admin(team_id)
+                if res:
+                    return res
+            return super().update(request, *args, **kwargs)
+
+    def destroy(self, request, *args, **kwargs):
+        """Deletes the project with its tasks in a background job"""
+        instance = self.get_object()
+        job = delete_in_background(instance, "project.delete", user=request.user)
+        invalidate_dashboards(instance.team_id)
+        return job_accepted_response(request, job)
 
     @action(
         detail=True,
@@ -85,11 +149,37 @@ class ProjectViewSet(ModelViewSet):
     def task_list(self, request, pk=None):
         project = self.get_object()
         if request.method == "GET":
-            queryset = project.tasks.all().order_by("-created_at")
-            serializer = TaskListSerializer(
-                queryset, context={"request": request}, many=True
+            queryset = filter_tasks(project.tasks.all(), request.query_params)
+            ## the collection changes whenever a task of the project is added,
+            ## updated or removed, an update may move a task out of the filters
+            ## and a removal only leaves a tombstone behind
+            stats = project.tasks.aggregate(
+                last_modified=Max("updated_at"), count=Count("id")
+            )
+            last_deleted = TaskTombstone.objects.filter(
+                project_id=project.pk
+            ).aggregate(last_deleted=Max("deleted_at"))["last_deleted"]
+            last_modified = max(
+                filter(None, [stats["last_modified"], last_deleted]), default=None
             )
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            etag = make_etag(
+                "tasks",
+                project.pk,
+                stats["count"],
+                last_modified,
+                request.get_full_path(),
+            )
+            response = not_modified(request, etag, last_modified)
+            if response is not None:
+                return response
+
+            queryset = TaskListValuesSerializer.apply(queryset)
+            ## tasks are ordered by the paginator, by default on (created_at, id)
+            paginator = TaskCursorPagination()
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            serializer = TaskListValuesSerializer(page, context={"request": request})
+            response = paginator.get_paginated_response(serializer.data)
+            return add_conditional_headers(response, etag, last_modified)
         elif request.method == "POST":
             serializer = TaskSerializer(data=request.data, context={"request": request})
             if serializer.is_valid():
@@ -98,6 +188,155 @@ class ProjectViewSet(ModelViewSet):
             else:
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="my-tasks",
+        serializer_class=MyTaskListSerializer,
+    )
+    def my_tasks(self, request):
+        """
+        Lists the tasks assigned to the user in all of their teams,
+        accepts the same filters and ordering as the task list.
+        """
+        ## a single query joining the tasks to the user's TeamMember rows
+        queryset = Task.objects.filter(
+            assigned_to__user=request.user,
+            assigned_to__deleting=False,
+            project__deleting=False,
+            project__team__deleting=False,
+        )
+        queryset = filter_tasks(queryset, request.query_params)
+        queryset = MyTaskListValuesSerializer.apply(queryset)
+        paginator = TaskCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = MyTaskListValuesSerializer(page, context={"request": request})
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=["get"], url_path="task/export")
+    def task_export(self, request, pk=None):
+        """Streams all tasks of the project as JSON Lines or with ?type=csv as CSV"""
+        project = self.get_object()
+        return export_response(
+            request,
+            TaskExportValuesSerializer,
+            project.tasks.all(),
+            f"project-{project.pk}-tasks",
+        )
+
+    def sync_response(self, request, tasks, tombstones, scope=None):
+        """
+        Returns one page of changes, clients request the next page with
+        the returned token while has_more is true.
+        """
+        tasks, deleted, token, has_more = get_changes(
+            apply_query_plan(tasks, TaskSyncSerializer),
+            tombstones,
+            request.query_params.get("since", None),
+            page_size=TaskCursorPagination().get_page_size(request),
+            scope=scope,
+        )
+        serializer = TaskSyncSerializer(tasks, context={"request": request}, many=True)
+        return Response(
+            {
+                "changed": serializer.data,
+                "deleted": deleted,
+                "token": token,
+                "has_more": has_more,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path="task/sync",
+        serializer_class=TaskSyncSerializer,
+    )
+    def task_sync(self, request, pk=None):
+        """
+        Returns the tasks of the project created or updated and the ids of
+        the tasks deleted since the since token, with the token of the next
+        page or sync
+        """
+        project = self.get_object()
+        return self.sync_response(
+            request,
+            project.tasks.all(),
+            TaskTombstone.objects.filter(project_id=project.pk),
+        )
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="sync",
+        serializer_class=TaskSyncSerializer,
+    )
+    def sync(self, request):
+        """Same as task sync for the tasks of all projects of the user's teams"""
+        team_ids = list(get_membership_resolver(request).members)
+        return self.sync_response(
+            request,
+            Task.objects.filter(
+                project__team_id__in=team_ids,
+                project__deleting=False,
+                project__team__deleting=False,
+            ),
+            TaskTombstone.objects.filter(team_id__in=team_ids),
+            ## a token of other teams misses the tasks of the teams left or joined
+            scope=get_teams_scope(team_ids),
+        )
+
+    @action(
+        detail=True,
+        methods=["post", "patch"],
+        url_path="task/bulk",
+        serializer_class=TaskBulkSerializer,
+    )
+    def task_bulk(self, request, pk=None):
+        """
+        Creates an array of tasks on POST or changes status and
+        assigned_to of an array of {id, status, assigned_to} on PATCH,
+        imports above TASK_BULK_SYNC_LIMIT tasks return 202 with a job
+        """
+        project = self.get_object()
+        if request.method == "POST":
+            serializer = TaskBulkSerializer(
+                data=request.data,
+                many=True,
+                allow_empty=False,
+                context={"request": request},
+            )
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            if len(request.data) > get_job_option("TASK_BULK_SYNC_LIMIT", 1000):
+                ## large imports are checked here and created in chunks by a job
+                serializer.check_project(project, serializer.validated_data)
+                job = enqueue_job(
+                    "task.bulk_create",
+                    {"project_id": project.pk, "tasks": request.data},
+                    user=request.user,
+                    total=len(request.data),
+                )
+                return job_accepted_response(request, job)
+            serializer.save(project=project)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+        elif request.method == "PATCH":
+            serializer = TaskBulkSerializer(
+                project.tasks.all(),
+                data=request.data,
+                many=True,
+                allow_empty=False,
+                partial=True,
+                context={"request": request},
+            )
+            if serializer.is_valid():
+                serializer.save(project=project)
+                return Response(serializer.data, status=status.HTTP_200_OK)
+            else:
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
     @action(
         detail=True,
         methods=["get", "patch", "delete"],
@@ -107,15 +346,27 @@ class ProjectViewSet(ModelViewSet):
     def task_detail(self, request, pk=None, task_id=None):
         project = self.get_object()
         try:
-            task = get_object_or_404(project.tasks, pk=task_id)
+            task = get_object_or_404(
+                apply_query_plan(project.tasks.all(), TaskSerializer), pk=task_id
+            )
         except:
             return Response(
                 {"detail": "Task id not found."}, status=status.HTTP_404_NOT_FOUND
             )
 
         if request.method == "GET":
-            serializer = TaskSerializer(task)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            etag = make_etag(
+                "task",
+                task.pk,
+                task.updated_at,
+                task.assigned_to_id,
+                task.created_by_id,
+            )
+            response = not_modified(request, etag, task.updated_at)
+            if response is None:
+                serializer = TaskSerializer(task)
+                response = Response(serializer.data, status=status.HTTP_200_OK)
+            return add_conditional_headers(response, etag, task.updated_at)
 
         elif request.method == "PATCH":
             serializer = TaskSerializer(task, data=request.data, partial=True)
@@ -129,6 +380,101 @@ class ProjectViewSet(ModelViewSet):
             task.delete()
             return Response(status=status.HTTP_204_NO_CONTENT)
 
+    def paginate_comments(self, request, queryset):
+        queryset = apply_query_plan(queryset, CommentSerializer)
+        paginator = CommentCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = CommentSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(
+        detail=True,
+        methods=["get", "post"],
+        url_path="task/<int:task_id>/comment",
+        serializer_class=CommentSerializer,
+    )
+    def task_comments(self, request, pk=None, task_id=None):
+        """Lists the comments of a task oldest first or adds a comment"""
+        project = self.get_object()
+        task = project.tasks.filter(pk=task_id).first()
+        if task is None:
+            return Response(
+                {"detail": "Task id not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+        ## the serializer takes the team from the task without a query
+        task.project = project
+
+        if request.method == "GET":
+            return self.paginate_comments(request, task.comments.all())
+
+        elif request.method == "POST":
+            serializer = CommentSerializer(
+                data=request.data, context={"request": request}
+            )
+            if serializer.is_valid():
+                serializer.save(task=task)
+                return Response(serializer.data, status=status.HTTP_201_CREATED)
+            else:
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(
+        detail=True,
+        methods=["patch", "delete"],
+        url_path="task/<int:task_id>/comment/<int:comment_id>",
+        serializer_class=CommentSerializer,
+    )
+    def task_comment_detail(self, request, pk=None, task_id=None, comment_id=None):
+        """
+        Only the author edits a comment, the author
+        or a team admin may delete it
+        """
+        project = self.get_object()
+        queryset = apply_query_plan(
+            Comment.objects.filter(task__project=project, task_id=task_id),
+            CommentSerializer,
+        )
+        comment = queryset.filter(pk=comment_id).first()
+        if comment is None:
+            return Response(
+                {"detail": "Comment id not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+        member = get_membership_resolver(request).get_member(project.team_id)
+        ## the membership may have been revoked since the project was looked up
+        if member is None or not (
+            comment.created_by_id == member.pk
+            or (request.method == "DELETE" and member.is_admin)
+        ):
+            return Response(
+                {"detail": "You do not have permission to perform this action."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        if request.method == "PATCH":
+            serializer = CommentSerializer(comment, data=request.data, partial=True)
+            if serializer.is_valid():
+                serializer.save()
+                return Response(serializer.data, status=status.HTTP_200_OK)
+            else:
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        elif request.method == "DELETE":
+            comment.delete()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path="comment",
+        serializer_class=CommentSerializer,
+    )
+    def comments(self, request, pk=None):
+        """Lists the comments of several tasks of the project, ?task=1&task=2"""
+        project = self.get_object()
+        queryset = filter_comments(
+            Comment.objects.filter(task__project=project), request.query_params
+        )
+        return self.paginate_comments(request, queryset)
+
     def get_permissions(self):
         """
         Instantiates and returns the list of permissions that this view requires.
@@ -1,4 +1,5 @@
 from rest_framework import permissions
+from core.membership import get_membership_resolver
 
 
 class IsAllowedToEdit(permissions.BasePermission):
@@ -11,7 +12,9 @@ class IsAllowedToEdit(permissions.BasePermission):
         if request.method not in ["PATCH", "PUT"]:
             return True
 
-        member = obj.member.get(user=request.user)
+        member = get_membership_resolver(request).get_member(obj.id)
+        if member is None:
+            return False
         if member.is_admin:
             return True
         elif obj.public_edit == "ALL":
@@ -29,11 +32,7 @@ class IsAllowedToDelete(permissions.BasePermission):
         if request.method != "DELETE":
             return True
 
-        member = obj.member.get(user=request.user)
-        if member.is_admin:
-            return True
-
-        return False
+        return get_membership_resolver(request).is_admin(obj.id)
 
 
 class IsAllowedToAddOrEditMembers(permissions.BasePermission):
@@ -46,11 +45,7 @@ class IsAllowedToAddOrEditMembers(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
 
-        member = obj.member.get(user=request.user)
-        if member.is_admin:
-            return True
-
-        return False
+        return get_membership_resolver(request).is_admin(obj.id)
 
 
 class IsAllowedToRemoveMembers(permissions.BasePermission):
@@ -67,8 +62,7 @@ class IsAllowedToRemoveMembers(permissions.BasePermission):
         if not team:
             return False
 
-        member = team.member.get(user=request.user)
-        if member.is_admin:
+        if get_membership_resolver(request).is_admin(team.id):
             return True
 
-        return obj.user.id == request.user.id
+        return obj.user_id == request.user.id
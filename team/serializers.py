@@ -1,36 +1,109 @@
+from django.db import transaction
 from rest_framework import serializers
 from core.models import Team, TeamMember
+from core.membership import get_membership_resolver, invalidate_memberships
+from core.events import publish_on_commit
+from core.dashboard import invalidate_dashboards
+from core.reverse import url_template
+from core.fields import CachedHyperlinkedIdentityField
+from core.values import ValuesSerializer
 from django.contrib.auth import get_user_model
 
 
+## Number of emails resolved and members inserted per query when inviting
+BULK_INVITE_BATCH_SIZE = 500
+
+
+def chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
 class TeamMemberListSerializer(serializers.ListSerializer):
     """Serializer for creating and updating multiple team members"""
 
     def create(self, validated_data):
-        """Adding multiple member to team"""
+        """
+        Adding multiple member to team, the result of each email
+        (added, already_member or unknown) is stored in self.report.
+        unknown emails do not stop the known ones from being added,
+        the invite fails only if none of the emails belongs to a user.
+        """
         team = validated_data[0].pop("team", None)
         if team == None:
             raise serializers.ValidationError(
                 "Team object should be specified for adding members"
             )
 
-        team_members = []
-        for item in validated_data:
-            email = item.pop("user").get("email", None)
-            try:
-                user = get_user_model().objects.get(email=email)
-                ## check for duplication of member in the team
-                ## if member is not already in the team then add it.
-                if not team.member.filter(user=user).exists():
-                    team_members.append(
-                        TeamMember(team=team, user=user, is_admin=False)
+        ## keep the payload order but drop repeated emails
+        emails = list(
+            dict.fromkeys(
+                item.pop("user", {}).get("email", None) for item in validated_data
+            )
+        )
+        if None in emails:
+            emails.remove(None)
+
+        ## resolve all emails with one query per batch
+        users = {}
+        for batch in chunks(emails, BULK_INVITE_BATCH_SIZE):
+            users.update(
+                get_user_model()
+                .objects.filter(email__in=batch)
+                .values_list("email", "id")
+            )
+
+        if emails and not users:
+            raise serializers.ValidationError(
+                f"There is no user with email {', '.join(emails)}"
+            )
+
+        with transaction.atomic():
+            ## concurrent invites to the team wait here, so the existing
+            ## memberships read below are the ones the insert conflicts with
+            Team.objects.select_for_update().filter(pk=team.pk).exists()
+            existing = set()
+            for batch in chunks(list(users.values()), BULK_INVITE_BATCH_SIZE):
+                existing.update(
+                    team.member.filter(user_id__in=batch).values_list(
+                        "user_id", flat=True
                     )
-            except:
-                raise serializers.ValidationError(
-                    f"There is no user with email {email}"
                 )
+            added = [user_id for user_id in users.values() if user_id not in existing]
+            TeamMember.objects.bulk_create(
+                [
+                    TeamMember(team=team, user_id=user_id, is_admin=False)
+                    for user_id in added
+                ],
+                batch_size=BULK_INVITE_BATCH_SIZE,
+                ## skips a membership added outside of an invite meanwhile
+                ignore_conflicts=True,
+            )
+            ## bulk_create does not set the ids of the rows it inserted
+            team_members = []
+            for batch in chunks(added, BULK_INVITE_BATCH_SIZE):
+                team_members.extend(team.member.filter(user_id__in=batch))
+
+        ## bulk_create does not send post_save signals
+        invalidate_memberships(*[member.user_id for member in team_members])
+        invalidate_dashboards(team.pk)
+        for member in team_members:
+            publish_on_commit(
+                "member.saved", team.pk, id=member.pk, user_id=member.user_id
+            )
 
-        return TeamMember.objects.bulk_create(team_members)
+        self.report = []
+        added_ids = {member.user_id for member in team_members}
+        for email in emails:
+            user_id = users.get(email, None)
+            if user_id is None:
+                result = "unknown"
+            elif user_id in added_ids:
+                result = "added"
+            else:
+                result = "already_member"
+            self.report.append({"email": email, "result": result})
+        return team_members
 
     def update(self, instance, validated_data):
         """Updating multiple members of the team"""
@@ -51,6 +124,13 @@ class TeamMemberListSerializer(serializers.ListSerializer):
                 objs.append(member)
 
         TeamMember.objects.bulk_update(objs, ["is_admin"])
+        ## bulk_update does not send post_save signals
+        invalidate_memberships(*[member.user_id for member in objs])
+        invalidate_dashboards(*{member.team_id for member in objs})
+        for member in objs:
+            publish_on_commit(
+                "member.saved", member.team_id, id=member.pk, user_id=member.user_id
+            )
         return objs
 
 
@@ -70,15 +150,42 @@ class TeamMemberSerializer(serializers.ModelSerializer):
         list_serializer_class = TeamMemberListSerializer
 
 
+class TeamMemberValuesSerializer(ValuesSerializer):
+    """Fast read-only TeamMemberSerializer for listing members"""
+
+    columns = ["id", "user__email", "user__last_name", "user__first_name", "is_admin"]
+
+    def to_representation(self, row):
+        return {
+            "id": row["id"],
+            "email": row["user__email"],
+            "last_name": row["user__last_name"],
+            "first_name": row["user__first_name"],
+            "is_admin": row["is_admin"],
+        }
+
+
 class TeamListSerializer(serializers.Serializer):
     """Serializer for listing team objects"""
 
-    url = serializers.HyperlinkedIdentityField(
-        read_only=True, view_name="team:team-detail"
-    )
+    url = CachedHyperlinkedIdentityField(read_only=True, view_name="team:team-detail")
     name = serializers.CharField()
 
 
+class TeamListValuesSerializer(ValuesSerializer):
+    """Fast read-only TeamListSerializer"""
+
+    columns = ["id", "name"]
+
+    def setup(self):
+        self.team_url = url_template(
+            "team:team-detail", ["pk"], request=self.context.get("request")
+        )
+
+    def to_representation(self, row):
+        return {"url": self.team_url.format(pk=row["id"]), "name": row["name"]}
+
+
 class TeamSerializer(serializers.ModelSerializer):
     # members_list = serializers.HyperlinkedRelatedField(
     #     view_name="team:member-list", read_only=True
@@ -98,9 +205,8 @@ class TeamSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         """Remove public_edit and privacy_edit fields for regular members"""
         ret = super().to_representation(instance)
-        user = self.context["request"].user
-        team_member = instance.member.get(user=user)
-        if team_member.is_admin == False:
+        resolver = get_membership_resolver(self.context["request"])
+        if not resolver.is_admin(instance.id):
             ret.pop("public_edit", None)
             ret.pop("privacy_edit", None)
         return ret
@@ -111,19 +217,17 @@ class TeamSerializer(serializers.ModelSerializer):
         validated_data.pop("privacy_edit", None)
 
         team = Team.objects.create(**validated_data)
-        user = self.context["request"].user
-        TeamMember.objects.create(user=user, team=team, is_admin=True)
+        request = self.context["request"]
+        member = TeamMember.objects.create(user=request.user, team=team, is_admin=True)
+        get_membership_resolver(request).remember(member)
         return team
 
-    def check_user_is_admin(self, user, team):
-        member = team.member.get(user=user)
-        if member.is_admin:
-            return True
-        return False
+    def check_user_is_admin(self, team):
+        resolver = get_membership_resolver(self.context["request"])
+        return resolver.is_admin(team.id)
 
     def update(self, instance, validated_data):
-        user = self.context["request"].user
-        if not self.check_user_is_admin(user, instance):
+        if not self.check_user_is_admin(instance):
             if (
                 "public_edit" in validated_data.keys()
                 or "privacy_edit" in validated_data.keys()
@@ -1,4 +1,8 @@
+from io import StringIO
+from django.db import connection
+from django.core.management import call_command
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.urls import reverse
@@ -25,6 +29,14 @@ def create_team(**params):
     return Team.objects.create(**payload)
 
 
+def count_membership_queries(context):
+    ## queries reading the memberships, not the ones filtering by them
+    return sum(
+        query["sql"].split(" FROM ", 1)[-1].startswith('"core_teammember"')
+        for query in context.captured_queries
+    )
+
+
 class PublicTeamApiTests(TestCase):
     """Test unauthenticated team API access"""
 
@@ -173,8 +185,25 @@ class TestTeamAPI(TestCase):
         team = create_team()
         TeamMember.objects.create(user=self.user, team=team, is_admin=True)
         res = self.client.delete(team_detail_url(team.id))
-        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res.data["status"], "PENDING")
+        self.assertTrue(Team.objects.filter(id=team.id).exists())
+        job_url = res["Location"]
+
+        ## hidden and read only until the job deleted it
+        url = team_detail_url(team.id)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        res = self.client.patch(url, {"name": "Changed name"})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        ## deleting again reports the pending job
+        res = self.client.delete(url)
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res["Location"], job_url)
+
+        call_command("run_jobs", stdout=StringIO())
         self.assertFalse(Team.objects.filter(id=team.id).exists())
+        res = self.client.get(res["Location"])
+        self.assertEqual(res.data["status"], "DONE")
 
     def test_delete_team_without_admin_role(self):
         """
@@ -185,3 +214,32 @@ class TestTeamAPI(TestCase):
         res = self.client.delete(team_detail_url(team.id))
         self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
         self.assertTrue(Team.objects.filter(id=team.id).exists())
+
+    def test_partial_update_team_single_membership_query(self):
+        """Test a team update resolves the user's membership only once"""
+        team = create_team()
+        TeamMember.objects.create(user=self.user, team=team, is_admin=True)
+        payload = {"name": "Changed Name", "public_edit": "ADMIN"}
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.patch(team_detail_url(team.id), payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("public_edit", res.data)
+        self.assertEqual(count_membership_queries(context), 1)
+
+    def test_view_team_detail_conditional_get(self):
+        """Test a team is not sent again while it is unchanged"""
+        team = create_team()
+        member = TeamMember.objects.create(user=self.user, team=team)
+        url = team_detail_url(team.id)
+        etag = self.client.get(url)["ETag"]
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        ## admins get a different representation
+        member.is_admin = True
+        member.save()
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("public_edit", res.data)
@@ -0,0 +1,193 @@
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.dashboard import get_dashboard_cache
+from core.models import Team, TeamMember, Project, Task
+
+
+def dashboard_url(team_id):
+    return reverse("team:team-dashboard", args=[team_id])
+
+
+def create_user(**params):
+    return get_user_model().objects.create_user(**params)
+
+
+class TeamDashboardAPITests(TestCase):
+    """Private Team Dashboard API Tests"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.client = APIClient()
+        cls.user1 = create_user(username="testUser1", email="test1@example.com")
+        cls.user2 = create_user(username="testUser2", email="test2@example.com")
+        cls.client.force_authenticate(user=cls.user1)
+        cls.team = Team.objects.create(name="Test team")
+        cls.member1 = TeamMember.objects.create(
+            user=cls.user1, team=cls.team, is_admin=True
+        )
+        cls.member2 = TeamMember.objects.create(user=cls.user2, team=cls.team)
+        cls.project1 = Project.objects.create(name="Project 1", team=cls.team)
+        cls.project2 = Project.objects.create(name="Project 2", team=cls.team)
+
+    def setUp(self):
+        self.client = TeamDashboardAPITests.client
+
+    def create_task(self, **params):
+        payload = {
+            "title": "Task",
+            "project": self.project1,
+            "created_by": self.member1,
+        }
+        payload.update(**params)
+        return Task.objects.create(**payload)
+
+    def test_dashboard(self):
+        """Test the dashboard aggregates projects and workload of the team"""
+        past = timezone.now() - timedelta(days=1)
+        self.create_task(assigned_to=self.member2, due_date=past)
+        self.create_task(assigned_to=self.member2, status="PROG")
+        self.create_task(assigned_to=self.member1, status="DONE", due_date=past)
+        self.create_task(project=self.project2, assigned_to=self.member1)
+
+        res = self.client.get(dashboard_url(self.team.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["member_count"], 2)
+        self.assertEqual(res.data["overdue_count"], 1)
+        self.assertEqual(
+            res.data["projects"],
+            [
+                {
+                    "id": self.project1.id,
+                    "name": "Project 1",
+                    "todo_count": 1,
+                    "progress_count": 1,
+                    "done_count": 1,
+                    "overdue_count": 1,
+                },
+                {
+                    "id": self.project2.id,
+                    "name": "Project 2",
+                    "todo_count": 1,
+                    "progress_count": 0,
+                    "done_count": 0,
+                    "overdue_count": 0,
+                },
+            ],
+        )
+        self.assertEqual(
+            res.data["workload"],
+            [
+                {
+                    "id": self.member1.id,
+                    "is_admin": True,
+                    "username": "testUser1",
+                    "todo": 1,
+                    "progress": 0,
+                    "overdue": 0,
+                },
+                {
+                    "id": self.member2.id,
+                    "is_admin": False,
+                    "username": "testUser2",
+                    "todo": 1,
+                    "progress": 1,
+                    "overdue": 1,
+                },
+            ],
+        )
+
+    def test_dashboard_project_being_deleted(self):
+        """Test the workload leaves out the tasks of projects being deleted"""
+        past = timezone.now() - timedelta(days=1)
+        self.create_task(assigned_to=self.member1)
+        self.create_task(project=self.project2, assigned_to=self.member1)
+        self.create_task(project=self.project2, assigned_to=self.member1, due_date=past)
+        self.create_task(project=self.project2, assigned_to=self.member1, status="PROG")
+        Project.objects.filter(pk=self.project2.pk).update(deleting=True)
+
+        res = self.client.get(dashboard_url(self.team.id))
+        self.assertEqual(
+            [project["id"] for project in res.data["projects"]], [self.project1.id]
+        )
+        workload = res.data["workload"][0]
+        self.assertEqual(
+            (workload["todo"], workload["progress"], workload["overdue"]), (1, 0, 0)
+        )
+
+    def test_dashboard_not_a_member(self):
+        """Test the dashboard of another team is not found"""
+        team = Team.objects.create(name="Other team")
+        res = self.client.get(dashboard_url(team.id))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_dashboard_queries_do_not_grow_with_team(self):
+        """Test the dashboard costs the same number of queries for any team size"""
+        self.create_task(assigned_to=self.member2)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(dashboard_url(self.team.id))
+
+        for i in range(3):
+            user = create_user(username=f"user{i}", email=f"user{i}@example.com")
+            member = TeamMember.objects.create(user=user, team=self.team)
+            project = Project.objects.create(name=f"Project {i}", team=self.team)
+            self.create_task(project=project, assigned_to=member)
+        with CaptureQueriesContext(connection) as other_context:
+            res = self.client.get(dashboard_url(self.team.id))
+        self.assertEqual(res.data["member_count"], 5)
+        self.assertEqual(
+            len(context.captured_queries), len(other_context.captured_queries)
+        )
+
+
+class TeamDashboardCacheTests(TransactionTestCase):
+    """
+    Dashboards are only cached outside of transactions,
+    so these tests can not run inside TestCase's transaction.
+    """
+
+    def setUp(self):
+        get_dashboard_cache().clear()
+        self.client = APIClient()
+        self.user = create_user(username="testUser1", email="test1@example.com")
+        self.client.force_authenticate(user=self.user)
+        self.team = Team.objects.create(name="Test team")
+        self.member = TeamMember.objects.create(user=self.user, team=self.team)
+        self.project = Project.objects.create(name="Project 1", team=self.team)
+
+    def tearDown(self):
+        get_dashboard_cache().clear()
+
+    def test_dashboard_is_cached_until_a_write(self):
+        """Test the dashboard is served from cache and rebuilt after writes"""
+        self.client.get(dashboard_url(self.team.id))
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(dashboard_url(self.team.id))
+        self.assertFalse(
+            any("core_project" in query["sql"] for query in context.captured_queries)
+        )
+        self.assertEqual(res.data["projects"][0]["todo_count"], 0)
+
+        task = Task.objects.create(
+            title="Task", project=self.project, created_by=self.member
+        )
+        res = self.client.get(dashboard_url(self.team.id))
+        self.assertEqual(res.data["projects"][0]["todo_count"], 1)
+
+        task.status = "DONE"
+        task.save()
+        res = self.client.get(dashboard_url(self.team.id))
+        self.assertEqual(res.data["projects"][0]["done_count"], 1)
+
+        TeamMember.objects.create(
+            user=create_user(username="testUser2", email="test2@example.com"),
+            team=self.team,
+        )
+        res = self.client.get(dashboard_url(self.team.id))
+        self.assertEqual(res.data["member_count"], 2)
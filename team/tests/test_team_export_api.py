@@ -0,0 +1,76 @@
+import json
+from django.test import TestCase
+from rest_framework.test import APIClient
+from django.urls import reverse
+from core.models import Task, Project, Team, TeamMember
+from django.contrib.auth import get_user_model
+from rest_framework import status
+
+
+def team_export_url(team_id):
+    return reverse("team:team-export", args=[team_id])
+
+
+def create_user(**params):
+    return get_user_model().objects.create_user(**params)
+
+
+class TeamExportAPITests(TestCase):
+    """Private team task export API Tests"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.client = APIClient()
+        cls.user = create_user(username="testUser1", email="test1@example.com")
+        cls.client.force_authenticate(user=cls.user)
+        cls.team = Team.objects.create(name="Test team")
+        cls.member = TeamMember.objects.create(user=cls.user, team=cls.team)
+        cls.tasks = []
+        for name in ("Project 1", "Project 2"):
+            project = Project.objects.create(name=name, team=cls.team)
+            cls.tasks.append(
+                Task.objects.create(
+                    title=f"{name} task", project=project, created_by=cls.member
+                )
+            )
+        cls.other_team = Team.objects.create(name="Other team")
+        other_member = TeamMember.objects.create(
+            user=create_user(username="testUser2", email="test2@example.com"),
+            team=cls.other_team,
+        )
+        Task.objects.create(
+            title="Other task",
+            project=Project.objects.create(name="Project 3", team=cls.other_team),
+            created_by=other_member,
+        )
+
+    def setUp(self):
+        self.client = TeamExportAPITests.client
+
+    def test_export_team_tasks(self):
+        """Test the tasks of all projects of the team are exported"""
+        res = self.client.get(team_export_url(self.team.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn(
+            f'filename="team-{self.team.id}-tasks.jsonl"', res["Content-Disposition"]
+        )
+        lines = b"".join(res.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row["id"] for row in rows], [task.id for task in self.tasks])
+        self.assertEqual(
+            [row["project"] for row in rows],
+            [task.project_id for task in self.tasks],
+        )
+
+    def test_export_team_csv(self):
+        """Test the team export is also available as CSV"""
+        res = self.client.get(team_export_url(self.team.id), {"type": "csv"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        lines = b"".join(res.streaming_content).decode().splitlines()
+        self.assertTrue(lines[0].startswith("id,project,title"))
+        self.assertEqual(len(lines), 3)
+
+    def test_export_not_a_member(self):
+        """Test the tasks of another team can not be exported"""
+        res = self.client.get(team_export_url(self.other_team.id))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -1,10 +1,16 @@
+import asyncio
 import json
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.urls import reverse
 from django.contrib.auth import get_user_model
-from core.models import Team, TeamMember
+from core.events import get_broker
+from core.models import Team, TeamMember, Project, Task
 
 
 def team_member_url(team_id):
@@ -72,6 +78,19 @@ class TeamMemberAPITests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         team_members = TeamMember.objects.filter(team=self.team)
         self.assertEqual(len(team_members), 2)
+        self.assertEqual(len(res.data["results"]), 2)
+
+    def test_list_team_members_paginated(self):
+        """Test team members are listed in pages ordered by id"""
+        create_member(user=self.user1, team=self.team, is_admin=True)
+        create_member(user=self.user2, team=self.team, is_admin=False)
+
+        res = self.client.get(team_member_url(self.team.id), {"page_size": 1})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"][0]["email"], self.user1.email)
+        res = self.client.get(res.data["next"])
+        self.assertEqual(res.data["results"][0]["email"], self.user2.email)
+        self.assertIsNone(res.data["next"])
 
     def test_list_team_members_not_a_member_fails(self):
         """Test getting list of team members where user is not a member should fail"""
@@ -94,6 +113,104 @@ class TeamMemberAPITests(TestCase):
         team_members = TeamMember.objects.filter(team=self.team)
         self.assertEqual(len(team_members), 3)
 
+    def test_add_members_to_team_report(self):
+        """Test adding members reports the result of each email"""
+        create_member(user=self.user1, team=self.team, is_admin=True)
+        create_member(user=self.user2, team=self.team, is_admin=False)
+        user3 = create_user(username="testUser3", email="test3@example.com")
+        payload = json.dumps(
+            [
+                {"email": user3.email},
+                {"email": self.user2.email},
+                {"email": "unknown@example.com"},
+                {"email": user3.email},
+            ]
+        )
+        res = self.client.post(
+            team_member_url(self.team.id), payload, content_type="application/json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            res.data["results"],
+            [
+                {"email": user3.email, "result": "added"},
+                {"email": self.user2.email, "result": "already_member"},
+                {"email": "unknown@example.com", "result": "unknown"},
+            ],
+        )
+        self.assertTrue(TeamMember.objects.filter(team=self.team, user=user3).exists())
+
+    def test_add_members_unknown_emails_do_not_block_known(self):
+        """
+        Test unknown emails are reported while the known ones are added,
+        only an invite without any known email fails.
+        """
+        create_member(user=self.user1, team=self.team, is_admin=True)
+        payload = json.dumps([{"email": "unknown@example.com"}])
+        res = self.client.post(
+            team_member_url(self.team.id), payload, content_type="application/json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        payload = json.dumps(
+            [{"email": "unknown@example.com"}, {"email": self.user2.email}]
+        )
+        res = self.client.post(
+            team_member_url(self.team.id), payload, content_type="application/json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [item["result"] for item in res.data["results"]], ["unknown", "added"]
+        )
+        self.assertTrue(
+            TeamMember.objects.filter(team=self.team, user=self.user2).exists()
+        )
+
+    def test_add_members_events_carry_member_ids(self):
+        """Test the events of invited members carry the ids of the inserted rows"""
+        create_member(user=self.user1, team=self.team, is_admin=True)
+        loop = asyncio.new_event_loop()
+        subscription = get_broker().subscribe(loop)
+        try:
+            payload = json.dumps([{"email": self.user2.email}])
+            with self.captureOnCommitCallbacks(execute=True):
+                res = self.client.post(
+                    team_member_url(self.team.id),
+                    payload,
+                    content_type="application/json",
+                )
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            event = loop.run_until_complete(subscription.get(1))
+        finally:
+            get_broker().unsubscribe(subscription)
+            loop.close()
+
+        member = TeamMember.objects.get(team=self.team, user=self.user2)
+        self.assertEqual(event["type"], "member.saved")
+        self.assertEqual(event["id"], member.id)
+
+    def test_add_members_query_count_does_not_grow_with_emails(self):
+        """Test inviting many users costs the same number of queries as one"""
+        create_member(user=self.user1, team=self.team, is_admin=True)
+        users = [
+            create_user(username=f"invited{i}", email=f"invited{i}@example.com")
+            for i in range(10)
+        ]
+
+        def invite(users):
+            payload = json.dumps([{"email": user.email} for user in users])
+            with CaptureQueriesContext(connection) as context:
+                res = self.client.post(
+                    team_member_url(self.team.id),
+                    payload,
+                    content_type="application/json",
+                )
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            return len(context.captured_queries)
+
+        self.assertEqual(invite(users[:1]), invite(users[1:]))
+        self.assertEqual(TeamMember.objects.filter(team=self.team).count(), 11)
+
     def test_add_members_to_team_without_admin_role(self):
         """
         Test adding members to team via their email fails
@@ -173,13 +290,54 @@ class TeamMemberAPITests(TestCase):
         )
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_team_members_empty_list(self):
+        """Test adding or updating an empty list of members fails"""
+        create_member(user=self.user1, team=self.team, is_admin=True)
+        for method in (self.client.post, self.client.patch):
+            res = method(
+                team_member_url(self.team.id), "[]", content_type="application/json"
+            )
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_delete_team_member_with_admin_role(self):
         """Test deleting a team member with admin role successful"""
         create_member(user=self.user1, team=self.team, is_admin=True)
         member2 = create_member(user=self.user2, team=self.team, is_admin=False)
         res = self.client.delete(team_member_remove_url(self.team.id, member2.id))
-        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        call_command("run_jobs", stdout=StringIO())
+        self.assertFalse(TeamMember.objects.filter(id=member2.id).exists())
+
+    def test_delete_team_member_in_background(self):
+        """Test a removed member is hidden at once and deleted by a job"""
+        member1 = create_member(user=self.user1, team=self.team, is_admin=True)
+        member2 = create_member(user=self.user2, team=self.team, is_admin=False)
+        project = Project.objects.create(name="Project 1", team=self.team)
+        Task.objects.create(title="Task 1", project=project, created_by=member2)
+        kept = Task.objects.create(
+            title="Task 2", project=project, created_by=member1, assigned_to=member2
+        )
+        url = team_member_remove_url(self.team.id, member2.id)
+        res = self.client.delete(url)
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        job_url = res["Location"]
+
+        ## the member is gone from the API before the job ran
+        res = self.client.get(team_member_url(self.team.id))
+        self.assertEqual([member["id"] for member in res.data["results"]], [member1.id])
+        client = APIClient()
+        client.force_authenticate(user=self.user2)
+        res = client.get(reverse("team:team-detail", args=[self.team.id]))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        ## removing again reports the pending job
+        res = self.client.delete(url)
+        self.assertEqual(res["Location"], job_url)
+
+        call_command("run_jobs", stdout=StringIO())
         self.assertFalse(TeamMember.objects.filter(id=member2.id).exists())
+        self.assertEqual(list(Task.objects.all()), [kept])
+        kept.refresh_from_db()
+        self.assertIsNone(kept.assigned_to)
 
     def test_delete_other_team_members_without_admin_role(self):
         """Test deleting other team members without admin role fails"""
@@ -198,5 +356,6 @@ class TeamMemberAPITests(TestCase):
         ## user does not have admin role
         member = create_member(user=self.user1, team=self.team, is_admin=False)
         res = self.client.delete(team_member_remove_url(self.team.id, member.id))
-        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        call_command("run_jobs", stdout=StringIO())
         self.assertFalse(TeamMember.objects.filter(id=member.id).exists())
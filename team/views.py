@@ -1,11 +1,23 @@
 from django.shortcuts import get_object_or_404
 from rest_framework.viewsets import ModelViewSet
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
-from core.models import Team, TeamMember
+from core.models import Team, TeamMember, Task
+from core.conditional import make_etag, not_modified, add_conditional_headers
+from core.membership import (
+    get_membership_resolver,
+    filter_visible_teams,
+    invalidate_memberships,
+)
+from core.dashboard import get_dashboard, invalidate_dashboards
+from core.events import publish_on_commit
+from core.jobs import delete_in_background
+from core.views import job_accepted_response
+from core.exports import export_response
+from project.serializers import TaskExportValuesSerializer
+from user.authentication import CachedTokenAuthentication
 from . import serializers
 from .permissions import (
     IsAllowedToEdit,
@@ -24,17 +36,68 @@ class TeamViewSet(ModelViewSet):
 
     serializer_class = serializers.TeamSerializer
     queryset = Team.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated, IsAllowedToEdit, IsAllowedToDelete]
 
     def get_queryset(self):
-        return Team.objects.filter(member__user=self.request.user)
+        queryset = filter_visible_teams(self.request, Team.objects.all(), field="id")
+        ## a team being deleted can only be deleted again
+        if self.action != "destroy":
+            queryset = queryset.filter(deleting=False)
+        return queryset
 
     def get_serializer_class(self):
         if self.action == "list":
             return serializers.TeamListSerializer
         return self.serializer_class
 
+    def list(self, request, *args, **kwargs):
+        queryset = serializers.TeamListValuesSerializer.apply(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        serializer = serializers.TeamListValuesSerializer(
+            page, context=self.get_serializer_context()
+        )
+        return self.get_paginated_response(serializer.data)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Answers conditional requests without serializing the team"""
+        instance = self.get_object()
+        ## admins see more fields than members
+        is_admin = get_membership_resolver(request).is_admin(instance.id)
+        etag = make_etag("team", instance.pk, instance.updated_at, is_admin)
+        response = not_modified(request, etag, instance.updated_at)
+        if response is None:
+            serializer = self.get_serializer(instance)
+            response = Response(serializer.data)
+        return add_conditional_headers(response, etag, instance.updated_at)
+
+    def destroy(self, request, *args, **kwargs):
+        """Deletes the team with its projects and tasks in a background job"""
+        instance = self.get_object()
+        job = delete_in_background(instance, "team.delete", user=request.user)
+        return job_accepted_response(request, job)
+
+    @action(detail=True, methods=["get"])
+    def dashboard(self, request, pk=None):
+        """
+        Member count, projects with their status and overdue counts
+        and the open tasks of each member, cached until the next write
+        """
+        team = self.get_object()
+        return Response(get_dashboard(team.pk))
+
+    @action(detail=True, methods=["get"])
+    def export(self, request, pk=None):
+        """Streams the tasks of all projects of the team as JSON Lines or CSV"""
+        ## members see every project of their team, like the project views
+        team = self.get_object()
+        return export_response(
+            request,
+            TaskExportValuesSerializer,
+            Task.objects.filter(project__team_id=team.pk, project__deleting=False),
+            f"team-{team.pk}-tasks",
+        )
+
     @action(
         detail=True,
         methods=["post", "get", "patch"],
@@ -44,22 +107,29 @@ class TeamViewSet(ModelViewSet):
         """Action for crud of team members"""
         team = self.get_object()
         if request.method == "GET":
-            team_members = TeamMember.objects.filter(team=team)
-            serializer = serializers.TeamMemberSerializer(team_members, many=True)
-            return Response(serializer.data)
+            team_members = serializers.TeamMemberValuesSerializer.apply(
+                TeamMember.objects.filter(team=team, deleting=False)
+            )
+            page = self.paginate_queryset(team_members)
+            serializer = serializers.TeamMemberValuesSerializer(page)
+            return self.get_paginated_response(serializer.data)
 
         elif request.method == "POST":
-            serializer = serializers.TeamMemberSerializer(data=request.data, many=True)
+            serializer = serializers.TeamMemberSerializer(
+                data=request.data, many=True, allow_empty=False
+            )
             if serializer.is_valid():
                 serializer.save(team=team)
-                return Response(serializer.data, status=status.HTTP_201_CREATED)
+                return Response(
+                    {"results": serializer.report}, status=status.HTTP_201_CREATED
+                )
             else:
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         elif request.method == "PATCH":
-            team_members = TeamMember.objects.filter(team=team)
+            team_members = TeamMember.objects.filter(team=team, deleting=False)
             serializer = serializers.TeamMemberSerializer(
-                team_members, data=request.data, many=True
+                team_members, data=request.data, many=True, allow_empty=False
             )
             if serializer.is_valid():
                 serializer.save()
@@ -75,7 +145,8 @@ class TeamViewSet(ModelViewSet):
     def remove_member(self, request, pk=None, member_id=None):
         if request.method == "DELETE":
             team = self.get_object()
-            ## only members of this team can be remove
+            ## only members of this team can be remove, a member being
+            ## removed can only be removed again
             queryset = TeamMember.objects.filter(team=team)
             try:
                 instance = get_object_or_404(queryset, pk=member_id)
@@ -91,8 +162,15 @@ class TeamViewSet(ModelViewSet):
                         status=status.HTTP_403_FORBIDDEN,
                     )
 
-                instance.delete()
-                return Response(status=status.HTTP_204_NO_CONTENT)
+                ## access is lost now, the tasks the member created
+                ## are deleted with it by the job
+                job = delete_in_background(instance, "member.delete", user=request.user)
+                invalidate_memberships(instance.user_id)
+                invalidate_dashboards(team.pk)
+                publish_on_commit(
+                    "member.deleted", team.pk, id=instance.pk, user_id=instance.user_id
+                )
+                return job_accepted_response(request, job)
             except:
                 return Response(status=status.HTTP_404_NOT_FOUND)
 
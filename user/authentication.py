@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.signals import setting_changed
+from django.db import connection, transaction
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from core.cache import VersionedCache
+
+
+_token_cache = None
+
+
+def get_token_cache():
+    """
+    Returns the cache of token key to (user_id, is_active), configured by
+    the TOKEN_AUTH_CACHE setting. Entries are versioned per token, so a
+    revoked token is rejected by every process that shares the cache alias.
+    The hit ratio is logged to the core.cache logger every LOG_STATS_EVERY
+    lookups.
+    """
+    global _token_cache
+    if _token_cache is None:
+        options = getattr(settings, "TOKEN_AUTH_CACHE", {})
+        _token_cache = VersionedCache(
+            "token",
+            alias=options.get("ALIAS", None),
+            timeout=options.get("TTL", 60),
+            stats_interval=options.get("LOG_STATS_EVERY", 1000),
+        )
+    return _token_cache
+
+
+@receiver(setting_changed)
+def reset_token_cache(setting, **kwargs):
+    global _token_cache
+    if setting == "TOKEN_AUTH_CACHE":
+        _token_cache = None
+
+
+def revoke_tokens(*keys):
+    """
+    Bumps the cache generation of keys now and again after the current
+    transaction commits, so a lookup racing with the revocation stores
+    its entry under a stale generation.
+    """
+
+    def revoke():
+        cache = get_token_cache()
+        for key in keys:
+            cache.invalidate(key)
+
+    revoke()
+    transaction.on_commit(revoke)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that caches the user id and active flag of
+    recently used tokens instead of querying the token and its user on
+    every request. The other fields of the user load on first access.
+    """
+
+    def authenticate_credentials(self, key):
+        cache = get_token_cache()
+        entry, generation = cache.get(key)
+        if entry is None:
+            user, token = super().authenticate_credentials(key)
+            ## rows read inside a transaction may still be rolled back
+            if not connection.in_atomic_block:
+                cache.set(key, (user.id, user.is_active), generation)
+            return (user, token)
+
+        user_id, is_active = entry
+        if not is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        user = get_user_model().from_db(
+            connection.alias, ["id", "is_active"], [user_id, is_active]
+        )
+        token = self.get_model().from_db(
+            connection.alias, ["key", "user_id"], [key, user_id]
+        )
+        token.user = user
+        return (user, token)
@@ -0,0 +1,28 @@
+from django.contrib.auth.forms import PasswordResetForm
+from django.template import loader
+from core.mail import enqueue_email
+
+
+class QueuedPasswordResetForm(PasswordResetForm):
+    """
+    Renders the password reset e-mail in the request
+    but leaves sending it to the outbox worker.
+    """
+
+    def send_mail(
+        self,
+        subject_template_name,
+        email_template_name,
+        context,
+        from_email,
+        to_email,
+        html_email_template_name=None,
+    ):
+        subject = loader.render_to_string(subject_template_name, context)
+        # Email subject *must not* contain newlines
+        subject = "".join(subject.splitlines())
+        body = loader.render_to_string(email_template_name, context)
+        html_body = ""
+        if html_email_template_name is not None:
+            html_body = loader.render_to_string(html_email_template_name, context)
+        enqueue_email(subject, body, from_email, to_email, html_body)
@@ -1,11 +1,12 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model, authenticate, password_validation
-from django.contrib.auth.forms import SetPasswordForm, PasswordResetForm
+from django.contrib.auth.forms import SetPasswordForm
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_decode as uid_decoder
 from django.utils.translation import gettext_lazy as _
 from django.utils.encoding import force_str
 from rest_framework import serializers
+from .forms import QueuedPasswordResetForm
 
 
 class CreateUserSerializer(serializers.ModelSerializer):
@@ -73,8 +74,9 @@ class PasswordResetSerializer(serializers.Serializer):
     reset_form = None
 
     def validate_email(self, value):
-        # Create PasswordResetForm with the serializer initial data
-        self.reset_form = PasswordResetForm(data=self.initial_data)
+        # Create PasswordResetForm with the serializer initial data,
+        # the e-mail is queued and sent by the send_queued_emails worker
+        self.reset_form = QueuedPasswordResetForm(data=self.initial_data)
         if not self.reset_form.is_valid():
             raise serializers.ValidationError(self.reset_form.errors)
 
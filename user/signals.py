@@ -0,0 +1,21 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from .authentication import revoke_tokens
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    revoke_tokens(instance.key)
+
+
+@receiver(post_save, sender=get_user_model())
+def user_changed(sender, instance, created, **kwargs):
+    """
+    Deactivating a user or changing the password must take effect
+    immediately, so any change of the user drops its cached tokens.
+    """
+    if created:
+        return
+    revoke_tokens(*Token.objects.filter(user=instance).values_list("key", flat=True))
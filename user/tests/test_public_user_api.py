@@ -1,10 +1,13 @@
 import re
+from io import StringIO
 from django.test import TestCase
 from django.core import mail
+from django.core.management import call_command
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
+from core.models import QueuedEmail
 
 
 CREATE_USER_URL = reverse("user:register")
@@ -112,6 +115,7 @@ class PublicUserAPITests(TestCase):
         ## we don't want to reveal that a user with this email
         ## exist in our database or not.
         self.assertEqual(res.status_code, status.HTTP_200_OK)
+        call_command("send_queued_emails", stdout=StringIO())
         self.assertEqual(len(mail.outbox), 0)
 
     def test_reset_password_send_email_existed(self):
@@ -120,15 +124,22 @@ class PublicUserAPITests(TestCase):
         res = self.client.post(RESET_PASSWORD_URL, payload)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
+        ## the e-mail is queued in the request and sent by the worker
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertTrue(QueuedEmail.objects.filter(to=self.payload["email"]).exists())
+        call_command("send_queued_emails", stdout=StringIO())
         self.assertEqual(len(mail.outbox), 1)
         reset_url = get_reset_password_url(mail.outbox[0].body)
         self.assertIsNotNone(reset_url)
+        ## the link is not kept in the outbox once it is sent
+        self.assertEqual(QueuedEmail.objects.get(to=self.payload["email"]).body, "")
 
     def test_reset_password_confirm_successful(self):
         """Test confirming rest password with valid uid and token successful"""
         ## creating a user and send a password reset email
         payload = {"email": self.payload["email"]}
         self.client.post(RESET_PASSWORD_URL, payload)
+        call_command("send_queued_emails", stdout=StringIO())
         ## get reset link from email body and split token and uid part
         reset_url = get_reset_password_url(mail.outbox[0].body)
         token = reset_url.split("/")[-2]
@@ -0,0 +1,122 @@
+from django.core.cache import caches
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework import status
+from core.cache import VersionedCache
+from user.authentication import get_token_cache
+
+
+USER_PROFILE_URL = reverse("user:profile")
+
+
+def count_token_queries(context):
+    return sum(
+        'FROM "authtoken_token"' in query["sql"] for query in context.captured_queries
+    )
+
+
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "shared": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "token-tests",
+        },
+    },
+    TOKEN_AUTH_CACHE={"TTL": 60, "ALIAS": "shared", "LOG_STATS_EVERY": None},
+)
+class TokenCacheTests(TransactionTestCase):
+    """
+    Entries are only cached outside of transactions,
+    so these tests can not run inside TestCase's transaction.
+    """
+
+    def setUp(self):
+        caches["shared"].clear()
+        get_token_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", username="testuser1", password="Test@user123"
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def tearDown(self):
+        caches["shared"].clear()
+        get_token_cache().clear()
+
+    @override_settings(
+        TOKEN_AUTH_CACHE={"TTL": 60, "ALIAS": "shared", "LOG_STATS_EVERY": 2}
+    )
+    def test_token_is_looked_up_once(self):
+        """Test the token is read from the database only on the first request"""
+        self.client.get(USER_PROFILE_URL)
+        with CaptureQueriesContext(connection) as context, self.assertLogs(
+            "core.cache", "INFO"
+        ) as logs:
+            res = self.client.get(USER_PROFILE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["email"], self.user.email)
+        self.assertEqual(res.data["username"], self.user.username)
+        self.assertEqual(count_token_queries(context), 0)
+        ## the fields of the user besides id and is_active load in one query
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertIn("hit ratio 0.50", logs.output[0])
+
+    def test_only_user_id_and_active_flag_are_cached(self):
+        """Test the cache holds no other fields of the user like the password"""
+        self.client.get(USER_PROFILE_URL)
+        self.assertEqual(get_token_cache().get(self.token.key)[0], (self.user.id, True))
+
+    def test_revocation_reaches_other_processes(self):
+        """Test a token revoked in another process is looked up again"""
+        self.client.get(USER_PROFILE_URL)
+        ## simulate another process sharing the cache alias
+        VersionedCache("token", alias="shared").invalidate(self.token.key)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(USER_PROFILE_URL)
+        self.assertEqual(count_token_queries(context), 1)
+
+    def test_lookup_racing_with_delete_is_not_served(self):
+        """Test a token read before its deletion is not served from the cache"""
+        cache = get_token_cache()
+        entry, generation = cache.get(self.token.key)
+        self.assertIsNone(entry)
+        self.token.delete()
+        cache.set(self.token.key, (self.user.id, True), generation)
+
+        res = self.client.get(USER_PROFILE_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_token_is_revoked(self):
+        """Test a deleted token is rejected even after it was cached"""
+        self.client.get(USER_PROFILE_URL)
+        self.token.delete()
+        res = self.client.get(USER_PROFILE_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_revoked(self):
+        """Test a deactivated user is rejected even after the token was cached"""
+        self.client.get(USER_PROFILE_URL)
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.get(USER_PROFILE_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_revokes_cached_user(self):
+        """Test changing the password drops the cached user"""
+        self.client.get(USER_PROFILE_URL)
+        payload = {
+            "old_password": "Test@user123",
+            "new_password1": "Changed@pass456",
+            "new_password2": "Changed@pass456",
+        }
+        res = self.client.post(reverse("user:password-change"), payload)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsNone(get_token_cache().get(self.token.key)[0])
@@ -1,11 +1,11 @@
 from rest_framework.generics import CreateAPIView, RetrieveUpdateAPIView, GenericAPIView
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.response import Response
 from rest_framework import status
 from django.utils.translation import gettext_lazy as _
 from .serializers import CreateUserSerializer, AuthTokenSerializer, UserSerializer
+from .authentication import CachedTokenAuthentication
 from . import serializers
 
 
@@ -25,7 +25,7 @@ class ManageUserView(RetrieveUpdateAPIView):
     """Retrive and Update user view"""
 
     serializer_class = UserSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
@@ -86,7 +86,7 @@ class PasswordChangeView(GenericAPIView):
     """
 
     serializer_class = serializers.PasswordChangeSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request, *args, **kwargs):